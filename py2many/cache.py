@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .version import __version__
+
+# 512 MiB
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class FormatRecord:
+    """The digests of the outputs formatted into a directory, and of what each
+    formatted to, kept across runs in the file path.
+
+    An output recorded for its path, whose file still has the recorded
+    formatted digest, would format to what is on disk already, so it needs
+    neither formatting nor writing again.
+    """
+
+    def __init__(self, directory, formatter: List[str], path):
+        self.directory = Path(directory)
+        self.formatter = "\0".join(formatter)
+        self.path = Path(path)
+        self.changed = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.digests = json.load(f)
+        except (OSError, ValueError):
+            self.digests = {}
+
+    def _key(self, output_path) -> str:
+        return Path(os.path.relpath(output_path, self.directory)).as_posix()
+
+    def _output_digest(self, output: str) -> str:
+        # The same output formats differently with another formatter
+        return hash_text(f"{self.formatter}\0{output}")
+
+    def is_formatted(self, output_path, output: str) -> bool:
+        """Whether output_path holds what output formats to"""
+        recorded = self.digests.get(self._key(output_path))
+        if recorded is None or recorded[0] != self._output_digest(output):
+            return False
+        try:
+            with open(output_path) as f:
+                return hash_text(f.read()) == recorded[1]
+        except (OSError, ValueError):
+            return False
+
+    def add(self, output_path, output: str, formatted: str):
+        digests = self.digests
+        digests[self._key(output_path)] = [
+            self._output_digest(output),
+            hash_text(formatted),
+        ]
+        self.changed = True
+
+    def save(self):
+        if not self.changed:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.digests, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+
+class TranspileCache:
+    """A content addressed on-disk store of transpiled outputs.
+
+    Each entry is a small json file named after the digest of its key. Reads
+    refresh the entry's mtime, so evict() can drop the least recently used
+    entries once the cache grows past max_size bytes.
+    """
+
+    def __init__(self, cache_dir, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+
+    def key(self, *parts: str) -> str:
+        digest = hashlib.sha256(__version__.encode("utf-8"))
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(part.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: Dict):
+        path = self._path(key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never observe a
+        # partially written entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def put_output(self, key: str, output: str, formatted: Optional[str] = None):
+        entry = {"output": output}
+        if formatted is not None:
+            entry["formatted"] = formatted
+        self.put(key, entry)
+
+    def format_record(self, directory, formatter: List[str]) -> FormatRecord:
+        """The FormatRecord of the outputs formatted into directory, kept as an
+        entry of the cache rather than next to the outputs"""
+        directory = Path(directory)
+        key = self.key("formatted", str(directory.resolve()), *formatter)
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return FormatRecord(directory, formatter, path)
+
+    def imports(self, source: str, source_hash: str, parse_imports) -> List[str]:
+        """Names imported by source, parsing it only on a cache miss."""
+        key = self.key("imports", source_hash)
+        entry = self.get(key)
+        if entry is not None:
+            return entry["imports"]
+        imports = parse_imports(source)
+        self.put(key, {"imports": imports})
+        return imports
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_size."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
@@ -1,24 +1,38 @@
 import argparse
 import ast
+import copy
+import multiprocessing
+import multiprocessing.connection
 import os
+import pickle
 import sys
 import tempfile
-from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
 from pathlib import Path
 from subprocess import run as subprocess_run
 from typing import List, Optional, Set, Tuple
 
 from .analysis import add_imports
-from .annotation_transformer import add_annotation_flags
-from .context import add_assignment_context, add_list_calls, add_variable_context
+from .cache import DEFAULT_MAX_SIZE, TranspileCache, hash_text
+from .context import (
+    add_export_table,
+    add_list_calls,
+    add_variable_context,
+    remove_list_calls,
+    update_variable_context,
+)
+from .context_transformer import add_context, update_context
 from .exceptions import AstErrorBase
+from .format_worker import get_worker
 from .inference import infer_types, infer_types_typpete
 from .language import LanguageSettings
 from .mutability_transformer import detect_mutable_vars
-from .nesting_transformer import detect_nesting_levels
 from .process_helpers import find_executable
+from .profiler import FileProfile, PassProfile
 from .raises_transformer import detect_raises
-from .registry import ALL_SETTINGS, FAKE_ARGS, _get_all_settings
+from .registry import ALL_SETTINGS, BACKENDS, _get_all_settings  # noqa: F401
 from .rewriters import (
     ComplexDestructuringRewriter,
     DocStringToCommentRewriter,
@@ -32,8 +46,14 @@ from .rewriters import (
     UnpackScopeRewriter,
     WithToBlockTransformer,
 )
-from .scope import add_scope_context
-from .toposort_modules import toposort
+from .scope import SymbolIndex, add_scope_context
+from .toposort_modules import (
+    TopologicalSorter,
+    get_dependencies,
+    module_for_path,
+    toposort,
+    toposort_paths,
+)
 from .version import __version__
 
 PY2MANY_DIR = Path(__file__).parent
@@ -41,50 +61,273 @@ ROOT_DIR = PY2MANY_DIR.parent
 STDIN = "-"
 STDOUT = "-"
 CWD = Path.cwd()
+# Most paths handed to a batch formatter in one invocation
+FORMAT_BATCH_SIZE = 100
+
+
+def core_transformers(tree, trees, args, profile: Optional[FileProfile] = None):
+    """Run the language independent analysis passes over tree.
+
+    The passes that only depend on a node's ancestors (scopes, assignment
+    targets, nesting levels and annotation flags) share a single walk. Each
+    pass is recorded in profile if given.
+    """
+    infer = infer_types_typpete if args and args.typpete else infer_types
+    _timed(profile, "context", add_context, tree)
+    _timed(profile, "variables", add_variable_context, tree, trees)
+    _timed(profile, "list calls", add_list_calls, tree)
+    _timed(profile, "mutability", detect_mutable_vars, tree)
+    _timed(profile, "raises", detect_raises, tree)
+    infer_meta = _timed(profile, "inference", infer, tree)
+    _timed(profile, "imports", add_imports, tree)
+    return tree, infer_meta
 
 
-def core_transformers(tree, trees, args):
-    add_variable_context(tree, trees)
-    add_scope_context(tree)
-    add_assignment_context(tree)
-    add_list_calls(tree)
-    detect_mutable_vars(tree)
-    detect_nesting_levels(tree)
-    detect_raises(tree)
-    add_annotation_flags(tree)
-    infer_meta = (
-        infer_types_typpete(tree) if args and args.typpete else infer_types(tree)
+def reanalyse(
+    tree, trees, args, changed, removed, profile: Optional[FileProfile] = None
+):
+    """Rerun the analysis passes over tree after some statements changed.
+
+    changed pairs each Module or ClassDef body that kept its place with the
+    statements of it that rewriters added or modified since core_transformers
+    last ran, and removed lists the nodes rewriters took out of the tree, as
+    returned by _changed_statements(). The passes whose results only depend
+    on a statement's own nodes revisit just those; raises, inference and
+    imports still cover the whole module, since their results flow between
+    statements.
+    """
+    infer = infer_types_typpete if args and args.typpete else infer_types
+    statements = []
+    for _, body_changed in changed:
+        statements.extend(body_changed)
+    _timed(profile, "context", _update_bodies, update_context, changed)
+    _timed(
+        profile,
+        "variables",
+        _update_bodies,
+        partial(update_variable_context, trees=trees),
+        changed,
     )
-    add_imports(tree)
+    _timed(profile, "list calls", _update_list_calls, statements, removed)
+    _timed(profile, "mutability", _visit_each, detect_mutable_vars, statements)
+    _timed(profile, "raises", detect_raises, tree)
+    infer_meta = _timed(profile, "inference", infer, tree)
+    _timed(profile, "imports", add_imports, tree)
     return tree, infer_meta
 
 
+def _prefixed(profile, prefix):
+    if profile is None:
+        return None
+    return profile.prefixed(prefix)
+
+
+def _update_bodies(func, changed):
+    for node, statements in changed:
+        func(node, statements=statements)
+
+
+def _update_list_calls(statements, removed):
+    remove_list_calls(removed)
+    _visit_each(add_list_calls, statements)
+
+
+def _visit_each(func, statements):
+    for stmt in statements:
+        func(stmt)
+
+
+def _statement_nodes(tree):
+    """Snapshot the nodes under each statement of the module and class bodies
+    of tree, along with the node whose body holds the statement"""
+    snapshot = {}
+    _snapshot_body(tree, snapshot)
+    return snapshot
+
+
+def _snapshot_body(node, snapshot):
+    for stmt in node.body:
+        if isinstance(stmt, ast.ClassDef):
+            snapshot[id(stmt)] = (node, _node_states(_class_header_nodes(stmt)))
+            _snapshot_body(stmt, snapshot)
+        else:
+            snapshot[id(stmt)] = (node, _node_states(ast.walk(stmt)))
+
+
+def _node_states(nodes):
+    """Pair each of nodes with the values of its fields that are not nodes, so
+    that edits made in place, to the id of a Name say, show as changes"""
+    states = []
+    for node in nodes:
+        values = []
+        for _, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for item in value:
+                    if not isinstance(item, ast.AST):
+                        values.append(item)
+            elif not isinstance(value, ast.AST):
+                # 1 == True, so the type of a Constant's value counts too
+                values.append((type(value), value))
+        states.append((node, values))
+    return states
+
+
+def _class_header_nodes(node):
+    nodes = [node]
+    for field, value in ast.iter_fields(node):
+        if field == "body":
+            continue
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ast.AST):
+                    nodes.extend(ast.walk(item))
+        elif isinstance(value, ast.AST):
+            nodes.extend(ast.walk(value))
+    return nodes
+
+
+def _changed_statements(tree, snapshot):
+    """The statements of each module and class body of tree that were added,
+    moved or had nodes replaced, inserted or edited under them since snapshot.
+
+    Also returns the nodes of snapshot that are no longer in the tree, under
+    the statements that changed or were removed.
+    """
+    changed = []
+    unchanged = set()
+    current = set()
+    _changed_body(tree, snapshot, changed, unchanged, current)
+    removed = []
+    for key, (_, states) in snapshot.items():
+        if key not in unchanged:
+            for node, _ in states:
+                if id(node) not in current:
+                    removed.append(node)
+    return changed, removed
+
+
+def _changed_body(node, snapshot, changed, unchanged, current):
+    statements = []
+    for stmt in node.body:
+        # The snapshot keeps the old statements alive, so their ids are not
+        # reused. Nodes compare by identity, as ast nodes define no __eq__
+        entry = snapshot.get(id(stmt))
+        if isinstance(stmt, ast.ClassDef):
+            states = _node_states(_class_header_nodes(stmt))
+        else:
+            states = _node_states(ast.walk(stmt))
+        if entry is not None and entry[0] is node and entry[1] == states:
+            unchanged.add(id(stmt))
+            if isinstance(stmt, ast.ClassDef):
+                _changed_body(stmt, snapshot, changed, unchanged, current)
+            continue
+        statements.append(stmt)
+        for other in ast.walk(stmt):
+            current.add(id(other))
+    changed.append((node, statements))
+
+
+def _timed(profile, name, func, *args):
+    """Run the pass func, recorded as name in profile if given. func may
+    rewrite the definitions of scopes in place, so the symbol indexes of the
+    scopes are rebuilt after it"""
+    try:
+        if profile is None:
+            return func(*args)
+        return profile.call(name, func, *args)
+    finally:
+        SymbolIndex.invalidate_all()
+
+
 def _transpile(
     filenames: List[Path],
     sources: List[str],
     settings: LanguageSettings,
     args: Optional[argparse.Namespace] = None,
     _suppress_exceptions=Exception,
+    jobs: int = 1,
+    profile: Optional[PassProfile] = None,
 ):
     """
     Transpile a single python translation unit (a python script) into
     target language
+
+    The passes are recorded in profile if given, which runs them serially.
     """
     if hasattr(args, "llm") and args.llm:
         from .llm_transpile import llm_transpile
 
         return llm_transpile(filenames, sources, settings, args)
-    transpiler = settings.transpiler
-    rewriters = settings.rewriters
-    transformers = settings.transformers
-    post_rewriters = settings.post_rewriters
-    tree_list = []
-    for filename, source in zip(filenames, sources):
-        tree = ast.parse(source)
-        tree.__file__ = filename
-        tree_list.append(tree)
-    trees = toposort(tree_list)
+    trees = _parse_sorted(filenames, sources)
     topo_filenames = [t.__file__ for t in trees]
+    pipeline = _pipeline(settings, args)
+    if jobs > 1 and len(trees) > 1 and _can_fork() and profile is None:
+        outputs = _transpile_parallel(trees, pipeline, jobs, _suppress_exceptions)
+    else:
+        outputs = _transpile_trees(trees, pipeline, _suppress_exceptions, profile)
+    return _collect_outputs(filenames, topo_filenames, outputs)
+
+
+def _parse(filename, source):
+    tree = ast.parse(source)
+    tree.__file__ = filename
+    return tree
+
+
+def _parse_sorted(filenames, sources):
+    """Parse sources into a list of trees in topological order"""
+    tree_list = [_parse(f, source) for f, source in zip(filenames, sources)]
+    return list(toposort(tree_list))
+
+
+def _transpile_trees(trees, pipeline, _suppress_exceptions, profile=None):
+    """Transpile trees, in topological order, one after the other.
+
+    Each tree in the list that a later one imports from is replaced by the
+    stub holding its export table once transpiled, and the others by a
+    stand-in, so that their trees can be freed. Returns a dict of the
+    (output, error) of each filename.
+    """
+    exported = _exported_modules(_analysis_prerequisites(trees))
+    outputs = {}
+    for i, tree in enumerate(list(trees)):
+        output, error = _transpile_checked(
+            trees, tree, pipeline, _suppress_exceptions, profile
+        )
+        outputs[tree.__file__] = (output, error)
+        if error is None and tree.__file__ in exported:
+            trees[i] = _export_stub(tree)
+        elif error is None:
+            trees[i] = _stand_in(tree.__file__)
+    return outputs
+
+
+def _export_stub(tree):
+    """Summarise the names tree defines, once transpiled, in the stub holding
+    its export table. Modules importing from tree only read that stub."""
+    add_export_table(tree)
+    return tree.exports.module
+
+
+def _collect_outputs(filenames, topo_filenames, outputs):
+    """Print the errors in outputs, in topological order, and return the
+    outputs in the order of filenames along with the successful filenames"""
+    successful = []
+    for filename in topo_filenames:
+        output, error = outputs[filename]
+        if error is not None:
+            print(error)
+        else:
+            successful.append(filename)
+    # return output in the same order as input
+    output_list = [outputs[f][0] for f in filenames]
+    return output_list, successful
+
+
+def _pipeline(settings, args=None):
+    """The transpiler, rewriters, transformers, post rewriters and args that
+    _transpile_one takes, with the language independent rewriters added"""
+    transpiler = settings.transpiler
     language = transpiler.NAME
     generic_rewriters = [
         ComplexDestructuringRewriter(language),
@@ -104,54 +347,433 @@ def _transpile(
     if settings.ext != ".py":
         generic_post_rewriters.append(LoopElseRewriter(language))
 
-    rewriters = generic_rewriters + rewriters
-    post_rewriters = generic_post_rewriters + post_rewriters
+    rewriters = generic_rewriters + settings.rewriters
+    post_rewriters = generic_post_rewriters + settings.post_rewriters
+    return (transpiler, rewriters, settings.transformers, post_rewriters, args)
+
+
+def _transpile_checked(trees, tree, pipeline, _suppress_exceptions, profile=None):
+    """Run _transpile_one, turning suppressed exceptions into an error line.
+
+    Returns a tuple of (output, error); error is None on success.
+    """
+    filename = tree.__file__
+    file_profile = None if profile is None else profile.file(filename)
+    try:
+        output = _transpile_one(trees, tree, *_fresh_pipeline(pipeline), file_profile)
+        return output, None
+    except Exception as e:
+        import traceback
+
+        formatted_lines = traceback.format_exc().splitlines()
+        if isinstance(e, AstErrorBase):
+            error = f"{filename}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}"
+        else:
+            error = f"{filename}: {formatted_lines[-1]}"
+        if not _suppress_exceptions or not isinstance(e, _suppress_exceptions):
+            print(error)
+            raise
+        return "FAILED", error
+
+
+def _fresh_pipeline(pipeline):
+    """Copy the rewriters so that each module starts from their initial state.
+
+    Some rewriters number the temporaries they introduce; sharing them across
+    modules would make a module's output depend on the modules transpiled
+    before it.
+    """
+    transpiler, rewriters, transformers, post_rewriters, args = pipeline
+    rewriters, post_rewriters = copy.deepcopy((rewriters, post_rewriters))
+    return transpiler, rewriters, transformers, post_rewriters, args
+
+
+def _can_fork():
+    # The worker pool inherits settings (which hold lambdas and so can't be
+    # pickled) from the parent, so it needs the fork start method.
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _analysis_prerequisites(trees):
+    """For each module, the modules whose analysed trees it reads.
+
+    VariableTransformer resolves `from m import name` against the already
+    analysed tree of m, matching m either as a dotted module path or as a bare
+    file stem. In the serial pipeline that tree has been through
+    _transpile_one only if m precedes the importer in topological order, so
+    only those edges are followed. The result lists filenames in topological
+    order.
+    """
+    imports = {t.__file__: _imported_modules(t) for t in trees}
+    return _prerequisites_of([t.__file__ for t in trees], imports)
+
+
+def _prerequisites_of(order, imports):
+    """_analysis_prerequisites() of the modules of order, which is topological,
+    given the _imported_modules() of each"""
+    tables = _import_tables(order)
+    position = {filename: i for i, filename in enumerate(order)}
+    prerequisites = {}
+    for filename in order:
+        imported = _resolve_imports(tables, *imports[filename])
+        earlier = [dep for dep in imported if position[dep] < position[filename]]
+        prerequisites[filename] = sorted(earlier, key=position.get)
+    return prerequisites
+
+
+def _exported_modules(prerequisites):
+    """The modules that others read the trees of, and so that get an export
+    stub once transpiled, given the _analysis_prerequisites() of each"""
+    exported = set()
+    for deps in prerequisites.values():
+        exported.update(deps)
+    return exported
+
+
+def _imported_modules(tree):
+    """Modules named by the imports in tree.
+
+    Returns a tuple of the modules named by `from m import ...` statements and
+    those named by `import m` statements.
+    """
+    from_imports = []
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            from_imports.append(node.module)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(alias.name)
+    return from_imports, imports
+
+
+def _import_tables(filenames):
+    """Tables mapping dotted module paths and bare file stems to filenames."""
+    by_module = {module_for_path(f): f for f in filenames}
+    by_stem = {f.stem: f for f in filenames}
+    return by_module, by_stem
+
+
+def _resolve_imports(tables, from_imports, imports):
+    """The filenames that the imported modules refer to."""
+    by_module, by_stem = tables
+    resolved = set()
+    for module in from_imports:
+        for table in (by_module, by_stem):
+            if module in table:
+                resolved.add(table[module])
+    for module in imports:
+        if module in by_module:
+            resolved.add(by_module[module])
+    return resolved
+
+
+def _rerun_prerequisites(filename, prerequisites, rerun, position):
+    """The modules of rerun whose trees filename reads, directly or through
+    other modules of rerun, in topological order"""
+    found = set()
+    stack = [filename]
+    while stack:
+        for dep in prerequisites[stack.pop()]:
+            if dep in rerun and dep not in found:
+                found.add(dep)
+                stack.append(dep)
+    return sorted(found, key=position.get)
+
+
+class _SharedPickler(pickle.Pickler):
+    """Pickles the objects of shared as their ids.
+
+    A process forked from the one holding shared inherits its objects at the
+    same ids, so what it pickles refers to them rather than copying them.
+    """
+
+    def __init__(self, file, shared):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._shared = shared
+
+    def persistent_id(self, obj):
+        if id(obj) in self._shared:
+            return id(obj)
+        return None
+
+
+class _SharedUnpickler(pickle.Unpickler):
+    """Unpickles what _SharedPickler pickled, with the objects of shared"""
+
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        return self._shared[pid]
+
+
+def _dumps_shared(obj, shared):
+    buffer = BytesIO()
+    _SharedPickler(buffer, shared).dump(obj)
+    return buffer.getvalue()
+
+
+def _share(stub, shared):
+    """Add the objects of the export stub to shared"""
+    shared[id(stub.exports)] = stub.exports
+    for obj in stub.exports.objects:
+        shared[id(obj)] = obj
+
+
+def _transpile_forked(
+    sender, trees, index, rerun, pipeline, _suppress_exceptions, exported, shared
+):
+    """Transpile trees[index] in a forked worker, sending its output, error
+    and export stub back through sender, or the exception it raised.
+
+    The worker inherits the trees of the parent, with the export stubs of the
+    modules done so far. The modules at the indexes in rerun have no stub
+    there and are transpiled again first, leaving their stubs, or their
+    partially analysed trees if they fail, as the serial pipeline would. The
+    stub is only built if exported, and its objects that were inherited from
+    shared are sent as references to them.
+    """
+    for i in rerun:
+        try:
+            _transpile_one(trees, trees[i], *_fresh_pipeline(pipeline))
+            trees[i] = _export_stub(trees[i])
+        except Exception:
+            # Reported by the worker that transpiled this module
+            pass
+    tree = trees[index]
+    try:
+        output, error = _transpile_checked(trees, tree, pipeline, _suppress_exceptions)
+        stub = None
+        if error is None and exported:
+            stub = _export_stub(tree)
+        result = (output, error, stub)
+    except Exception as e:
+        result = e
+    try:
+        data = _dumps_shared(result, shared)
+    except Exception:
+        if isinstance(result, Exception):
+            result = RuntimeError(f"{tree.__file__}: {result}")
+        else:
+            # The stub refers to something that can't be pickled, such as a
+            # setting, so the workers of its importers transpile it again
+            result = (output, error, None)
+        data = _dumps_shared(result, shared)
+    sender.send_bytes(data)
+    sender.close()
+
+
+def _reap(worker):
+    """Wait for the forked worker to exit, returning its exit code"""
+    worker.join(None)
+    exitcode = worker.exitcode
+    worker.close()
+    return exitcode
+
+
+def _transpile_parallel(trees, pipeline, jobs, _suppress_exceptions):
+    """Transpile trees on up to jobs forked workers, scheduling them in
+    dependency waves.
+
+    Each module is transpiled once, by a worker forked as soon as the modules
+    it imports are done, which so inherits their export stubs. The stub of
+    each module a later one imports is sent back and replaces its tree, for
+    the workers forked after it. Returns a dict of the (output, error) of
+    each filename, as _transpile_trees does.
+
+    Modules that failed or whose stub could not be sent back are transpiled
+    again by the workers of the modules importing them.
+    """
+    prerequisites = _analysis_prerequisites(trees)
+    exported = _exported_modules(prerequisites)
+    position = {t.__file__: i for i, t in enumerate(trees)}
+    by_module = {module_for_path(t.__file__): t.__file__ for t in trees}
+    sorter = TopologicalSorter(get_dependencies(trees))
+    sorter.prepare()
+    context = multiprocessing.get_context("fork")
+    # The objects of the export stubs received, by id
+    shared = {}
+    rerun = set()
     outputs = {}
-    successful = []
-    for filename, tree in zip(topo_filenames, trees):
+    ready = []
+    running = {}
+    try:
+        while sorter.is_active():
+            ready.extend(sorter.get_ready())
+            while ready and len(running) < jobs:
+                module = ready.pop(0)
+                filename = by_module[module]
+                again = _rerun_prerequisites(filename, prerequisites, rerun, position)
+                receiver, sender = context.Pipe(duplex=False)
+                worker = context.Process(
+                    target=_transpile_forked,
+                    args=(
+                        sender,
+                        trees,
+                        position[filename],
+                        [position[f] for f in again],
+                        pipeline,
+                        _suppress_exceptions,
+                        filename in exported,
+                        shared,
+                    ),
+                )
+                worker.start()
+                sender.close()
+                running[receiver] = (module, worker)
+            for receiver in multiprocessing.connection.wait(list(running)):
+                module, worker = running.pop(receiver)
+                filename = by_module[module]
+                try:
+                    data = receiver.recv_bytes()
+                except EOFError:
+                    data = None
+                receiver.close()
+                exitcode = _reap(worker)
+                if data is None:
+                    raise RuntimeError(
+                        f"{filename}: worker exited with code {exitcode}"
+                    )
+                result = _SharedUnpickler(BytesIO(data), shared).load()
+                if isinstance(result, Exception):
+                    raise result
+                output, error, stub = result
+                outputs[filename] = (output, error)
+                if stub is not None:
+                    trees[position[filename]] = stub
+                    _share(stub, shared)
+                elif error is not None or filename in exported:
+                    rerun.add(filename)
+                sorter.done(module)
+    finally:
+        for receiver, task in running.items():
+            task[1].terminate()
+            _reap(task[1])
+            receiver.close()
+    return outputs
+
+
+# State of the --targets worker pool, inherited by the forked workers
+_worker_state = {}
+
+
+def _target_worker(index):
+    """Transpile every module into the language of one target in a pool
+    worker.
+
+    The first target a worker runs takes the trees parsed before the fork,
+    which the worker has its own copy of. Those are used up by then, so any
+    later target run by the same worker parses the modules again.
+    """
+    trees = _worker_state.pop("trees", None)
+    if trees is None:
+        sources = _worker_state["sources"]
+        trees = [_parse(f, sources[f]) for f in _worker_state["order"]]
+    pipeline = _pipeline(_worker_state["targets"][index], _worker_state["args"])
+    return _transpile_trees(trees, pipeline, _worker_state["suppress"])
+
+
+def _transpile_targets(
+    filenames: List[Path],
+    sources: List[str],
+    targets: List[LanguageSettings],
+    args: Optional[argparse.Namespace] = None,
+    _suppress_exceptions=Exception,
+    jobs: int = 1,
+):
+    """Transpile the same modules into the language of each of targets.
+
+    The modules are parsed and put in topological order once. With jobs > 1
+    the targets are transpiled in parallel by forked workers, which start
+    from a copy of those trees without copying them in the parent. Otherwise
+    the targets run one after the other and each one after the first parses
+    the modules again, which is cheaper than copying the trees.
+
+    Returns the outputs and successful filenames of each target, as
+    _transpile does.
+    """
+    trees = _parse_sorted(filenames, sources)
+    topo_filenames = [t.__file__ for t in trees]
+    source_of = dict(zip(filenames, sources))
+    if jobs > 1 and len(targets) > 1 and _can_fork():
+        _worker_state["trees"] = trees
+        _worker_state["sources"] = source_of
+        _worker_state["order"] = topo_filenames
+        _worker_state["targets"] = targets
+        _worker_state["args"] = args
+        _worker_state["suppress"] = _suppress_exceptions
         try:
-            output = _transpile_one(
-                trees, tree, transpiler, rewriters, transformers, post_rewriters, args
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(targets)),
+                mp_context=multiprocessing.get_context("fork"),
+            ) as pool:
+                target_outputs = list(pool.map(_target_worker, range(len(targets))))
+        finally:
+            _worker_state.clear()
+    else:
+        target_outputs = []
+        for i, settings in enumerate(targets):
+            if i > 0:
+                trees = [_parse(f, source_of[f]) for f in topo_filenames]
+            pipeline = _pipeline(settings, args)
+            target_outputs.append(
+                _transpile_trees(trees, pipeline, _suppress_exceptions)
             )
-            successful.append(filename)
-            outputs[filename] = output
-        except Exception as e:
-            import traceback
-
-            formatted_lines = traceback.format_exc().splitlines()
-            if isinstance(e, AstErrorBase):
-                print(f"{filename}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}")
-            else:
-                print(f"{filename}: {formatted_lines[-1]}")
-            if not _suppress_exceptions or not isinstance(e, _suppress_exceptions):
-                raise
-            outputs[filename] = "FAILED"
-    # return output in the same order as input
-    output_list = [outputs[f] for f in filenames]
-    return output_list, successful
+    results = []
+    for settings, outputs in zip(targets, target_outputs):
+        if any(error is not None for _, error in outputs.values()):
+            print(f"{settings.display_name}:")
+        results.append(_collect_outputs(filenames, topo_filenames, outputs))
+    return results
 
 
 def _transpile_one(
-    trees, tree, transpiler, rewriters, transformers, post_rewriters, args
+    trees,
+    tree,
+    transpiler,
+    rewriters,
+    transformers,
+    post_rewriters,
+    args,
+    profile: Optional[FileProfile] = None,
 ):
     # This is very basic and needs to be run before and after
-    # rewrites. Revisit if running it twice becomes a perf issue
-    add_scope_context(tree)
+    # rewrites. The rerun after the post rewriters is incremental
+    _timed(profile, "scope", add_scope_context, tree)
     # Language specific rewriters
     for rewriter in rewriters:
-        tree = rewriter.visit(tree)
+        name = f"rewriters.{type(rewriter).__name__}"
+        tree = _timed(profile, name, rewriter.visit, tree)
     # Language independent core transformers
-    tree, infer_meta = core_transformers(tree, trees, args)
+    tree, infer_meta = core_transformers(tree, trees, args, _prefixed(profile, "core"))
+    analysed = tree
+    snapshot = _timed(profile, "snapshot", _statement_nodes, tree)
     # Language specific transformers
     for tx in transformers:
-        tx(tree)
+        name = f"transformers.{getattr(tx, 'func', tx).__name__}"
+        _timed(profile, name, tx, tree)
     # Language specific rewriters that depend on previous steps
     for rewriter in post_rewriters:
-        tree = rewriter.visit(tree)
-    # Rerun core transformers
-    tree, infer_meta = core_transformers(tree, trees, args)
+        name = f"post_rewriters.{type(rewriter).__name__}"
+        tree = _timed(profile, name, rewriter.visit, tree)
+    # Rerun core transformers over what the rewriters changed, or over the
+    # whole tree when debugging the incremental rerun
+    reanalysis = _prefixed(profile, "reanalyse")
+    if tree is analysed and not getattr(args, "full_reanalysis", False):
+        changed, removed = _timed(
+            reanalysis, "changes", _changed_statements, tree, snapshot
+        )
+        tree, infer_meta = reanalyse(tree, trees, args, changed, removed, reanalysis)
+    else:
+        tree, infer_meta = core_transformers(tree, trees, args, reanalysis)
     out = []
-    code = transpiler.visit(tree) + "\n"
+    if profile is None:
+        code = transpiler.visit(tree) + "\n"
+    else:
+        with profile.instrument(transpiler):
+            code = profile.call("transpiler", transpiler.visit, tree) + "\n"
     headers = transpiler.headers(infer_meta)
     features = transpiler.features()
     if features:
@@ -243,7 +865,53 @@ def _get_output_path(filename, ext, outdir):
     return output_path
 
 
-def _process_one(settings: LanguageSettings, filename: Path, outdir: str, args, env):
+def _write_if_changed(output_path, output):
+    """Write output to output_path unless the file holds it already, so that
+    its mtime only changes with its content"""
+    try:
+        with open(output_path) as f:
+            if f.read() == output:
+                return
+    except (OSError, ValueError):
+        pass
+    with open(output_path, "w") as f:
+        f.write(output)
+
+
+def _write_unformatted(output_path, output):
+    """Write output to a file of the same name in a temporary directory next
+    to output_path, to be formatted there, and return its path for
+    _replace_if_changed"""
+    staging = tempfile.mkdtemp(prefix=".py2many-", dir=output_path.parent)
+    # Relative like output_path, for ktlint
+    staged = output_path.parent / os.path.basename(staging) / output_path.name
+    with open(staged, "w") as f:
+        f.write(output)
+    return staged
+
+
+def _replace_if_changed(output_path, staged):
+    """Move the file _write_unformatted staged to output_path, unless
+    output_path holds its content already, so that its mtime only changes
+    with its content, and return that content"""
+    with open(staged) as f:
+        formatted = f.read()
+    try:
+        with open(output_path) as f:
+            unchanged = f.read() == formatted
+    except (OSError, ValueError):
+        unchanged = False
+    if unchanged:
+        os.remove(staged)
+    else:
+        os.replace(staged, output_path)
+    os.rmdir(staged.parent)
+    return formatted
+
+
+def _process_one(
+    settings: LanguageSettings, filename: Path, outdir: str, args, env, profile=None
+):
     """Transpile and reformat.
 
     Returns False if reformatter failed.
@@ -255,7 +923,15 @@ def _process_one(settings: LanguageSettings, filename: Path, outdir: str, args,
 
     if filename.name == STDIN:
         # special case for simple pipes
-        output = _process_one_data(sys.stdin.read(), Path("test.py"), settings)
+        source_data = sys.stdin.read()
+        if profile is None:
+            output = _process_one_data(source_data, Path("test.py"), settings)
+        else:
+            # Not from the cache of _process_one_data, so the passes run
+            result = _transpile(
+                [Path("test.py")], [source_data], settings, profile=profile
+            )
+            output = result[0][0]
         tmp_name = None
         try:
             with tempfile.NamedTemporaryFile(suffix=settings.ext, delete=False) as f:
@@ -281,17 +957,29 @@ def _process_one(settings: LanguageSettings, filename: Path, outdir: str, args,
     if dunder_init and not source_data:
         print("Detected empty __init__; skipping")
         return True
-    result = _transpile([filename], [source_data], settings, args)
-    with open(output_path, "wb") as f:
-        f.write(result[0][0].encode("utf-8"))
-
-    if settings.formatter:
-        return _format_one(settings, output_path, env)
+    result = _transpile([filename], [source_data], settings, args, profile=profile)
+    output = result[0][0]
+    if not settings.formatter:
+        _write_if_changed(output_path, output)
+        return True
 
-    return True
+    staged = _write_unformatted(output_path, output)
+    formatted = _format_one(settings, staged, env)
+    _replace_if_changed(output_path, staged)
+    return formatted
 
 
 def _format_one(settings, output_path, env=None):
+    if settings.format_worker:
+        worker = get_worker(settings.format_worker, env)
+        formatted = None
+        if worker is not None:
+            formatted = worker.format(os.path.abspath(output_path))
+        if formatted is not None:
+            if not formatted:
+                print(f"Error: {settings.format_worker}: {worker.error}")
+            return formatted
+        # Run the formatter on its own, as when there is no worker
     try:
         restore_cwd = False
         if settings.ext == ".kt" and output_path.parts[0] == "..":
@@ -300,7 +988,7 @@ def _format_one(settings, output_path, env=None):
 
             os.chdir(output_path.parent)
             output_path = output_path.name
-        cmd = _create_cmd(settings.formatter, filename=output_path)
+        cmd = _create_cmd(_formatter_of(settings), filename=output_path)
         proc = _run(cmd, env=env, capture_output=True)
 
         if proc.returncode:
@@ -340,11 +1028,93 @@ def _format_one(settings, output_path, env=None):
     return True
 
 
+def _formatter_of(settings):
+    """The formatter command of settings, worked out if need be"""
+    if settings.resolve_formatter is not None:
+        return settings.resolve_formatter()
+    return settings.formatter
+
+
+def _format_many(settings, output_paths, env=None, jobs=1):
+    """Format output_paths, returning the set of those that failed to format.
+
+    Formatters that accept many files are run on batches of paths. A batch
+    that fails is formatted again one file at a time, so that errors are
+    attributed to the files that caused them. Other formatters are run once
+    per file on a pool of up to jobs threads.
+    """
+    failed = set()
+    retry = []
+    if settings.batch_format:
+        batches = []
+        for path in output_paths:
+            if not batches or len(batches[-1]) == FORMAT_BATCH_SIZE:
+                batches.append([])
+            batches[-1].append(path)
+        for batch in batches:
+            if not _format_batch(settings, batch, env):
+                retry.extend(batch)
+    else:
+        retry = output_paths
+
+    # ktlint is run from the output directory, which can't be changed per
+    # thread, and a formatter worker formats one file at a time
+    if (
+        jobs > 1
+        and len(retry) > 1
+        and settings.ext != ".kt"
+        and not settings.format_worker
+    ):
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(lambda path: _format_one(settings, path, env), retry)
+            for path, ok in zip(retry, list(results)):
+                if not ok:
+                    failed.add(path)
+    else:
+        for path in retry:
+            if not _format_one(settings, path, env):
+                failed.add(path)
+    return failed
+
+
+def _format_batch(settings, batch, env=None):
+    """Run the formatter once over the paths of batch, returning whether it
+    succeeded"""
+    cwd = None
+    paths = [str(path) for path in batch]
+    rounds = 1
+    if settings.ext == ".kt":
+        # ktlint can not handle absolute paths or relative ones starting with
+        # .., so it is run from the directory the paths have in common
+        parents = [os.path.abspath(Path(path).parent) for path in batch]
+        cwd = os.path.commonpath(parents)
+        paths = [os.path.relpath(os.path.abspath(path), cwd) for path in batch]
+        # ktlint formatter needs to be invoked twice before output is lint free
+        rounds = 2
+    cmd = _formatter_of(settings) + paths
+    for _ in range(rounds):
+        try:
+            proc = _run(cmd, env=env, capture_output=True, cwd=cwd)
+        except Exception:
+            return False
+        if proc.returncode:
+            return False
+    return True
+
+
 FileSet = Set[Path]
 
 
 def _process_many(
-    settings, basedir, filenames, outdir, env=None, _suppress_exceptions=Exception
+    settings,
+    basedir,
+    filenames,
+    outdir,
+    env=None,
+    _suppress_exceptions=Exception,
+    jobs=1,
+    cache: Optional[TranspileCache] = None,
+    profile: Optional[PassProfile] = None,
 ) -> Tuple[FileSet, FileSet]:
     """Transpile and reformat many files."""
 
@@ -356,45 +1126,361 @@ def _process_many(
         with open(basedir / filename) as f:
             source_data.append(f.read())
 
-    outputs, successful = _transpile(
-        filenames, source_data, settings, _suppress_exceptions=_suppress_exceptions
+    if cache is None:
+        outputs, successful = _transpile(
+            filenames,
+            source_data,
+            settings,
+            _suppress_exceptions=_suppress_exceptions,
+            jobs=jobs,
+            profile=profile,
+        )
+        keys, entries = {}, {}
+    else:
+        outputs, successful, keys, entries = _transpile_cached(
+            filenames, source_data, settings, cache, _suppress_exceptions, jobs, profile
+        )
+
+    successful = set(successful)
+    format_errors = _write_outputs(
+        settings,
+        filenames,
+        outputs,
+        successful,
+        outdir,
+        env,
+        jobs,
+        cache,
+        keys,
+        entries,
     )
 
-    output_paths = [
-        _get_output_path(filename, settings.ext, outdir) for filename in filenames
-    ]
-    for filename, output, output_path in zip(filenames, outputs, output_paths):
-        with open(output_path, "w") as f:
-            f.write(output)
+    if cache is not None:
+        cache.evict()
+    return (successful, format_errors)
+
+
+def _write_outputs(
+    settings,
+    filenames,
+    outputs,
+    successful,
+    outdir,
+    env=None,
+    jobs=1,
+    cache=None,
+    keys=None,
+    entries=None,
+) -> FileSet:
+    """Write the outputs of filenames to outdir and format the successful
+    ones, returning those that failed to format.
+
+    Outputs are formatted in a temporary file and replace the files that
+    don't hold what they formatted to already, so that the mtimes of the
+    others don't change. Given a cache, outputs with a formatted version in
+    their cache entry are written as such, and so are not formatted, like
+    those the FormatRecord kept in cache finds formatted on disk already. The
+    formatted outputs of the others are cached under their keys. Without a
+    cache, every output is formatted.
+    """
+    keys = keys or {}
+    entries = entries or {}
+    record = None
+    if settings.formatter and cache is not None:
+        record = cache.format_record(outdir, settings.formatter)
+    to_format = {}
+    for filename, output in zip(filenames, outputs):
+        output_path = _get_output_path(filename, settings.ext, outdir)
+        entry = entries.get(filename, {})
+        if not settings.formatter or filename not in successful:
+            _write_if_changed(output_path, output)
+        elif "formatted" in entry:
+            _write_if_changed(output_path, entry["formatted"])
+            record.add(output_path, output, entry["formatted"])
+        elif record is not None and record.is_formatted(output_path, output):
+            if filename in keys:
+                cache.put_output(keys[filename], output, output_path.read_text())
+        else:
+            staged = _write_unformatted(output_path, output)
+            to_format[output_path] = (filename, output, staged)
 
-    successful = set(successful)
     format_errors = set()
     if settings.formatter:
-        # TODO: Optimize to a single invocation
-        for filename, output_path in zip(filenames, output_paths):
-            if filename in successful and not _format_one(settings, output_path, env):
-                format_errors.add(Path(filename))
+        format_errors = _format_outputs(settings, to_format, record, env, jobs)
+        for output_path, (filename, output, _) in to_format.items():
+            if filename in keys and filename not in format_errors:
+                cache.put_output(keys[filename], output, output_path.read_text())
+    if record is not None:
+        record.save()
+    return format_errors
+
+
+def _process_stream(
+    settings,
+    basedir,
+    filenames,
+    outdir,
+    env=None,
+    _suppress_exceptions=Exception,
+    profile=None,
+) -> Tuple[FileSet, FileSet]:
+    """Transpile and reformat many files one module at a time.
 
+    Modules are parsed when their turn comes in topological order and each
+    output is written as soon as it is transpiled, so that of the modules
+    done only the export tables their importers read stay in memory.
+    Outputs are formatted in batches as they are written.
+    """
+    settings.transpiler.set_continue_on_unimplemented()
+
+    imports = {}
+
+    def parse(filename):
+        with open(basedir / filename) as f:
+            tree = ast.parse(f.read())
+        tree.__file__ = filename
+        imports[filename] = _imported_modules(tree)
+        return tree
+
+    order = toposort_paths(filenames, parse)
+    exported = _exported_modules(_prerequisites_of(order, imports))
+    pipeline = _pipeline(settings)
+    # Stand-ins for the modules not transpiled yet, which are still unanalysed
+    # when their importers are in _transpile, and for those no other module
+    # reads once transpiled
+    trees = [_stand_in(filename) for filename in order]
+    batch_size = FORMAT_BATCH_SIZE if settings.batch_format else 1
+    successful = set()
+    format_errors = set()
+    to_format = {}
+    for i, filename in enumerate(order):
+        trees[i] = parse(filename)
+        output, error = _transpile_checked(
+            trees, trees[i], pipeline, _suppress_exceptions, profile
+        )
+        if error is None and filename in exported:
+            trees[i] = _export_stub(trees[i])
+        elif error is None:
+            trees[i] = _stand_in(filename)
+        output_path = _get_output_path(filename, settings.ext, outdir)
+        if error is not None:
+            _write_if_changed(output_path, output)
+            print(error)
+            continue
+        successful.add(filename)
+        if not settings.formatter:
+            _write_if_changed(output_path, output)
+            continue
+        staged = _write_unformatted(output_path, output)
+        to_format[output_path] = (filename, output, staged)
+        if len(to_format) == batch_size:
+            format_errors |= _format_outputs(settings, to_format, None, env)
+            to_format = {}
+    if to_format:
+        format_errors |= _format_outputs(settings, to_format, None, env)
+
+    peak = _peak_rss()
+    if peak is not None:
+        print(f"Peak RSS: {peak / (1024 * 1024):.1f} MiB")
     return (successful, format_errors)
 
 
+def _stand_in(filename):
+    tree = ast.Module(body=[], type_ignores=[])
+    tree.__file__ = filename
+    return tree
+
+
+def _format_outputs(settings, to_format, record, env, jobs=1):
+    """Format the output paths to_format maps to their inputs, unformatted
+    outputs and the files those were staged in, returning the inputs whose
+    outputs failed to format.
+
+    The outputs that formatted are added to record if given.
+    """
+    staged = [path for _, _, path in to_format.values()]
+    failed = _format_many(settings, staged, env, jobs)
+    format_errors = set()
+    for output_path, (filename, output, path) in to_format.items():
+        formatted = _replace_if_changed(output_path, path)
+        if path in failed:
+            format_errors.add(Path(filename))
+        elif record is not None:
+            record.add(output_path, output, formatted)
+    return format_errors
+
+
+def _peak_rss():
+    """The peak resident set size of this process in bytes, or None where it
+    can't be measured"""
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In KiB, except on macOS
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def _transpile_cached(
+    filenames, sources, settings, cache, _suppress_exceptions, jobs, profile=None
+):
+    """Transpile the files that have no usable entry in cache.
+
+    An entry is keyed by the settings, the file and the content of every
+    module in its import closure, so editing a module invalidates the entries
+    of the modules that import it. Misses are transpiled along with their
+    import closure, which the analysis of imported names needs.
+
+    Returns the outputs and successful filenames as _transpile does, the cache
+    keys of the successful files and the cache entries of the hits.
+    """
+    hashes = {f: hash_text(source) for f, source in zip(filenames, sources)}
+    tables = _import_tables(filenames)
+    imported = {}
+    for filename, source in zip(filenames, sources):
+        modules = cache.imports(
+            source, hashes[filename], lambda s: _imported_modules(ast.parse(s))
+        )
+        imported[filename] = _resolve_imports(tables, *modules)
+
+    settings_key = settings.cache_key()
+    closures = {}
+    keys = {}
+    entries = {}
+    for filename in filenames:
+        closure = set()
+        stack = [filename]
+        while stack:
+            for dep in imported[stack.pop()]:
+                if dep not in closure:
+                    closure.add(dep)
+                    stack.append(dep)
+        closure.discard(filename)
+        closures[filename] = closure
+        parts = [settings_key, str(filename), hashes[filename]]
+        for dep in sorted(closure):
+            parts.append(f"{dep}:{hashes[dep]}")
+        keys[filename] = cache.key(*parts)
+        entry = cache.get(keys[filename])
+        if entry is not None:
+            entries[filename] = entry
+
+    misses = [f for f in filenames if f not in entries]
+    print(f"Cache: {len(entries)} hits, {len(misses)} misses")
+    needed = set(misses)
+    for filename in misses:
+        needed.update(closures[filename])
+    subset = [(f, s) for f, s in zip(filenames, sources) if f in needed]
+    transpiled = {}
+    successful = []
+    if subset:
+        subset_filenames, subset_sources = zip(*subset)
+        subset_outputs, subset_successful = _transpile(
+            list(subset_filenames),
+            list(subset_sources),
+            settings,
+            _suppress_exceptions=_suppress_exceptions,
+            jobs=jobs,
+            profile=profile,
+        )
+        transpiled = dict(zip(subset_filenames, subset_outputs))
+        successful = [f for f in subset_successful if f not in entries]
+    successful += list(entries)
+
+    for filename in successful:
+        if filename not in entries:
+            cache.put_output(keys[filename], transpiled[filename])
+    outputs = [
+        entries[f]["output"] if f in entries else transpiled[f] for f in filenames
+    ]
+    keys = {f: keys[f] for f in successful}
+    return outputs, successful, keys, entries
+
+
 def _process_dir(
-    settings, source, outdir, project, env=None, _suppress_exceptions=Exception
+    settings,
+    source,
+    outdir,
+    project,
+    env=None,
+    _suppress_exceptions=Exception,
+    jobs=1,
+    cache=None,
+    stream=False,
+    profile=None,
+    watch=False,
 ):
+    """Transpile the python files under source to outdir. With watch, keep
+    transpiling the ones that change afterwards, until interrupted"""
     print(f"Transpiling whole directory to {outdir}:")
 
+    outdir = _project_outdir(settings, outdir, project, env)
+    if outdir is None:
+        return (set(), set(), set())
+
+    input_paths = _find_inputs(source, [outdir])
+
+    watcher = None
+    if watch:
+        from . import watch as watch_module
+
+        watcher = watch_module.ModuleWatcher(settings, source, outdir, env)
+        _, successful, format_errors = watcher.update(*watcher.changes())
+    elif stream:
+        successful, format_errors = _process_stream(
+            settings,
+            source,
+            input_paths,
+            outdir,
+            env=env,
+            _suppress_exceptions=_suppress_exceptions,
+            profile=profile,
+        )
+    else:
+        successful, format_errors = _process_many(
+            settings,
+            source,
+            input_paths,
+            outdir,
+            env=env,
+            _suppress_exceptions=_suppress_exceptions,
+            jobs=jobs,
+            cache=cache,
+            profile=profile,
+        )
+    if settings.ext == ".v":
+        _write_v_project_manifest(outdir)
+    failures = set(input_paths) - set(successful)
+
+    print("\nFinished!")
+    _print_summary(successful, format_errors, failures)
+    if watcher is not None:
+        watch_module.watch(watcher)
+    return (successful, format_errors, failures)
+
+
+def _project_outdir(settings, outdir, project, env=None):
+    """Create the project of settings in outdir if it has one, returning the
+    directory its sources go in, or None if the project can't be created"""
     if settings.create_project is not None and project:
         cmd = settings.create_project + [f"{outdir}"]
         proc = _run(cmd, env=env, capture_output=True)
         if proc.returncode:
             cmd_str = " ".join(cmd)
             print(f"Error: running {cmd_str}: {proc.stderr}")
-            return (set(), set(), set())
+            return None
         if settings.project_subdir is not None:
             outdir = outdir / settings.project_subdir
+    return outdir
 
-    successful = []
-    failures = []
+
+def _find_inputs(source, outdirs):
+    """The python files under source, relative to it, creating the
+    directories their outputs go in under each of outdirs"""
     input_paths = []
     for path in source.rglob("*.py"):
         if path.suffix != ".py":
@@ -403,30 +1489,79 @@ def _process_dir(
             continue
 
         relative_path = path.relative_to(source)
-        target_path = outdir / relative_path
-        target_dir = target_path.parent
-        os.makedirs(target_dir, exist_ok=True)
+        for outdir in outdirs:
+            target_path = outdir / relative_path
+            target_dir = target_path.parent
+            os.makedirs(target_dir, exist_ok=True)
         input_paths.append(relative_path)
+    return input_paths
 
-    successful, format_errors = _process_many(
-        settings,
-        source,
-        input_paths,
-        outdir,
-        env=env,
-        _suppress_exceptions=_suppress_exceptions,
-    )
-    if settings.ext == ".v":
-        _write_v_project_manifest(outdir)
-    failures = set(input_paths) - set(successful)
 
-    print("\nFinished!")
+def _print_summary(successful, format_errors, failures):
     print(f"Successful: {len(successful)}")
     if format_errors:
         print(f"Failed to reformat: {len(format_errors)}")
     print(f"Failed to convert: {len(failures)}")
     print()
-    return (successful, format_errors, failures)
+
+
+def _process_targets(
+    targets,
+    source,
+    outdir,
+    project,
+    env=None,
+    _suppress_exceptions=Exception,
+    jobs=1,
+    args=None,
+):
+    """Transpile a file or a directory into the language of each of targets,
+    parsing it once.
+
+    Returns the successful, format error and failed inputs of each target.
+    """
+    names = ", ".join([settings.display_name for settings in targets])
+    if source.is_file():
+        print(f"Transpiling {source} to {outdir} in {names}:")
+        basedir = source.parent
+        outdirs = [outdir for _ in targets]
+        input_paths = [Path(source.name)]
+    else:
+        print(f"Transpiling whole directory to {outdir} in {names}:")
+        basedir = source
+        outdirs = [_project_outdir(t, outdir, project, env) for t in targets]
+        input_paths = _find_inputs(source, [d for d in outdirs if d is not None])
+        # Try to flush out as many errors as possible
+        for settings in targets:
+            settings.transpiler.set_continue_on_unimplemented()
+
+    sources = []
+    for filename in input_paths:
+        with open(basedir / filename) as f:
+            sources.append(f.read())
+    results = _transpile_targets(
+        input_paths, sources, targets, args, _suppress_exceptions, jobs
+    )
+
+    print("\nFinished!")
+    summaries = []
+    for settings, target_outdir, (outputs, successful) in zip(
+        targets, outdirs, results
+    ):
+        if target_outdir is None:
+            summaries.append((set(), set(), set()))
+            continue
+        successful = set(successful)
+        format_errors = _write_outputs(
+            settings, input_paths, outputs, successful, target_outdir, env, jobs
+        )
+        if settings.ext == ".v":
+            _write_v_project_manifest(target_outdir)
+        failures = set(input_paths) - successful
+        print(f"{settings.display_name}:")
+        _print_summary(successful, format_errors, failures)
+        summaries.append((successful, format_errors, failures))
+    return summaries
 
 
 def _write_v_project_manifest(outdir):
@@ -443,15 +1578,14 @@ def _write_v_project_manifest(outdir):
         )
 
 
-def main(args=None, env=os.environ):
+def _parser():
     parser = argparse.ArgumentParser()
-    LANGS = _get_all_settings(FAKE_ARGS)
-    for lang, settings in LANGS.items():
+    for lang, backend in BACKENDS.items():
         parser.add_argument(
             f"--{lang}",
             action="store_true",
             default=False,
-            help=f"Generate {settings.display_name} code",
+            help=f"Generate {backend.display_name} code",
         )
     parser.add_argument("--outdir", default=None, help="Output directory")
     parser.add_argument(
@@ -505,6 +1639,13 @@ def main(args=None, env=os.environ):
         default=False,
         help="Use typpete for inference",
     )
+    parser.add_argument(
+        "--full-reanalysis",
+        action="store_true",
+        default=False,
+        help="Rerun every analysis pass on the whole module after rewrites, "
+        "instead of only on the statements they changed (for debugging)",
+    )
     parser.add_argument(
         "--version",
         action="store_true",
@@ -514,6 +1655,55 @@ def main(args=None, env=os.environ):
     parser.add_argument(
         "--project", default=True, help="Create a project when using directory mode"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to transpile and format with in directory mode",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse outputs cached in this directory in directory mode, and "
+        "record what outputs formatted to there, so that they aren't formatted "
+        "again",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_MAX_SIZE // (1024 * 1024),
+        help="Size in MiB past which least recently used cache entries are dropped",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help="In directory mode, transpile and write one module at a time to "
+        "bound memory use, and report the peak RSS",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        default=False,
+        help="With a single directory input, keep running and transpile the "
+        "modules that change, and those importing them, again",
+    )
+    parser.add_argument(
+        "--profile-passes",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="JSON_FILE",
+        help="Record the time, calls and allocations of each pass per file, "
+        "print them as a table and write them to JSON_FILE if given",
+    )
+    parser.add_argument(
+        "--targets",
+        default=None,
+        help="Comma separated languages to generate in one run, reading the "
+        "inputs once, e.g. rust,go,cpp. With --jobs, they are generated in parallel",
+    )
     parser.add_argument(
         "--llm",
         action="store_true",
@@ -526,7 +1716,34 @@ def main(args=None, env=os.environ):
         default="",
         help="LLM Model to use. Configurable other ways too",
     )
-    args, rest = parser.parse_known_args(args=args)
+    return parser
+
+
+def _settings(args, env=os.environ):
+    """The settings of the language selected by args, C++ by default"""
+    settings_func = ALL_SETTINGS["cpp"]
+    for lang, func in ALL_SETTINGS.items():
+        arg = getattr(args, lang)
+        if arg:
+            settings_func = func
+            break
+    settings = settings_func(args, env=env)
+
+    if args.comment_unsupported or not args.strict:
+        settings.transpiler.set_continue_on_unimplemented()
+
+    settings.ignore_formatter_errors = args.ignore_formatter_errors
+    return settings
+
+
+def main(args=None, env=os.environ):
+    return _main(args, env, _settings)
+
+
+def _main(args, env, get_settings):
+    """Run the command line, building the settings with get_settings(args,
+    env=env), which the server replaces with one that reuses them"""
+    args, rest = _parser().parse_known_args(args=args)
 
     if args.version:
         print(__version__)
@@ -537,23 +1754,74 @@ def main(args=None, env=os.environ):
         print("extension supported only with rust via pyo3")
         return -1
 
-    settings_func = ALL_SETTINGS["cpp"]
-    for lang, func in ALL_SETTINGS.items():
-        arg = getattr(args, lang)
-        if arg:
-            settings_func = func
-            break
-    settings = settings_func(args, env=env)
+    if args.stream and (args.jobs > 1 or args.cache_dir is not None):
+        print("--stream supported only without --jobs and --cache-dir")
+        return -1
+
+    if args.cache_dir is not None and any(
+        filename == STDIN or Path(filename).is_file() for filename in rest
+    ):
+        print("--cache-dir supported only with directory inputs")
+        return -1
+
+    targets = []
+    if args.targets is not None:
+        languages = args.targets.split(",")
+        for lang in languages:
+            if lang not in BACKENDS:
+                print(f"Unknown target: {lang}")
+                return -1
+        if args.stream or args.cache_dir is not None or args.suffix is not None:
+            print("--targets supported only without --stream, --cache-dir and --suffix")
+            return -1
+        if args.extension or args.llm or STDIN in rest:
+            print("--targets supported only without --extension, --llm and stdin")
+            return -1
+        for lang in languages:
+            target_args = copy.copy(args)
+            for other in BACKENDS:
+                setattr(target_args, other, False)
+            setattr(target_args, lang, True)
+            targets.append(get_settings(target_args, env=env))
+
+    if args.watch and (
+        targets or args.stream or args.jobs > 1 or args.cache_dir is not None
+    ):
+        print(
+            "--watch supported only without --targets, --stream, --jobs and --cache-dir"
+        )
+        return -1
+    if args.watch and (len(rest) != 1 or not Path(rest[0]).is_dir()):
+        # Watching blocks, so it would never reach any other input
+        print("--watch supported only with a single directory input")
+        return -1
+
+    if args.profile_passes is not None and (
+        args.jobs > 1 or targets or args.llm or args.watch
+    ):
+        print(
+            "--profile-passes supported only without --jobs, --targets, --llm "
+            "and --watch"
+        )
+        return -1
+
+    # Built for the language flags, which --targets replaces
+    settings = None if targets else get_settings(args, env=env)
 
     if args.comment_unsupported:
         print("Wrapping unimplemented in comments")
-        settings.transpiler.set_continue_on_unimplemented()
 
     if not args.strict:
         print("Warning: some code may be experimental and incorrect")
-        settings.transpiler.set_continue_on_unimplemented()
 
-    settings.ignore_formatter_errors = args.ignore_formatter_errors
+    cache = None
+    if args.cache_dir is not None:
+        cache = TranspileCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+
+    profile = None
+    if args.profile_passes is not None:
+        profile = PassProfile()
+        profile.start()
 
     failed = []
     for filename in rest:
@@ -563,10 +1831,34 @@ def main(args=None, env=os.environ):
         else:
             outdir = Path(args.outdir)
 
-        if source.is_file() or source.name == STDIN:
+        if targets:
+            if not source.is_file() and args.outdir is None:
+                outdir = source.parent / f"{source.name}-py2many"
+            if (
+                source.is_file()
+                and not args.force
+                and any(
+                    (outdir / (source.stem + t.ext)).resolve() == source.resolve()
+                    for t in targets
+                )
+            ):
+                print(f"Refusing to overwrite {source}. Use --force to overwrite")
+                rv = False
+            else:
+                target_results = _process_targets(
+                    targets,
+                    source,
+                    outdir,
+                    args.project,
+                    env=env,
+                    jobs=args.jobs,
+                    args=args,
+                )
+                rv = not any(f or e for _, e, f in target_results)
+        elif source.is_file() or source.name == STDIN:
             print(f"Writing to: {outdir}", file=sys.stderr)
             try:
-                rv = _process_one(settings, source, outdir, args, env)
+                rv = _process_one(settings, source, outdir, args, env, profile)
             except Exception as e:
                 import traceback
 
@@ -584,8 +1876,24 @@ def main(args=None, env=os.environ):
                 outdir = source.parent / f"{source.name}-py2many"
 
             successful, format_errors, failures = _process_dir(
-                settings, source, outdir, args.project, env=env
+                settings,
+                source,
+                outdir,
+                args.project,
+                env=env,
+                jobs=args.jobs,
+                cache=cache,
+                stream=args.stream,
+                profile=profile,
+                watch=args.watch,
             )
             rv = not (failures or format_errors)
         failed.append(rv is not True)
+
+    if profile is not None:
+        profile.stop()
+        # The output of stdin goes to stdout
+        print(profile.table(), file=sys.stderr if STDIN in rest else sys.stdout)
+        if args.profile_passes:
+            profile.dump(args.profile_passes)
     return 1 if any(failed) else 0
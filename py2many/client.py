@@ -0,0 +1,57 @@
+"""Run the py2many command line on a running server, if there is one.
+
+Takes the same arguments as py2many. When PY2MANY_SERVER names the socket of
+a server started with `python -m py2many.server --socket PATH`, they are sent
+to it, so that the backends and settings it keeps warm are reused. Otherwise,
+or if the server can't be reached, the command line runs here.
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+
+SERVER_ENV = "PY2MANY_SERVER"
+STDIN = "-"
+
+
+def request(path, message):
+    """Send message to the server listening on path and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def main(args=None, env=os.environ):
+    if args is None:
+        args = list(sys.argv)
+        # The program name
+        args.pop(0)
+    argv = list(args)
+    path = env.get(SERVER_ENV)
+    if path:
+        message = {"argv": argv, "cwd": os.getcwd()}
+        if STDIN in argv:
+            message["stdin"] = sys.stdin.read()
+            # Still there for the command line, should it run here
+            sys.stdin = io.StringIO(message["stdin"])
+        try:
+            response = request(path, message)
+        except (OSError, ValueError):
+            response = {}
+        if "exit_code" in response:
+            sys.stdout.write(response["stdout"])
+            sys.stderr.write(response["stderr"])
+            return response["exit_code"]
+
+    # Only imported when needed, the server has them loaded already
+    from .cli import main as cli_main
+
+    return cli_main(argv, env=env)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import ast
+import builtins
 import importlib
 import io  # noqa: F401
 import logging
@@ -17,7 +18,9 @@ from ctypes import c_uint8 as u8
 from ctypes import c_uint16 as u16
 from ctypes import c_uint32 as u32
 from ctypes import c_uint64 as u64
+from functools import lru_cache, update_wrapper
 from pathlib import Path
+from types import FunctionType
 from typing import (  # noqa: F401
     Any,
     Callable,
@@ -87,18 +90,56 @@ _AUTO_INVOKED = "auto()"
 logger = logging.Logger("py2many")
 
 
-def class_for_typename(typename, default_type, locals=None) -> Union[str, object]:
-    if typename is None:
-        return None
-    if isinstance(typename, str) and (
-        typename == "super" or typename.startswith("super()")
-    ):
-        # Cant eval super; causes RuntimeError
+_UNRESOLVED = object()
+
+# Most typenames the caches below keep, so that they stay bounded in a long
+# running py2many-server
+TYPENAME_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TYPENAME_CACHE_SIZE)
+def _parse_typename(typename: str):
+    """Parse typename, returning the names it reads and, if it is a dotted
+    name, its parts. Returns None if it does not parse."""
+    try:
+        expr = ast.parse(typename, mode="eval").body
+    except SyntaxError:
         return None
+    names = frozenset(n.id for n in ast.walk(expr) if isinstance(n, ast.Name))
+    parts = []
+    while isinstance(expr, ast.Attribute):
+        parts.append(expr.attr)
+        expr = expr.value
+    if not isinstance(expr, ast.Name):
+        return names, None
+    parts.append(expr.id)
+    return names, tuple(reversed(parts))
+
+
+def _eval_typename(typename, locals, parts):
+    """Resolve typename as eval(typename, globals(), locals) would.
+
+    Dotted names are looked up directly; anything else is evaluated.
+    """
+    if parts is None:
+        return eval(typename, globals(), locals)
+    head = parts[0]
+    if locals is not None and head in locals:
+        value = locals[head]
+    elif head in globals():
+        value = globals()[head]
+    elif hasattr(builtins, head):
+        value = getattr(builtins, head)
+    else:
+        raise NameError(head)
+    for i in range(1, len(parts)):
+        value = getattr(value, parts[i])
+    return value
+
+
+def _resolve_typename(typename, locals, parts):
     try:
-        # TODO: take into account any imports happening in the file being parsed
-        # and pass them into eval
-        typeclass = eval(typename, globals(), locals)
+        typeclass = _eval_typename(typename, locals, parts)
         if hasattr(typeclass, "__self__") and not isinstance(
             typeclass.__self__, type(sys)
         ):
@@ -110,7 +151,37 @@ def class_for_typename(typename, default_type, locals=None) -> Union[str, object
         return typeclass
     except (NameError, SyntaxError, AttributeError, TypeError):
         logger.info(f"could not evaluate {typename}")
+        return _UNRESOLVED
+
+
+@lru_cache(maxsize=TYPENAME_CACHE_SIZE)
+def _resolve_unqualified(typename, parts):
+    """Resolve a typename that doesn't refer to a module's imports. eval()
+    always finds the same object for these, so it only runs once for each"""
+    return _resolve_typename(typename, None, parts)
+
+
+def class_for_typename(typename, default_type, locals=None) -> Union[str, object]:
+    if typename is None:
+        return None
+    if isinstance(typename, str) and (
+        typename == "super" or typename.startswith("super()")
+    ):
+        # Cant eval super; causes RuntimeError
+        return None
+    parsed = _parse_typename(typename) if isinstance(typename, str) else None
+    if parsed is None:
+        typeclass = _resolve_typename(typename, locals, None)
+    else:
+        names, parts = parsed
+        if locals and any(name in locals for name in names):
+            # Depends on the imports of the module being transpiled
+            typeclass = _resolve_typename(typename, locals, parts)
+        else:
+            typeclass = _resolve_unqualified(typename, parts)
+    if typeclass is _UNRESOLVED:
         return default_type
+    return typeclass
 
 
 def c_symbol(node):
@@ -119,6 +190,41 @@ def c_symbol(node):
     return symbols[symbol_type]
 
 
+def _node_visitor(method, node_class):
+    def node_visitor(*args, **kwargs):
+        result = method(*args, **kwargs)
+        if isinstance(result, str):
+            return node_class(result)
+        return result
+
+    update_wrapper(node_visitor, method)
+    node_visitor.node_class = node_class
+    return node_visitor
+
+
+def wrap_visitors(cls, node_class):
+    """Make the visit_* and _visit_* methods of cls, inherited ones included,
+    return node_class instead of str.
+
+    The methods are wrapped once, on the class. Those wrapped already are
+    skipped, so that subclasses only wrap the methods they define. Class and
+    static methods are left alone, they are called on the class.
+    """
+    for name in dir(cls):
+        if not (name.startswith("visit_") or name.startswith("_visit_")):
+            continue
+        for klass in cls.__mro__:
+            if name in vars(klass):
+                method = vars(klass)[name]
+                break
+        if not isinstance(method, FunctionType):
+            continue
+        if getattr(method, "node_class", None) is node_class:
+            continue
+        setattr(cls, name, _node_visitor(method, node_class))
+    return cls
+
+
 class CLikeTranspiler(ast.NodeVisitor):
     """Provides a base for C-like programming languages"""
 
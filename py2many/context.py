@@ -1,6 +1,21 @@
 import ast
 
-from .scope import ScopeMixin
+from .scope import ScopeList, ScopeMixin, SymbolIndex
+
+# Attributes holding the statements a node encloses or the variables they
+# define, which export tables empty but for classes, and lookup caches, which
+# they drop
+DETACHED_LISTS = {
+    "body",
+    "orelse",
+    "finalbody",
+    "handlers",
+    "vars",
+    "body_vars",
+    "orelse_vars",
+    "scope_vars",
+}
+DETACHED_CACHES = {"symbol_index", "lookup_index"}
 
 
 def add_list_calls(node):
@@ -8,14 +23,32 @@ def add_list_calls(node):
     return ListCallTransformer().visit(node)
 
 
+def remove_list_calls(nodes):
+    """Drop the calls among nodes, which rewriters removed from the tree, from
+    the lists they were recorded as adding to"""
+    for node in nodes:
+        var = getattr(node, "list_var", None)
+        if var is not None:
+            var.calls.remove(node)
+            node.list_var = None
+
+
 def add_variable_context(node, trees):
     """Provide context to Module and Function Def"""
     return VariableTransformer(trees).visit(node)
 
 
-def add_assignment_context(node):
-    """Annotate nodes on the LHS of an assigment"""
-    return LHSAnnotationTransformer().visit(node)
+def update_variable_context(node, trees, statements):
+    """Refresh the variables some statements of a Module or ClassDef body
+    define, once node itself has been given context"""
+    return VariableTransformer(trees).update(node, statements)
+
+
+def add_export_table(node):
+    """Summarise the names an analysed module defines for the modules that
+    import from it, as node.exports"""
+    node.exports = ExportTable(node)
+    return node
 
 
 class ListCallTransformer(ast.NodeTransformer):
@@ -25,12 +58,23 @@ class ListCallTransformer(ast.NodeTransformer):
     """
 
     def visit_Call(self, node):
+        var = None
         if self.is_list_addition(node):
             var = node.scopes.find(node.func.value.id)
-            if var is not None and self.is_list_assignment(var.assigned_from):
-                if not hasattr(var, "calls"):
-                    var.calls = []
-                var.calls.append(node)
+            if var is not None and not self.is_list_assignment(var.assigned_from):
+                var = None
+        # Visiting a call again, after a rewriter edited it, only moves it
+        # to the list it now adds to
+        recorded = getattr(node, "list_var", None)
+        if recorded is var:
+            return node
+        if recorded is not None:
+            recorded.calls.remove(node)
+        if var is not None:
+            if not hasattr(var, "calls"):
+                var.calls = []
+            var.calls.append(node)
+        node.list_var = var
         return node
 
     def is_list_assignment(self, node):
@@ -54,6 +98,79 @@ class ListCallTransformer(ast.NodeTransformer):
         )
 
 
+class ExportTable(dict):
+    """
+    Maps the names a module defines to summaries of their definitions.
+
+    A summary is a copy of the definition with everything its module inferred
+    about it, but without the statements it encloses. Classes keep theirs, so
+    that importers see their members, with their methods summarised in turn.
+    Summaries are scoped in a module of their own, so they keep none of the
+    module's tree alive. Definitions the module imported are shared with the
+    module they came from. objects lists the copies the summaries are made
+    of, the module they are scoped in included.
+    """
+
+    def __init__(self, node):
+        module = ast.Module(body=[], type_ignores=[])
+        owned = {id(child) for child in ast.walk(node)}
+        # Definitions scoped in node are scoped in module instead
+        copies = {}
+        copies[id(node)] = module
+        summaries = {}
+        for name, definition in SymbolIndex.of(node).definitions.items():
+            if name is not None and definition is not None:
+                summaries[name] = _summarise(definition, owned, copies)
+        super().__init__(summaries)
+        module.__file__ = node.__file__
+        module.exports = self
+        self.module = module
+        module.scopes = ScopeList().push(module)
+        module.vars = list(self.values())
+        module.body = [
+            d for d in module.vars if isinstance(d, (ast.FunctionDef, ast.ClassDef))
+        ]
+        module.imports = _summarise(getattr(node, "imports", []), owned, copies)
+        self.objects = list(copies.values())
+
+
+def _summarise(value, owned, copies):
+    """Copy the nodes in owned that value refers to, and share everything
+    else. copies maps what was copied so far to its copy."""
+    key = id(value)
+    if key in copies:
+        return copies[key]
+    if isinstance(value, ScopeList):
+        copied = ScopeList()
+        for scope in value:
+            copied = copied.push(_summarise(scope, owned, copies))
+    elif isinstance(value, list):
+        copied = []
+        copies[key] = copied
+        copied.extend([_summarise(item, owned, copies) for item in value])
+    elif isinstance(value, dict):
+        copied = {}
+        copies[key] = copied
+        for k, v in value.items():
+            copied[k] = _summarise(v, owned, copies)
+    elif isinstance(value, tuple):
+        copied = tuple([_summarise(item, owned, copies) for item in value])
+    elif isinstance(value, ast.AST) and key in owned:
+        copied = value.__class__()
+        copies[key] = copied
+        # The members of a class are its body and vars
+        detached = () if isinstance(value, ast.ClassDef) else DETACHED_LISTS
+        for attr, attr_value in vars(value).items():
+            if attr in detached:
+                setattr(copied, attr, [])
+            elif attr not in DETACHED_CACHES:
+                setattr(copied, attr, _summarise(attr_value, owned, copies))
+    else:
+        return value
+    copies[key] = copied
+    return copied
+
+
 class VariableTransformer(ast.NodeTransformer, ScopeMixin):
     """Adds all defined variables to scope block"""
 
@@ -80,7 +197,15 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         # So classes are accessible even after they're
         # popped from the scope
         self.scopes[-2].vars.append(node)
-        self.generic_visit(node)
+        for field, value in ast.iter_fields(node):
+            if field == "body":
+                self._visit_statements(node, value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
         return node
 
     def visit_Import(self, node):
@@ -93,7 +218,11 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         names = [n.name for n in node.names]
         if module_path in self._trees:
             m = self._trees[module_path]
-            resolved_names = [m.scopes.find(n) for n in names]
+            if hasattr(m, "exports"):
+                resolved_names = [m.exports.get(n) for n in names]
+            else:
+                # Not done with its own analysis yet, as in an import cycle
+                resolved_names = [m.scopes.find(n) for n in names]
             node.scopes[-1].vars += resolved_names
         return node
 
@@ -124,10 +253,28 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         return node
 
     def visit_Module(self, node):
-        node.vars = []
-        self.generic_visit(node)
+        self._visit_statements(node, node.body)
         return node
 
+    def update(self, node, statements):
+        """Revisit statements of the body of node, keeping the variables the
+        rest of the body defined on the last visit"""
+        self.scopes = list(node.scopes)
+        self._visit_statements(node, statements)
+        return node
+
+    def _visit_statements(self, node, statements):
+        # Each statement of a module or class body remembers the variables
+        # it defines there, so update() can rebuild node.vars without
+        # revisiting all of them
+        for stmt in statements:
+            node.vars = []
+            self.visit(stmt)
+            stmt.scope_vars = node.vars
+        node.vars = []
+        for stmt in node.body:
+            node.vars.extend(stmt.scope_vars)
+
     def visit_With(self, node):
         node.vars = []
         self.generic_visit(node)
@@ -160,39 +307,3 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
             self.scope.vars.append(target)
         self.generic_visit(node)
         return node
-
-
-class LHSAnnotationTransformer(ast.NodeTransformer):
-    def __init__(self):
-        super().__init__()
-        self._lhs = False
-
-    def visit(self, node):
-        if self._lhs:
-            node.lhs = self._lhs
-        return super().visit(node)
-
-    def visit_Assign(self, node):
-        for target in node.targets:
-            self._lhs = True
-            self.visit(target)
-            self._lhs = False
-        self.visit(node.value)
-        return node
-
-    def visit_AnnAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.annotation)
-        if node.value is not None:
-            self.visit(node.value)
-        return node
-
-    def visit_AugAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.op)
-        self.visit(node.value)
-        return node
@@ -0,0 +1,99 @@
+import ast
+
+from .scope import ScopeList, ScopeMixin
+
+# Nodes annotated with their nesting level, which their children are nested
+# one level deeper than. Some languages are white space sensitive.
+NESTING_NODES = {"FunctionDef", "ClassDef", "If", "While", "For"}
+
+# Nodes flagged inside type annotations, so that they can be told apart from
+# values. Without this Dict[x,y] would be translated to HashMap<(x,y)>
+ANNOTATION_NODES = {"Tuple", "List", "Name", "Subscript"}
+
+# Fields holding assignment targets, and type annotations, by node type. The
+# other fields of these nodes are outside of either.
+LHS_FIELDS = {
+    "Assign": {"targets"},
+    "AnnAssign": {"target"},
+    "AugAssign": {"target"},
+}
+ANNOTATION_FIELDS = {
+    "arg": {"annotation"},
+    "FunctionDef": {"returns"},
+    "AnnAssign": {"target"},
+}
+
+
+def add_context(node):
+    """Annotate scopes, assignment targets, nesting levels and annotations"""
+    return ContextTransformer().visit(node)
+
+
+def update_context(node, statements):
+    """Re-annotate statements of the body of a Module or ClassDef node, which
+    keeps its own annotations"""
+    transformer = ContextTransformer()
+    transformer.scopes = node.scopes
+    if isinstance(node, ast.ClassDef):
+        transformer.level = node.level + 1
+    for stmt in statements:
+        transformer.visit(stmt)
+    return node
+
+
+class ContextTransformer(ScopeMixin):
+    """
+    Computes in a single walk node.scopes on every node, as ScopeTransformer
+    does, node.lhs inside assignment targets, node.level on nested blocks and
+    assignments, and node.is_annotation inside type annotations.
+
+    Each of these depends only on a node's ancestors, so none of them needs
+    the result of another.
+    """
+
+    def __init__(self):
+        self.scopes = ScopeList()
+        self.level = 0
+        self.lhs = False
+        self.annotation = False
+
+    def visit(self, node):
+        kind = node.__class__.__name__
+        scopes = self.scopes
+        if self._is_scopable_node(node):
+            self.scopes = scopes.push(node)
+        node.scopes = self.scopes
+        if self.lhs:
+            node.lhs = True
+        if self.annotation and kind in ANNOTATION_NODES:
+            node.is_annotation = True
+        if kind in NESTING_NODES:
+            node.level = self.level
+            self.level += 1
+            self.generic_visit(node, kind)
+            self.level -= 1
+        else:
+            if kind == "Assign":
+                node.level = self.level
+            self.generic_visit(node, kind)
+        self.scopes = scopes
+        return node
+
+    def generic_visit(self, node, kind):
+        lhs_fields = LHS_FIELDS.get(kind)
+        annotation_fields = ANNOTATION_FIELDS.get(kind)
+        lhs = self.lhs
+        annotation = self.annotation
+        for field, value in ast.iter_fields(node):
+            if lhs_fields is not None:
+                self.lhs = field in lhs_fields
+            if annotation_fields is not None:
+                self.annotation = field in annotation_fields
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+        self.lhs = lhs
+        self.annotation = annotation
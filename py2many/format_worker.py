@@ -0,0 +1,186 @@
+"""Formatters kept running across the files they format.
+
+A worker is a formatter process that reads the paths of the files to format
+in place from its stdin, one per line, and answers each with a line that is
+"ok", or "error" followed by what went wrong. It prints "ready" once it has
+started. This saves formatters that are slow to start, like JuliaFormatter,
+from starting again for every output.
+
+    worker = get_worker(["julia", "format_worker.jl"])
+    if worker is not None:
+        formatted = worker.format(path)
+
+Workers are started on first use and kept until the process exits. When a
+worker can't start, or takes too long to answer, get_worker returns None,
+from then on, so that callers fall back to running the formatter once per
+file. What workers print to stderr goes to a temporary file, the end of which
+is kept in their error.
+"""
+
+import atexit
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+# Seconds a worker has to print "ready", which includes loading the formatter,
+# to answer each file, and to exit once its stdin is closed. A worker that
+# takes longer is stopped, and not started again
+START_TIMEOUT = 300
+FORMAT_TIMEOUT = 60
+CLOSE_TIMEOUT = 5
+# Most characters of what a worker printed to stderr kept in its error
+MAX_STDERR = 1000
+
+
+class FormatWorker:
+    def __init__(self, cmd: List[str], env=None):
+        self.cmd = cmd
+        self.env = env
+        self.proc = None
+        self.error = ""
+        self.stalled = False
+        # The lines the worker prints, read on a thread of their own so that
+        # they can be waited for with a deadline, and what it prints to
+        # stderr, which it could block on if nothing read it
+        self.answers = None
+        self.stderr = None
+        # Threads formatting in parallel take turns
+        self.lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start the worker, returning whether it is ready"""
+        self.stderr = tempfile.TemporaryFile()
+        try:
+            self.proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self.stderr,
+                env=self.env,
+                text=True,
+            )
+        except OSError as e:
+            self.error = str(e)
+            self.stderr.close()
+            return False
+        self.answers = queue.Queue()
+        reader = threading.Thread(
+            target=_read_lines, args=(self.proc.stdout, self.answers), daemon=True
+        )
+        reader.start()
+        if self._answer(START_TIMEOUT) != "ready":
+            if not self.stalled:
+                self._fail("exited before it was ready")
+            self.close()
+            return False
+        return True
+
+    def running(self) -> bool:
+        return self.proc is not None
+
+    def _answer(self, timeout) -> str:
+        """The next line the worker prints, or "" if it exits first or takes
+        longer than timeout seconds, which it is stopped for"""
+        try:
+            line = self.answers.get(timeout=timeout)
+        except queue.Empty:
+            self.stalled = True
+            self._fail(f"didn't answer in {timeout}s")
+            self.proc.kill()
+            return ""
+        if line is None:
+            return ""
+        return line.strip()
+
+    def _fail(self, message):
+        """Set error to message, followed by the end of what the worker
+        printed to stderr"""
+        self.stderr.seek(0, os.SEEK_END)
+        self.stderr.seek(max(0, self.stderr.tell() - MAX_STDERR))
+        printed = self.stderr.read().decode("utf-8", errors="replace").strip()
+        if printed:
+            message = f"{message}: {printed}"
+        self.error = message
+
+    def format(self, path) -> Optional[bool]:
+        """Format path, returning whether it formatted, or None if the worker
+        exited or stalled before answering"""
+        with self.lock:
+            if self.proc is None:
+                return None
+            try:
+                self.proc.stdin.write(f"{path}\n")
+                self.proc.stdin.flush()
+                answer = self._answer(FORMAT_TIMEOUT)
+            except OSError:
+                answer = ""
+            if not answer:
+                if not self.stalled:
+                    self._fail("exited")
+                self.close()
+                return None
+            if answer == "ok":
+                return True
+            self.error = answer
+            return False
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(CLOSE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.stderr.close()
+        self.proc = None
+
+
+def _read_lines(stream, lines):
+    """Put the lines read from stream on the queue lines, then None"""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+# The worker of each command, or None for those that failed to start
+_workers: Dict[str, Optional[FormatWorker]] = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(cmd: List[str], env=None) -> Optional[FormatWorker]:
+    """The running worker of cmd, started if need be, or None if it can't
+    start"""
+    key = "\0".join(cmd)
+    workers = _workers
+    with _workers_lock:
+        worker = workers.get(key)
+        if worker is not None and worker.stalled:
+            # It would stall again, unlike a worker that crashed on one file
+            print(f"Formatting one file at a time, {cmd} {worker.error}")
+            worker = None
+            workers[key] = None
+        if key in workers and (worker is None or worker.running()):
+            return worker
+        # Started again after exiting, which a crash on one file makes it do
+        worker = FormatWorker(cmd, env)
+        if not worker.start():
+            print(f"Formatting one file at a time, {cmd} {worker.error}")
+            worker = None
+        workers[key] = worker
+        return worker
+
+
+@atexit.register
+def close_workers():
+    for worker in _workers.values():
+        if worker is not None:
+            worker.close()
+    _workers.clear()
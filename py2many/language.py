@@ -21,8 +21,40 @@ class LanguageSettings:
     # Rust likes source files to live in {project}/src for example
     project_subdir: Optional[str] = None
     ignore_formatter_errors: bool = False
+    # The formatter accepts many files in a single invocation
+    batch_format: bool = False
+    # Starts a formatter that keeps running across the files it formats, see
+    # format_worker.py. The formatter is run once per file when it can't start
+    format_worker: Optional[List[str]] = None
+    # Works out the formatter to run once per file, for formatters that take
+    # a while to find, only when it is needed. formatter just names it then
+    resolve_formatter: Optional[Callable[[], List[str]]] = None
 
     def __hash__(self):
         f = tuple(self.formatter) if self.formatter is not None else ()
         lint = tuple(self.linter) if self.linter is not None else ()
         return hash((self.transpiler, f, lint))
+
+    def cache_key(self) -> str:
+        """Describe the settings in a form that is stable across runs.
+
+        Unlike __hash__, which relies on the identity of the transpiler, this
+        can be used to key outputs cached on disk.
+        """
+        transpiler = self.transpiler
+        return repr(
+            (
+                type(transpiler).__module__,
+                type(transpiler).__qualname__,
+                self.ext,
+                self.formatter,
+                self.indent,
+                [type(r).__qualname__ for r in self.rewriters],
+                [getattr(t, "func", t).__qualname__ for t in self.transformers],
+                [type(r).__qualname__ for r in self.post_rewriters],
+                transpiler._extension,
+                transpiler._throw_on_unimplemented,
+                getattr(transpiler, "_no_prologue", False),
+                getattr(transpiler, "_indent", None),
+            )
+        )
@@ -0,0 +1,177 @@
+"""Wall time, call counts and allocations of the passes that transpile each
+file, for --profile-passes.
+
+Every rewriter, transformer and analysis step, and each visit_* method of
+the transpiler, is recorded under a name like "rewriters.LoopElseRewriter",
+"core.inference" or "transpiler.visit_Call". Passes that run inside others,
+like visit_* methods inside one another, are only charged for the time and
+allocations outside of the passes they call, so that nothing is counted
+twice.
+
+    profile = PassProfile()
+    with profile:
+        outputs, successful = _transpile(filenames, sources, settings,
+                                         profile=profile)
+    print(profile.table())
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, List
+
+
+class PassStats:
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.allocated = 0
+
+    def add(self, other):
+        self.seconds += other.seconds
+        self.calls += other.calls
+        self.allocated += other.allocated
+
+
+class FileProfile:
+    """Records the passes run over one file in a PassProfile, under names
+    starting with prefix"""
+
+    def __init__(self, profile, filename, prefix: str = ""):
+        self.profile = profile
+        self.filename = filename
+        self.prefix = prefix
+
+    def call(self, name, func, *args):
+        return self.profile.call(self.filename, self.prefix + name, func, *args)
+
+    def prefixed(self, prefix: str) -> "FileProfile":
+        return FileProfile(self.profile, self.filename, f"{self.prefix}{prefix}.")
+
+    def instrument(self, transpiler):
+        return self.profile.instrument(self.filename, transpiler)
+
+
+class PassProfile:
+    """The PassStats of each pass, per file.
+
+    Allocations are the net bytes traced by tracemalloc while a pass runs,
+    which passes that free more than they allocate make negative. They are
+    only recorded between start() and stop(), or while the profile is
+    entered as a context manager, which trace allocations unless they are
+    traced already.
+    """
+
+    def __init__(self, allocations: bool = True):
+        self.allocations = allocations
+        self.files: Dict[str, Dict[str, PassStats]] = {}
+        # Time and allocations of the passes called by each running pass
+        self._nested: List[List] = []
+        self._started_tracing = False
+
+    def start(self):
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _traced(self) -> int:
+        if self.allocations and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    def call(self, filename, name, func, *args, **kwargs):
+        """Call func, recording it as a call of the pass name"""
+        self._nested.append([0.0, 0])
+        traced = self._traced()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = self._traced() - traced
+            nested_seconds, nested_allocated = self._nested.pop()
+            if self._nested:
+                self._nested[-1][0] += elapsed
+                self._nested[-1][1] += allocated
+            passes = self.files.setdefault(str(filename), {})
+            if name not in passes:
+                passes[name] = PassStats()
+            stats = passes[name]
+            stats.seconds += elapsed - nested_seconds
+            stats.calls += 1
+            stats.allocated += allocated - nested_allocated
+
+    def file(self, filename) -> FileProfile:
+        return FileProfile(self, filename)
+
+    @contextmanager
+    def instrument(self, filename, transpiler):
+        """Record the calls of each visit_* method of transpiler"""
+        names = [n for n in dir(type(transpiler)) if n.startswith("visit_")]
+        for name in names:
+            method = getattr(transpiler, name)
+            wrapper = partial(self.call, filename, f"transpiler.{name}", method)
+            setattr(transpiler, name, wrapper)
+        try:
+            yield transpiler
+        finally:
+            for name in names:
+                delattr(transpiler, name)
+
+    def totals(self) -> Dict[str, PassStats]:
+        """The stats of each pass, summed over the files"""
+        totals = {}
+        for passes in self.files.values():
+            for name, stats in passes.items():
+                if name not in totals:
+                    totals[name] = PassStats()
+                totals[name].add(stats)
+        return totals
+
+    def to_json(self) -> Dict:
+        files = {}
+        for filename, passes in self.files.items():
+            files[filename] = {n: _stats_json(s) for n, s in passes.items()}
+        totals = {n: _stats_json(s) for n, s in self.totals().items()}
+        return {"files": files, "totals": totals}
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2, sort_keys=True)
+
+    def table(self) -> str:
+        """The totals as a markdown table, slowest pass first"""
+        totals = self.totals()
+        lines = [
+            "| pass | calls | time (s) | allocated (KiB) |",
+            "|------|-------|----------|-----------------|",
+        ]
+        for name in sorted(totals, key=lambda n: (-totals[n].seconds, n)):
+            stats = totals[name]
+            lines.append(
+                f"| {name} | {stats.calls} | {stats.seconds:.4f} "
+                f"| {stats.allocated / 1024:.1f} |"
+            )
+        return "\n".join(lines)
+
+
+def _stats_json(stats: PassStats) -> Dict:
+    return {
+        "seconds": stats.seconds,
+        "calls": stats.calls,
+        "allocated_bytes": stats.allocated,
+    }
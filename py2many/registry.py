@@ -1,5 +1,8 @@
 import os
 import pathlib
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Optional
 from unittest.mock import Mock
 
 from .language import LanguageSettings
@@ -7,49 +10,6 @@ from .python_transformer import PythonTranspiler, RestoreMainRewriter
 from .rewriters import InferredAnnAssignRewriter
 
 CI = os.environ.get("CI", "0")
-if CI in ["1", "true"]:  # pragma: no cover
-    from .pycpp import settings as cpp_settings
-    from .pyd import settings as dlang_settings
-    from .pydart import settings as dart_settings
-    from .pygo import settings as go_settings
-    from .pyjl import settings as julia_settings
-    from .pykt import settings as kotlin_settings
-    from .pylean import settings as lean_settings
-    from .pymojo import settings as mojo_settings
-    from .pynim import settings as nim_settings
-    from .pyrs import settings as rust_settings
-    from .pysmt import settings as smt_settings
-    from .pyv import settings as vlang_settings
-    from .pyzig import settings as zig_settings
-else:
-    try:  # pragma: no cover
-        from .pycpp import settings as cpp_settings
-        from .pyd import settings as dlang_settings
-        from .pydart import settings as dart_settings
-        from .pygo import settings as go_settings
-        from .pyjl import settings as julia_settings
-        from .pykt import settings as kotlin_settings
-        from .pylean import settings as lean_settings
-        from .pymojo import settings as mojo_settings
-        from .pynim import settings as nim_settings
-        from .pyrs import settings as rust_settings
-        from .pysmt import settings as smt_settings
-        from .pyv import settings as vlang_settings
-        from .pyzig import settings as zig_settings
-    except ImportError:
-        from pycpp import settings as cpp_settings
-        from pyd import settings as dlang_settings
-        from pydart import settings as dart_settings
-        from pygo import settings as go_settings
-        from pyjl import settings as julia_settings
-        from pykt import settings as kotlin_settings
-        from pylean import settings as lean_settings
-        from pymojo import settings as mojo_settings
-        from pynim import settings as nim_settings
-        from pyrs import settings as rust_settings
-        from pysmt import settings as smt_settings
-        from pyv import settings as vlang_settings
-        from pyzig import settings as zig_settings
 
 PY2MANY_DIR = pathlib.Path(__file__).parent
 ROOT_DIR = PY2MANY_DIR.parent
@@ -64,26 +24,57 @@ def python_settings(args, env=os.environ):
         formatter=["black"],
         rewriters=[RestoreMainRewriter()],
         post_rewriters=[InferredAnnAssignRewriter()],
+        batch_format=True,
     )
 
 
-ALL_SETTINGS = {
-    "python": python_settings,
-    "cpp": cpp_settings,
-    "rust": rust_settings,
-    "julia": julia_settings,
-    "kotlin": kotlin_settings,
-    "lean": lean_settings,
-    "nim": nim_settings,
-    "mojo": mojo_settings,
-    "dlang": dlang_settings,
-    "dart": dart_settings,
-    "go": go_settings,
-    "vlang": vlang_settings,
-    "smt": smt_settings,
-    "zig": zig_settings,
+def _import_backend(package):
+    if CI in ["1", "true"]:  # pragma: no cover
+        return import_module(f".{package}", __package__)
+    try:  # pragma: no cover
+        return import_module(f".{package}", __package__)
+    except ImportError:
+        return import_module(package)
+
+
+@dataclass(frozen=True)
+class Backend:
+    """Describes a target language without importing its backend.
+
+    The backend package is only imported, and its settings only built, once
+    the language is selected, since some of them probe the system for
+    toolchains while doing so.
+    """
+
+    display_name: str
+    # None for python, which is built in
+    package: Optional[str] = None
+
+    def settings(self, args, env=os.environ) -> LanguageSettings:
+        if self.package is None:
+            return python_settings(args, env=env)
+        return _import_backend(self.package).settings(args, env=env)
+
+
+BACKENDS = {
+    "python": Backend("Python"),
+    "cpp": Backend("C++", "pycpp"),
+    "rust": Backend("Rust", "pyrs"),
+    "julia": Backend("Julia", "pyjl"),
+    "kotlin": Backend("Kotlin", "pykt"),
+    "lean": Backend("Lean", "pylean"),
+    "nim": Backend("Nim", "pynim"),
+    "mojo": Backend("Mojo", "pymojo"),
+    "dlang": Backend("D", "pyd"),
+    "dart": Backend("Dart", "pydart"),
+    "go": Backend("Go", "pygo"),
+    "vlang": Backend("V", "pyv"),
+    "smt": Backend("SMT", "pysmt"),
+    "zig": Backend("Zig", "pyzig"),
 }
 
+ALL_SETTINGS = {lang: backend.settings for lang, backend in BACKENDS.items()}
+
 
 def _get_all_settings(args, env=os.environ):
     return {key: func(args, env=env) for key, func in ALL_SETTINGS.items()}
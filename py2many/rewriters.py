@@ -7,7 +7,7 @@ from py2many.ast_helpers import create_ast_block, create_ast_node
 from py2many.astx import ASTxFunctionDef
 from py2many.clike import CLikeTranspiler
 from py2many.inference import get_inferred_type
-from py2many.scope import ScopeList
+from py2many.scope import ScopeList, SymbolIndex
 from py2many.tracer import find_node_by_type
 
 
@@ -186,6 +186,8 @@ def camel_case(name):
 def rename(scope, old_name, new_name):
     tx = RenameTransformer(old_name, new_name)
     tx.visit(scope)
+    # Definitions were renamed in place
+    SymbolIndex.invalidate_all()
 
 
 class PythonMainRewriter(ast.NodeTransformer):
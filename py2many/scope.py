@@ -1,5 +1,5 @@
 import ast
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from contextlib import contextmanager
 
 from py2many.analysis import get_id
@@ -10,6 +10,18 @@ def add_scope_context(node):
     return ScopeTransformer().visit(node)
 
 
+# Nodes that open a new scope
+SCOPE_NODES = (
+    ast.Module,
+    ast.ClassDef,
+    ast.FunctionDef,
+    ast.Lambda,
+    ast.For,
+    ast.If,
+    ast.With,
+)
+
+
 class ScopeMixin:
     """
     Adds a scope property with the current scope (function, module)
@@ -35,48 +47,163 @@ class ScopeMixin:
             return None
 
     def _is_scopable_node(self, node):
-        scopes = [
-            ast.Module,
-            ast.ClassDef,
-            ast.FunctionDef,
-            ast.Lambda,
-            ast.For,
-            ast.If,
-            ast.With,
-        ]
-        return len([s for s in scopes if isinstance(node, s)]) > 0
-
-
-class ScopeList(list):
+        return isinstance(node, SCOPE_NODES)
+
+
+class ScopeIndex:
     """
-    Wraps around list of scopes and provides find method for finding
-    the definition of a variable
+    Base of the indexes of the definitions in a scope, each cached on the
+    scope as its CACHE attribute and built from the scope's WATCHED
+    attributes on the first lookup in the scope.
+
+    Checking that an index is still valid costs the same however large the
+    scope is: it is rebuilt when one of the watched attributes was replaced
+    or, for lists, changed length, or when the generation moved on.
+
+    Passes can also rewrite definitions in place, by renaming them or by
+    replacing a statement with another. The pipeline bumps the generation
+    with invalidate_all() after each pass, and so does a pass that rewrites
+    definitions some later lookup of its own depends on, like rename().
     """
 
-    def find(self, lookup):
-        """Find definition of variable lookup."""
+    CACHE = ""
+    WATCHED = []
+
+    # Bumped by invalidate_all(), which stales every index
+    generation = 0
+
+    def __init__(self, scope):
+        self.generation = ScopeIndex.generation
+        self.watched = []
+        # (attribute, value, length of the value if a list) for is_valid
+        self.state = []
+        for attr in self.WATCHED:
+            value = getattr(scope, attr, None)
+            length = len(value) if isinstance(value, list) else None
+            self.watched.append(value)
+            self.state.append((attr, value, length))
+
+    def is_valid(self, scope):
+        if self.generation != ScopeIndex.generation:
+            return False
+        for attr, value, length in self.state:
+            current = getattr(scope, attr, None)
+            if current is not value or (length is not None and len(current) != length):
+                return False
+        return True
+
+    @classmethod
+    def of(cls, scope):
+        index = getattr(scope, cls.CACHE, None)
+        if index is None or not index.is_valid(scope):
+            index = cls(scope)
+            setattr(scope, cls.CACHE, index)
+        return index
+
+    @staticmethod
+    def invalidate_all():
+        ScopeIndex.generation += 1
+
+
+class SymbolIndex(ScopeIndex):
+    """
+    Maps the names defined directly in a scope to their definitions, from
+    the scope's vars, body_vars, orelse_vars and body.
+    """
+
+    CACHE = "symbol_index"
+    WATCHED = ["vars", "body_vars", "orelse_vars", "body"]
+
+    def __init__(self, scope):
+        super().__init__(scope)
+        # special case lambda functions here. Their body is not a list
+        self.opaque_body = False
+        self.definitions = {}
+        for definitions in self.watched:
+            if isinstance(definitions, Iterable):
+                self._add(definitions)
+        if hasattr(scope, "body") and not isinstance(scope.body, Iterable):
+            self.opaque_body = True
 
-        def find_definition(scope, var_attr="vars"):
-            for var in getattr(scope, var_attr):
-                if get_id(var) == lookup:
-                    return var
+    def _add(self, definitions):
+        for defn in definitions:
+            # Earlier definitions win, like the linear scan they replace
+            self.definitions.setdefault(get_id(defn), defn)
 
+
+class ScopeList(Sequence):
+    """
+    An immutable chain of scopes, outermost first, that provides a find
+    method for finding the definition of a variable.
+
+    Each chain links to the chain of its enclosing scopes, so the scopes of
+    every node of a tree share their common prefix and annotating a node
+    costs a single reference.
+    """
+
+    __slots__ = ("_scope", "_parent", "_depth", "_scopes")
+
+    def __init__(self, scopes=()):
+        self._scope = None
+        self._parent = None
+        self._depth = 0
+        # The scopes as a tuple, once something iterates over them
+        self._scopes = None
+        scopes = list(scopes)
+        if scopes:
+            scope = scopes.pop()
+            self._link(ScopeList(scopes), scope)
+
+    def push(self, scope):
+        """The chain of scope, nested inside this one"""
+        chain = ScopeList()
+        chain._link(self, scope)
+        return chain
+
+    def _link(self, parent, scope):
+        self._scope = scope
+        self._parent = parent if parent._depth else None
+        self._depth = parent._depth + 1
+
+    def __len__(self):
+        return self._depth
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._depth
+        if index < 0 or index >= self._depth:
+            raise IndexError("scope index out of range")
+        chain = self
+        for _ in range(self._depth - 1 - index):
+            chain = chain._parent
+        return chain._scope
+
+    def __iter__(self):
+        if self._scopes is None:
+            scopes = list(reversed(self))
+            scopes.reverse()
+            self._scopes = tuple(scopes)
+        return iter(self._scopes)
+
+    def __reversed__(self):
+        chain = self
+        while chain is not None and chain._depth:
+            yield chain._scope
+            chain = chain._parent
+
+    def __repr__(self):
+        return f"ScopeList({list(self)!r})"
+
+    def find(self, lookup):
+        """Find definition of variable lookup."""
         for scope in reversed(self):
-            defn = None
-            if not defn and hasattr(scope, "vars"):
-                defn = find_definition(scope, "vars")
-            if not defn and hasattr(scope, "body_vars"):
-                defn = find_definition(scope, "body_vars")
-            if not defn and hasattr(scope, "orelse_vars"):
-                defn = find_definition(scope, "orelse_vars")
-            if not defn and hasattr(scope, "body"):
-                # special case lambda functions here. Their body is not a list
-                if isinstance(scope.body, Iterable):
-                    defn = find_definition(scope, "body")
-                else:
-                    return None
-            if defn:
-                return defn
+            index = SymbolIndex.of(scope)
+            if lookup in index.definitions:
+                return index.definitions[lookup]
+            if index.opaque_body:
+                return None
 
     def find_import(self, lookup):  # pragma: no cover
         """
@@ -92,9 +219,9 @@ class ScopeList(list):
 
     @property
     def parent_scopes(self):
-        scopes = list(self)
-        scopes.pop()
-        return ScopeList(scopes)
+        if self._parent is None:
+            return ScopeList()
+        return self._parent
 
 
 class ScopeTransformer(ast.NodeTransformer, ScopeMixin):
@@ -104,7 +231,15 @@ class ScopeTransformer(ast.NodeTransformer, ScopeMixin):
     a node is part of.
     """
 
+    def __init__(self):
+        super().__init__()
+        self.scopes = ScopeList()
+
     def visit(self, node):
-        with self.enter_scope(node):
-            node.scopes = ScopeList(self.scopes)
-            return super().visit(node)
+        scopes = self.scopes
+        if self._is_scopable_node(node):
+            self.scopes = scopes.push(node)
+        node.scopes = self.scopes
+        result = super().visit(node)
+        self.scopes = scopes
+        return result
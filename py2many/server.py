@@ -0,0 +1,257 @@
+"""A long running py2many, which keeps the backends it imported, the settings
+of each language and the responses to recent requests between requests.
+
+Requests and responses are json objects, one per line, read from stdin and
+written to stdout, or exchanged over a UNIX socket with --socket PATH:
+
+    {"id": 1, "language": "rust", "source": "...", "options": {"indent": 2}}
+    {"id": 1, "output": "...", "diagnostics": [], "ok": true}
+
+"options" may set any argument of the command line, by its name in the
+parsed arguments (e.g. "strict": false). "filename" names the module and
+"format": false skips the formatter. A request with "argv" and "cwd" instead
+runs the command line there, as the client shim sends them, and gets back its
+"exit_code", "stdout" and "stderr". {"shutdown": true} stops the server.
+
+Requests are answered one at a time, since the command line changes the
+working directory and redirects stdout while it runs.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import traceback
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+
+from . import cli
+from .cache import hash_text
+from .registry import BACKENDS
+
+# Arguments the settings of a language are built from, besides the language
+SETTINGS_ARGS = [
+    "indent",
+    "extension",
+    "no_prologue",
+    "comment_unsupported",
+    "strict",
+    "ignore_formatter_errors",
+]
+# Most responses to transpile requests kept for answering them again
+MAX_CACHED_RESPONSES = 1000
+DEFAULT_FILENAME = "input.py"
+
+
+def _error(message):
+    return {"ok": False, "error": message}
+
+
+class TranspileServer:
+    """Answers requests, reusing the settings built for each language and
+    options, and the responses to the most recent transpile requests"""
+
+    def __init__(self, env=os.environ, max_cached=MAX_CACHED_RESPONSES):
+        self.env = env
+        self.max_cached = max_cached
+        self.running = True
+        self._parser = cli._parser()
+        # The settings built for each language and options, with whether
+        # their transpiler threw on unimplemented nodes when built
+        self._settings = {}
+        self._responses = OrderedDict()
+
+    def settings(self, args, env=os.environ):
+        key = tuple([getattr(args, name) for name in [*BACKENDS, *SETTINGS_ARGS]])
+        kept = self._settings.get(key)
+        if kept is None:
+            settings = cli._settings(args, env=env)
+            kept = (settings, settings.transpiler._throw_on_unimplemented)
+            self._settings[key] = kept
+        return kept[0]
+
+    def _restore_settings(self):
+        """Undo what the command line set on the transpilers of the settings
+        kept, as directory mode makes them continue on unimplemented nodes,
+        so that no request depends on the ones before it"""
+        for settings, throw_on_unimplemented in self._settings.values():
+            settings.transpiler._throw_on_unimplemented = throw_on_unimplemented
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            return _error("Request is not an object")
+        try:
+            if request.get("shutdown"):
+                self.running = False
+                response = {"ok": True}
+            elif "argv" in request:
+                response = self.run_cli(request)
+            else:
+                response = self.transpile(request)
+        except Exception:
+            response = _error(traceback.format_exc().splitlines()[-1])
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def transpile(self, request):
+        language = request.get("language")
+        if language not in BACKENDS:
+            return _error(f"Unknown language: {language}")
+        args = self._parser.parse_args([f"--{language}"])
+        for name, value in request.get("options", {}).items():
+            if not hasattr(args, name):
+                return _error(f"Unknown option: {name}")
+            setattr(args, name, value)
+        source = request.get("source", "")
+        filename = Path(request.get("filename", DEFAULT_FILENAME))
+        reformat = request.get("format", True)
+        key = hash_text(
+            json.dumps(
+                [vars(args), str(filename), source, reformat],
+                sort_keys=True,
+                default=str,
+            )
+        )
+        response = self._responses.get(key)
+        if response is None:
+            response = self._transpile(args, filename, source, reformat)
+            self._responses[key] = response
+            if len(self._responses) > self.max_cached:
+                self._responses.popitem(last=False)
+        else:
+            self._responses.move_to_end(key)
+        return dict(response)
+
+    def _transpile(self, args, filename, source, reformat):
+        settings = self.settings(args, env=self.env)
+        with contextlib.redirect_stdout(StringIO()) as diagnostics:
+            outputs, successful = cli._transpile([filename], [source], settings, args)
+            output = outputs[0]
+            ok = len(successful) > 0
+            if ok and reformat and settings.formatter:
+                output, ok = _format(settings, filename, output, self.env)
+        return {
+            "output": output,
+            "diagnostics": diagnostics.getvalue().splitlines(),
+            "ok": ok,
+        }
+
+    def run_cli(self, request):
+        """Run the command line on the argv of request, in its cwd, with the
+        settings kept here"""
+        cwd = os.getcwd()
+        stdin = sys.stdin
+        stdout = StringIO()
+        stderr = StringIO()
+        try:
+            os.chdir(request.get("cwd", cwd))
+            cli.CWD = Path.cwd()
+            sys.stdin = StringIO(request.get("stdin", ""))
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    args, _ = self._parser.parse_known_args(request["argv"])
+                    if args.watch:
+                        # It would keep the server from answering anyone else
+                        print("--watch supported only by py2many, not on the server")
+                        exit_code = -1
+                    else:
+                        exit_code = cli._main(request["argv"], self.env, self.settings)
+                except SystemExit as e:
+                    # argparse exits on --help and on invalid arguments
+                    exit_code = e.code if isinstance(e.code, int) else 1
+                except Exception:
+                    traceback.print_exc()
+                    exit_code = 1
+        finally:
+            sys.stdin = stdin
+            os.chdir(cwd)
+            cli.CWD = Path(cwd)
+            self._restore_settings()
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+
+def _format(settings, filename, output, env):
+    """Run the formatter of settings on output, returning the formatted output
+    and whether formatting succeeded"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / (filename.stem + settings.ext)
+        path.write_text(output, encoding="utf-8")
+        if not cli._format_one(settings, path, env):
+            return output, False
+        return path.read_text(encoding="utf-8"), True
+
+
+def serve(server, reader, writer):
+    """Answer each json line read from the binary stream reader with one on
+    writer, until reader is exhausted or the server is shut down"""
+    for line in reader:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = _error(f"Invalid request: {e}")
+        else:
+            response = server.handle(request)
+        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+        writer.flush()
+        if not server.running:
+            break
+
+
+def serve_stdio(server):
+    # Formatters and the command line print to stdout, keep the responses on
+    # a copy of it
+    writer = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    with writer:
+        serve(server, sys.stdin.buffer, writer)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        serve(self.server.transpile_server, self.rfile, self.wfile)
+
+
+def serve_unix(server, path):
+    """Serve the connections to a UNIX socket at path one at a time, until the
+    server is shut down"""
+    with socketserver.UnixStreamServer(str(path), _Handler) as unix_server:
+        unix_server.transpile_server = server
+        try:
+            while server.running:
+                unix_server.handle_request()
+        finally:
+            os.unlink(path)
+
+
+def main(args=None, env=os.environ):
+    parser = argparse.ArgumentParser(
+        description="Answer py2many requests, read as json lines"
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Listen on this UNIX socket instead of reading stdin",
+    )
+    args = parser.parse_args(args=args)
+    server = TranspileServer(env)
+    if args.socket is None:
+        serve_stdio(server)
+    else:
+        serve_unix(server, args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
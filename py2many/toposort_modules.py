@@ -1,7 +1,7 @@
 import ast
 from collections import defaultdict
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 
 def module_for_path(path: Path) -> str:
@@ -10,7 +10,21 @@ def module_for_path(path: Path) -> str:
     return module.rsplit(".", 1)[0]
 
 
+def _parent_module(module: str) -> str:
+    if "." in module:
+        return module.rsplit(".", 1)[0]
+    return ""
+
+
 class ImportDependencyVisitor(ast.NodeVisitor):
+    """
+    Collects the modules each module imports, among the given ones.
+
+    Handles `import a.b`, `from a.b import c`, relative imports and
+    `from pkg import mod`, where mod is a module rather than a name defined
+    in pkg. A package is the module of its __init__.py.
+    """
+
     def __init__(self, modules):
         self.deps = defaultdict(set)
         self._modules = modules
@@ -20,17 +34,47 @@ class ImportDependencyVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
-        if node.module in self._modules:
-            self.deps[self._current].add(node.module)
+        module = self._absolute_module(node)
+        if module is not None:
+            if module:
+                self._add(module)
+            for alias in node.names:
+                # from pkg import mod
+                if module:
+                    self._add(f"{module}.{alias.name}")
+                else:
+                    self._add(alias.name)
         self.generic_visit(node)
 
     def visit_Import(self, node):
         names = [n.name for n in node.names]
         for n in names:
-            if n in self._modules:
-                self.deps[self._current].add(n)
+            self._add(n)
         self.generic_visit(node)
 
+    def _absolute_module(self, node) -> Optional[str]:
+        """The module node imports from, or None if it is relative to a
+        package above the top of the tree"""
+        if not node.level:
+            return node.module
+        # The package of a module, or of an __init__ module, is its parent
+        package = _parent_module(self._current)
+        for _ in range(node.level - 1):
+            if not package:
+                return None
+            package = _parent_module(package)
+        if node.module is None:
+            return package
+        if package:
+            return f"{package}.{node.module}"
+        return node.module
+
+    def _add(self, name):
+        for module in [name, f"{name}.__init__"]:
+            if module in self._modules and module != self._current:
+                self.deps[self._current].add(module)
+                return
+
 
 def get_dependencies(trees):
     modules = {module_for_path(node.__file__) for node in trees}
@@ -44,6 +88,21 @@ def get_dependencies(trees):
 
 
 class TopologicalSorter:
+    """
+    Orders nodes after their predecessors, in linear time.
+
+    Nodes that depend on each other form a cycle. Each cycle is grouped into
+    one strongly connected component, ordered after everything the cycle
+    depends on. Within a component, nodes come after their predecessors as
+    far as possible. Where the cycle has to be broken, the smallest remaining
+    node goes first.
+
+    waves() groups the components so that each wave only depends on earlier
+    waves. get_ready() and done() hand out nodes as soon as their
+    predecessors are done, one at a time within a cycle, for scheduling them
+    in parallel.
+    """
+
     def __init__(self, graph=None):
         self._graph = defaultdict(set)
         self._dependent_nodes = defaultdict(set)
@@ -60,36 +119,161 @@ class TopologicalSorter:
             self._dependent_nodes[p].add(node)
 
     def prepare(self):
-        self._in_degree = {node: len(self._graph[node]) for node in self._nodes}
-        self._active_nodes = set(self._nodes)
+        components = self._strongly_connected_components()
+        self._components = []
+        self._component_of = {}
+        for members in components:
+            for node in members:
+                self._component_of[node] = len(self._components)
+            self._components.append(self._cycle_order(members))
+        self._component_deps = []
+        for members in self._components:
+            deps = set()
+            for node in members:
+                for p in self._graph[node]:
+                    deps.add(self._component_of[p])
+            deps.discard(self._component_of[members[0]])
+            self._component_deps.append(deps)
+        self._dependent_components = defaultdict(set)
+        for i, deps in enumerate(self._component_deps):
+            for dep in deps:
+                self._dependent_components[dep].add(i)
+        self._in_degree = [len(deps) for deps in self._component_deps]
+        # How many members of each component are done
+        self._progress = [0 for _ in self._components]
+        self._remaining = len(self._nodes)
+        self._done_nodes = set()
+        self._ready = []
+        for i, degree in enumerate(self._in_degree):
+            if degree == 0:
+                self._ready.append(self._components[i][0])
 
     def is_active(self):
-        return bool(self._active_nodes)
+        return self._remaining > 0
 
     def get_ready(self):
-        ready = [node for node in self._active_nodes if self._in_degree[node] == 0]
-        if not ready and self._active_nodes:
-            # graphlib.TopologicalSorter would raise CycleError here. Pick the
-            # lexicographically smallest active node so cyclic inputs still
-            # produce deterministic output.
-            ready = [min(self._active_nodes)]
-        return tuple(ready)
+        """The nodes whose predecessors are all done, that were not returned
+        by an earlier call"""
+        ready = tuple(sorted(self._ready))
+        self._ready = []
+        return ready
 
     def done(self, *nodes):
         for node in nodes:
-            if node in self._active_nodes:
-                self._active_nodes.remove(node)
-                for dependent in self._dependent_nodes[node]:
-                    if dependent in self._active_nodes:
-                        self._in_degree[dependent] -= 1
+            if node in self._done_nodes or node not in self._component_of:
+                continue
+            self._done_nodes.add(node)
+            self._remaining -= 1
+            i = self._component_of[node]
+            members = self._components[i]
+            self._progress[i] += 1
+            if self._progress[i] < len(members):
+                self._ready.append(members[self._progress[i]])
+                continue
+            for dependent in self._dependent_components[i]:
+                self._in_degree[dependent] -= 1
+                if self._in_degree[dependent] == 0:
+                    self._ready.append(self._components[dependent][0])
 
-    def static_order(self):
+    def waves(self) -> List[List[Tuple]]:
+        """The components, as tuples of nodes, in waves that only depend on
+        the waves before them. Each wave is sorted by first node."""
         self.prepare()
-        while self.is_active():
-            node_group = self.get_ready()
-            for node in sorted(node_group):
-                yield node
-            self.done(*node_group)
+        in_degree = list(self._in_degree)
+        wave = [i for i, degree in enumerate(in_degree) if degree == 0]
+        waves = []
+        while wave:
+            wave.sort(key=lambda i: self._components[i][0])
+            waves.append([self._components[i] for i in wave])
+            next_wave = []
+            for i in wave:
+                for dependent in self._dependent_components[i]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_wave.append(dependent)
+            wave = next_wave
+        return waves
+
+    def static_order(self):
+        for wave in self.waves():
+            for component in wave:
+                for node in component:
+                    yield node
+
+    def _strongly_connected_components(self) -> List[List]:
+        """Tarjan's algorithm, iterative so long import chains don't hit the
+        recursion limit"""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        counter = 0
+        for root in sorted(self._nodes):
+            if root in index:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(sorted(self._graph[root])))]
+            while work:
+                node, predecessors = work[-1]
+                descended = False
+                for p in predecessors:
+                    if p not in index:
+                        index[p] = lowlink[p] = counter
+                        counter += 1
+                        stack.append(p)
+                        on_stack.add(p)
+                        work.append((p, iter(sorted(self._graph[p]))))
+                        descended = True
+                        break
+                    if p in on_stack:
+                        lowlink[node] = min(lowlink[node], index[p])
+                if descended:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+        return components
+
+    def _cycle_order(self, members) -> Tuple:
+        """Order the members of a component in waves of the edges between
+        them, starting with the smallest remaining member whenever no member
+        is free of predecessors"""
+        if len(members) == 1:
+            return tuple(members)
+        member_set = set(members)
+        in_degree = {m: len(self._graph[m] & member_set) for m in members}
+        candidates = iter(sorted(members))
+        done = set()
+        order = []
+        ready = [m for m in members if in_degree[m] == 0]
+        while len(order) < len(members):
+            if not ready:
+                ready = [next(c for c in candidates if c not in done)]
+            wave = sorted(ready)
+            ready = []
+            for node in wave:
+                done.add(node)
+                order.append(node)
+            for node in wave:
+                for dependent in self._dependent_nodes[node] & member_set:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0 and dependent not in done:
+                        ready.append(dependent)
+        return tuple(order)
 
 
 class StableTopologicalSorter(TopologicalSorter):
@@ -101,3 +285,20 @@ def toposort(trees) -> Tuple:
     tree_dict = {module_for_path(node.__file__): node for node in trees}
     ts = StableTopologicalSorter(deps)
     return tuple([tree_dict[t] for t in ts.static_order()])
+
+
+def toposort_paths(paths, parse) -> Tuple:
+    """The paths in the order toposort() puts their trees in.
+
+    parse(path) returns the tree of a path, with __file__ set to the path.
+    Only one tree is alive at a time, for inputs too large to keep parsed.
+    """
+    modules = {module_for_path(path): path for path in paths}
+    visitor = ImportDependencyVisitor(set(modules))
+    for path in paths:
+        visitor.visit(parse(path))
+    deps = {}
+    for module in modules:
+        deps[module] = visitor.deps[module]
+    ts = StableTopologicalSorter(deps)
+    return tuple([modules[m] for m in ts.static_order()])
@@ -7,21 +7,46 @@ from typing import Optional
 from py2many.analysis import get_id
 from py2many.clike import CLikeTranspiler
 from py2many.exceptions import AstNotImplementedError
+from py2many.scope import ScopeIndex
+
+
+class LookupIndex(ScopeIndex):
+    """
+    Maps the names of the classes, imports and methods defined directly in
+    a scope to their definitions, for the lookups below.
+    """
+
+    CACHE = "lookup_index"
+    WATCHED = ["body", "imports"]
+
+    def __init__(self, scope):
+        super().__init__(scope)
+        self.classes = {}
+        # Methods by the name of their first argument. Transpilers mark
+        # methods with self_type while emitting their class, so that is
+        # checked on lookup
+        self.methods = {}
+        # special case lambda functions here. Their body is not a list
+        body = getattr(scope, "body", None)
+        if isinstance(body, Iterable):
+            for entry in body:
+                if isinstance(entry, ast.ClassDef):
+                    self.classes.setdefault(entry.name, entry)
+                elif isinstance(entry, ast.FunctionDef) and len(entry.args.args):
+                    first_arg = get_id(entry.args.args[0])
+                    self.methods.setdefault(first_arg, []).append(entry)
+        self.imported = {}
+        for entry in getattr(scope, "imports", None) or []:
+            self.imported.setdefault(entry.name, entry)
 
 
-# TODO: is it slow? is it correct?
 def _lookup_class_or_module(name, scopes) -> Optional[ast.ClassDef]:
     for scope in scopes:
-        if not isinstance(scope.body, Iterable):
-            continue
-        for entry in scope.body:
-            if isinstance(entry, ast.ClassDef):
-                if entry.name == name:
-                    return entry
-        if hasattr(scope, "imports"):
-            for entry in scope.imports:
-                if entry.name == name:
-                    return entry
+        index = LookupIndex.of(scope)
+        if name in index.classes:
+            return index.classes[name]
+        if name in index.imported:
+            return index.imported[name]
     return None
 
 
@@ -41,14 +66,9 @@ def is_enum(name, scopes):
 
 def is_self_arg(name, scopes):
     for scope in scopes:
-        if not isinstance(scope.body, Iterable):
-            continue
-        for entry in scope.body:
-            if isinstance(entry, ast.FunctionDef):
-                if len(entry.args.args):
-                    first_arg = entry.args.args[0]
-                    if get_id(first_arg) == name and hasattr(entry, "self_type"):
-                        return True
+        for entry in LookupIndex.of(scope).methods.get(name, []):
+            if hasattr(entry, "self_type"):
+                return True
     return False
 
 
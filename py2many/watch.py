@@ -0,0 +1,207 @@
+"""Transpile a directory again as its modules change, for --watch.
+
+The modification times of the modules are polled. Only the modules whose
+source changed and those importing them, directly or not, are transpiled
+again, against the export tables of the others kept from the previous run,
+which gives the outputs transpiling the whole directory again would. Only
+their outputs are written and formatted.
+
+    watcher = ModuleWatcher(settings, source, outdir)
+    watcher.update(*watcher.changes())
+    watch(watcher)
+"""
+
+import ast
+import time
+from pathlib import Path
+
+from . import cli
+from .toposort_modules import toposort_paths
+
+# Seconds between polls of the modification times
+POLL_INTERVAL = 0.5
+
+
+class ModuleWatcher:
+    """The sources, imports and analysed trees of the modules of a directory,
+    kept between transpiling the ones that changed"""
+
+    def __init__(self, settings, basedir, outdir, env=None):
+        self.settings = settings
+        self.basedir = Path(basedir)
+        self.outdir = Path(outdir)
+        self.env = env
+        self.pipeline = cli._pipeline(settings)
+        self.mtimes = {}
+        self.sources = {}
+        # The imports of each module, as a module holding just those, the
+        # modules they name, and the modules among the inputs they resolve to
+        self.import_trees = {}
+        self.import_names = {}
+        self.imported = {}
+        self.order = []
+        # The export table stub of each transpiled module
+        self.trees = {}
+        settings.transpiler.set_continue_on_unimplemented()
+
+    def changes(self):
+        """The modules added or modified, and those removed, since the last
+        call"""
+        inputs = cli._find_inputs(self.basedir, [self.outdir])
+        mtimes = {}
+        for filename in inputs:
+            mtimes[filename] = (self.basedir / filename).stat().st_mtime_ns
+        changed = [f for f in inputs if self.mtimes.get(f) != mtimes[f]]
+        removed = [f for f in self.mtimes if f not in mtimes]
+        self.mtimes = mtimes
+        return changed, removed
+
+    def _parse(self, filename):
+        return cli._parse(filename, self.sources[filename])
+
+    def _dependents(self, filenames):
+        """filenames and the modules importing them, directly or not"""
+        importers = {}
+        for filename, imported in self.imported.items():
+            for dep in imported:
+                importers.setdefault(dep, set()).add(filename)
+        closure = set(filenames)
+        stack = list(filenames)
+        while stack:
+            for importer in importers.get(stack.pop(), set()):
+                if importer not in closure:
+                    closure.add(importer)
+                    stack.append(importer)
+        return closure
+
+    def update(self, changed, removed):
+        """Transpile the changed modules and their importers again, write and
+        format their outputs and remove those of the removed modules.
+
+        Returns the modules transpiled, in topological order, and the sets of
+        those that succeeded and that failed to format.
+        """
+        sources = self.sources
+        edited = []
+        for filename in changed:
+            try:
+                with open(self.basedir / filename) as f:
+                    source = f.read()
+            except OSError:
+                # Removed since, the next poll finds it gone
+                continue
+            # Saved without changes
+            if sources.get(filename) != source:
+                sources[filename] = source
+                edited.append(filename)
+        analysed = self.trees
+        for filename in removed:
+            sources.pop(filename, None)
+            analysed.pop(filename, None)
+            output_path = cli._get_output_path(filename, self.settings.ext, self.outdir)
+            if output_path.exists():
+                output_path.unlink()
+
+        # The importers of the removed modules, found before they go
+        affected = self._dependents(edited + removed)
+        added = [f for f in edited if f not in self.import_names]
+        reordered = len(added) > 0 or len(removed) > 0
+        import_names = self.import_names
+        for filename in removed:
+            import_names.pop(filename, None)
+            self.import_trees.pop(filename, None)
+        for filename in edited:
+            import_tree = _import_tree(self._parse(filename))
+            self.import_trees[filename] = import_tree
+            names = cli._imported_modules(import_tree)
+            if import_names.get(filename) != names:
+                import_names[filename] = names
+                reordered = True
+        if reordered:
+            # Which modules imports resolve to depends on the modules there are
+            tables = cli._import_tables(list(sources))
+            imported = {}
+            for filename, names in import_names.items():
+                imported[filename] = cli._resolve_imports(tables, *names)
+            self.imported = imported
+            self.order = list(toposort_paths(list(sources), self.import_trees.get))
+        affected |= self._dependents(edited)
+        todo = [f for f in self.order if f in affected]
+        if not todo:
+            return [], set(), set()
+        return self._transpile(todo)
+
+    def _transpile(self, filenames):
+        """Transpile filenames, which are in topological order, against the
+        trees of the other modules as the serial pipeline would have them.
+
+        Only filenames are parsed. The other modules are stood in for by the
+        stubs kept from the runs that transpiled them.
+        """
+        todo = set(filenames)
+        start = self.order.index(filenames[0])
+        # Modules before the first one transpiled have their export tables in
+        # the serial pipeline, the ones after it are still unanalysed
+        analysed = self.trees
+        trees = []
+        for i, filename in enumerate(self.order):
+            if i < start:
+                trees.append(analysed[filename])
+            else:
+                trees.append(cli._stand_in(filename))
+        outputs = {}
+        for i in range(start, len(self.order)):
+            filename = self.order[i]
+            if filename in todo:
+                trees[i] = self._parse(filename)
+                output, error = cli._transpile_checked(
+                    trees, trees[i], self.pipeline, Exception
+                )
+                outputs[filename] = (output, error)
+                # Modules importing it may be transpiled again in later runs
+                if error is None:
+                    trees[i] = cli._export_stub(trees[i])
+                analysed[filename] = trees[i]
+            else:
+                trees[i] = analysed[filename]
+        outputs, successful = cli._collect_outputs(filenames, filenames, outputs)
+        successful = set(successful)
+        format_errors = cli._write_outputs(
+            self.settings, filenames, outputs, successful, self.outdir, self.env
+        )
+        return filenames, successful, format_errors
+
+
+def _import_tree(tree):
+    """A module holding just the imports of tree, wherever they are in it,
+    which is all sorting the modules reads"""
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append(node)
+    module = ast.Module(body=imports, type_ignores=[])
+    module.__file__ = tree.__file__
+    return module
+
+
+def watch(watcher, interval=POLL_INTERVAL, polls=None):
+    """Transpile the modules of watcher again whenever they change, polling
+    every interval seconds, polls times or until interrupted"""
+    print(f"Watching {watcher.basedir} for changes, press Ctrl-C to stop")
+    count = 0
+    try:
+        while polls is None or count < polls:
+            count += 1
+            time.sleep(interval)
+            start = time.perf_counter()
+            transpiled, successful, format_errors = watcher.update(*watcher.changes())
+            if not transpiled:
+                continue
+            elapsed = time.perf_counter() - start
+            names = ", ".join(str(f) for f in transpiled)
+            print(f"Transpiled {len(transpiled)} in {elapsed:.3f}s: {names}")
+            failures = set(transpiled) - successful
+            if failures or format_errors:
+                cli._print_summary(successful, format_errors, failures)
+    except KeyboardInterrupt:
+        print("Stopped watching")
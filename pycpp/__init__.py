@@ -2,6 +2,7 @@ import os
 import os.path
 import pathlib
 import sys
+from functools import lru_cache
 from itertools import chain
 
 from py2many.language import LanguageSettings
@@ -20,7 +21,9 @@ REQUIRED_INCLUDE_FILES = [
 ]
 
 
+@lru_cache(maxsize=None)
 def _conan_include_dirs():
+    # Scans the whole conan cache, so only do it once
     include_dirs = []
     for hpp_filename in REQUIRED_INCLUDE_FILES:
         for root in CONAN_ROOTS:
@@ -70,4 +73,5 @@ def settings(args, env=os.environ):
         None,
         [CppListComparisonRewriter()],
         linter=[cxx, *cxx_flags],
+        batch_format=True,
     )
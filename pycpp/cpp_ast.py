@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from typing import Iterable, Protocol
 
 
@@ -8,7 +9,9 @@ class CppRenderable(Protocol):
     def render(self) -> str: ...
 
 
+@lru_cache(maxsize=None)
 def _load_tree_sitter_cpp():
+    """Build the tree-sitter parser once; fragments share it."""
     try:
         import tree_sitter_cpp
         from tree_sitter import Language, Parser
@@ -37,32 +40,42 @@ def _node_has_error(node) -> bool:
 
 @dataclass(frozen=True)
 class CppTreeSitterNode:
-    """A C++ syntax subtree parsed by tree-sitter."""
+    """A C++ syntax subtree parsed by tree-sitter.
+
+    Visitors create one of these for every fragment they return, and most are
+    only ever rendered, so the source is parsed the first time the tree is
+    inspected rather than on construction.
+    """
 
     source: str
-    kind: str = "translation_unit"
-    has_error: bool = False
-    _tree: object | None = field(default=None, repr=False, compare=False)
 
     @classmethod
     def parse(cls, source: str) -> "CppTreeSitterNode":
+        return cls(source=source)
+
+    @cached_property
+    def _tree(self):
         parser = _load_tree_sitter_cpp()
         if parser is None:
-            return cls(source=source)
-
-        tree = parser.parse(source.encode("utf-8"))
-        root = tree.root_node
-        return cls(
-            source=source,
-            kind=root.type,
-            has_error=_node_has_error(root),
-            _tree=tree,
-        )
+            return None
+        return parser.parse(self.source.encode("utf-8"))
 
     @property
     def tree(self):
         return self._tree
 
+    @cached_property
+    def kind(self) -> str:
+        if self._tree is None:
+            return "translation_unit"
+        return self._tree.root_node.type
+
+    @cached_property
+    def has_error(self) -> bool:
+        if self._tree is None:
+            return False
+        return _node_has_error(self._tree.root_node)
+
     def render(self) -> str:
         return self.source
 
@@ -5,7 +5,7 @@ from typing import List, Tuple
 
 from py2many.analysis import add_imports, get_id, is_global, is_void_function
 from py2many.ast_helpers import create_ast_block
-from py2many.clike import _AUTO_INVOKED, class_for_typename
+from py2many.clike import _AUTO_INVOKED, class_for_typename, wrap_visitors
 from py2many.context import add_list_calls, add_variable_context
 from py2many.declaration_extractor import DeclarationExtractor
 from py2many.exceptions import AstNotImplementedError
@@ -121,20 +121,9 @@ class CppListComparisonRewriter(ast.NodeTransformer):
 class CppTranspiler(CLikeTranspiler):
     NAME = "cpp"
 
-    def __getattribute__(self, name):
-        attr = super().__getattribute__(name)
-        if not callable(attr):
-            return attr
-        if not (name.startswith("visit_") or name.startswith("_visit_")):
-            return attr
-
-        def cpp_node_visitor(*args, **kwargs):
-            result = attr(*args, **kwargs)
-            if isinstance(result, str):
-                return CppNode(result)
-            return result
-
-        return cpp_node_visitor
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        wrap_visitors(cls, CppNode)
 
     def __init__(self, extension: bool = False, no_prologue: bool = False):
         super().__init__()
@@ -753,3 +742,6 @@ class CppTranspiler(CLikeTranspiler):
             else:
                 buf.append(f"std::cout << {value} << std::endl;")
         return "\n".join(buf)
+
+
+wrap_visitors(CppTranspiler, CppNode)
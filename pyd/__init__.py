@@ -32,4 +32,5 @@ def settings(args, env=os.environ):
         "D",
         _dfmt_command(dfmt_args),
         post_rewriters=[DIntegerDivRewriter()],
+        batch_format=True,
     )
@@ -12,4 +12,5 @@ def settings(args, env=os.environ):
         "Dart",
         ["dart", "format"],
         post_rewriters=[DartIntegerDivRewriter()],
+        batch_format=True,
     )
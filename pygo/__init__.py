@@ -45,4 +45,5 @@ def settings(args, env=os.environ):
         linter=(
             ["revive", "--config", str(revive_config)] if revive_config else ["revive"]
         ),
+        batch_format=True,
     )
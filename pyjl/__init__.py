@@ -9,6 +9,8 @@ from .inference import infer_julia_types
 from .rewriters import JuliaBoolOpRewriter, JuliaIndexingRewriter
 from .transpiler import JuliaMethodCallRewriter, JuliaTranspiler
 
+_FORMAT_WORKER = os.path.join(os.path.dirname(__file__), "format_worker.jl")
+
 
 @lru_cache()
 def _julia_formatter_path():
@@ -42,7 +44,17 @@ def _formatter_cmd():
 
 
 def settings(args, env=os.environ):
-    format_jl = _formatter_cmd()
+    # Keeps julia, and JuliaFormatter compiled, across the files it formats.
+    # Finding format.jl may start julia too, so it is only looked for when
+    # the worker can't start
+    if find_executable("julia"):
+        format_worker = ["julia", "--startup-file=no", _FORMAT_WORKER]
+        format_jl = format_worker
+        resolve_formatter = _formatter_cmd
+    else:
+        format_worker = None
+        format_jl = _formatter_cmd()
+        resolve_formatter = None
     return LanguageSettings(
         JuliaTranspiler(),
         ".jl",
@@ -56,4 +68,6 @@ def settings(args, env=os.environ):
             JuliaMethodCallRewriter(),
             JuliaBoolOpRewriter(),
         ],
+        format_worker=format_worker,
+        resolve_formatter=resolve_formatter,
     )
@@ -0,0 +1,25 @@
+# JuliaFormatter worker for py2many-generated Julia sources.
+#
+# Formats the files named on each line of stdin in place and answers each with
+# "ok" or "error <message>", so that julia starts and compiles the formatter
+# once for many outputs instead of once per output. It prints "ready" once
+# JuliaFormatter is loaded; py2many formats one file at a time with format.jl
+# when it never does.
+#
+# Invoked by py2many as: julia --startup-file=no pyjl/format_worker.jl
+using JuliaFormatter
+
+println("ready")
+flush(stdout)
+for line in eachline(stdin)
+    path = String(strip(line))
+    isempty(path) && continue
+    try
+        format(path)
+        println("ok")
+    catch e
+        message = replace(sprint(showerror, e), '\n' => ' ')
+        println("error $message")
+    end
+    flush(stdout)
+end
@@ -22,6 +22,7 @@ def settings(args, env=os.environ):
         rewriters=[KotlinBitOpRewriter()],
         transformers=[infer_kotlin_types],
         post_rewriters=[KotlinPrintRewriter()],
+        batch_format=True,
         linter=[
             "jgo",
             "--add-opens",
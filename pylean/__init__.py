@@ -16,8 +16,10 @@ def settings(args, env=os.environ):
         "Lean",
         # No standalone Lean source formatter exists yet, so drive the compiler's
         # own pretty printer (Lean.PrettyPrinter.ppModule) via fmt.lean, which
-        # rewrites the file in place. _create_cmd appends the output path.
+        # rewrites the files in place. _create_cmd appends the output path, or
+        # directory mode a batch of them, which share one Lean environment.
         formatter=["lean", "--run", _LEAN_FMT],
+        batch_format=True,
         rewriters=[LeanWalrusRewriter()],
         transformers=[infer_lean_types],
         post_rewriters=[LeanImplicitConstructor()],
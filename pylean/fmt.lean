@@ -1,16 +1,18 @@
 -- Formatter for py2many-generated Lean sources.
 --
--- Parses a single .lean file into a module syntax tree and re-emits it through
--- Lean's own pretty printer (`Lean.PrettyPrinter.ppModule`), rewriting the file
--- in place. There is no standalone Lean source formatter yet, so this drives the
--- compiler's built-in pretty printer instead.
+-- Parses each .lean file it is given into a module syntax tree and re-emits it
+-- through Lean's own pretty printer (`Lean.PrettyPrinter.ppModule`), rewriting
+-- the file in place. There is no standalone Lean source formatter yet, so this
+-- drives the compiler's built-in pretty printer instead. The environment is
+-- initialised once for all the files, so py2many passes it a whole batch of
+-- outputs at a time.
 --
 -- The pretty printer leaves trailing whitespace and surrounds the output with
 -- blank lines, so we post-process: strip trailing whitespace per line, drop
 -- leading/trailing blank lines, and restore the space the pretty printer drops
 -- between a closing paren and the `do` of a `for x in (e) do` loop.
 --
--- Invoked by py2many as: lean --run pylean/fmt.lean <file.lean>
+-- Invoked by py2many as: lean --run pylean/fmt.lean <file.lean>...
 import Lean
 open Lean Lean.Parser Lean.PrettyPrinter
 
@@ -25,15 +27,28 @@ private def tidy (s : String) : String :=
   let lines := (lines.reverse.dropWhile (· == "")).reverse
   String.intercalate "\n" lines ++ "\n"
 
+/-- Pretty-print the file at `path` in place, returning whether it succeeded. -/
+unsafe def formatFile (env : Environment) (path : String) : IO Bool := do
+  let contents ← IO.FS.readFile path
+  let stx ← testParseModule env path contents
+  let coreCtx : Core.Context := { fileName := path, fileMap := FileMap.ofString contents }
+  match ← ((ppModule ⟨stx⟩).toIO coreCtx { env }).toBaseIO with
+  | .ok (fmt, _) => IO.FS.writeFile path (tidy (toString fmt)); pure true
+  | .error e => IO.eprintln s!"lean fmt error: {path}: {toString e}"; pure false
+
 unsafe def main (args : List String) : IO UInt32 := do
-  match args with
-  | [path] =>
-    let contents ← IO.FS.readFile path
-    Lean.enableInitializersExecution
-    let env ← importModules #[{ module := `Init }] {} (loadExts := true)
-    let stx ← testParseModule env path contents
-    let coreCtx : Core.Context := { fileName := path, fileMap := FileMap.ofString contents }
-    match ← ((ppModule ⟨stx⟩).toIO coreCtx { env }).toBaseIO with
-    | .ok (fmt, _) => IO.FS.writeFile path (tidy (toString fmt)); pure 0
-    | .error e => IO.eprintln s!"lean fmt error: {toString e}"; pure 1
-  | _ => IO.eprintln "usage: fmt <file.lean>"; pure 2
+  if args.isEmpty then
+    IO.eprintln "usage: fmt <file.lean>..."
+    return 2
+  Lean.enableInitializersExecution
+  let env ← importModules #[{ module := `Init }] {} (loadExts := true)
+  -- Keep going past a file that fails, so that the others are still formatted
+  let mut failed := false
+  for path in args do
+    try
+      unless (← formatFile env path) do
+        failed := true
+    catch e =>
+      IO.eprintln s!"lean fmt error: {path}: {e}"
+      failed := true
+  return if failed then 1 else 0
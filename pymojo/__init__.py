@@ -20,4 +20,5 @@ def settings(args, env=os.environ):
         post_rewriters=[
             MojoImplicitConstructor(),
         ],
+        batch_format=True,
     )
@@ -20,4 +20,5 @@ def settings(args, env=os.environ):
         None,
         [NimNoneCompareRewriter()],
         [infer_nim_types],
+        batch_format=True,
     )
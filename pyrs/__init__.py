@@ -29,4 +29,5 @@ def settings(args, env=os.environ):
             "../../scripts/rust-runner.sh",
             "lint",
         ],
+        batch_format=True,
     )
@@ -10,7 +10,7 @@ from py2many.analysis import (
     is_mutable,
     is_void_function,
 )
-from py2many.clike import class_for_typename
+from py2many.clike import class_for_typename, wrap_visitors
 from py2many.declaration_extractor import DeclarationExtractor
 from py2many.exceptions import AstClassUsedBeforeDeclaration
 from py2many.inference import is_reference
@@ -123,20 +123,9 @@ class RustStringJoinRewriter(ast.NodeTransformer):
 class RustTranspiler(CLikeTranspiler):
     NAME = "rust"
 
-    def __getattribute__(self, name):
-        attr = super().__getattribute__(name)
-        if not callable(attr):
-            return attr
-        if not (name.startswith("visit_") or name.startswith("_visit_")):
-            return attr
-
-        def rust_node_visitor(*args, **kwargs):
-            result = attr(*args, **kwargs)
-            if isinstance(result, str):
-                return RustNode(result)
-            return result
-
-        return rust_node_visitor
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        wrap_visitors(cls, RustNode)
 
     def __init__(self, extension: bool = False, no_prologue: bool = False):
         super().__init__()
@@ -1145,3 +1134,6 @@ class RustTranspiler(CLikeTranspiler):
 
     def visit_ExceptHandler(self, node) -> RustNode:
         return "unsupported exception handler"
+
+
+wrap_visitors(RustTranspiler, RustNode)
@@ -19,4 +19,5 @@ def settings(args, env=os.environ):
         None,
         [AnnotatePreConditions(), RewriteNotEq()],
         [infer_smt_types],
+        batch_format=True,
     )
@@ -31,4 +31,5 @@ def settings(args, env=os.environ):
             VComprehensionRewriter(),
         ],
         [infer_v_types],
+        batch_format=True,
     )
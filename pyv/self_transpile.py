@@ -4,7 +4,6 @@ SELF_TRANSPILE_MODULE_NAMES = {
     "__init__",
     "__main__",
     "analysis",
-    "annotation_transformer",
     "ast_helpers",
     "astx",
     "cli",
@@ -18,7 +17,6 @@ SELF_TRANSPILE_MODULE_NAMES = {
     "llm_transpile",
     "macosx_llm",
     "mutability_transformer",
-    "nesting_transformer",
     "plugins",
     "process_helpers",
     "python_transformer",
@@ -40,7 +38,6 @@ SELF_TRANSPILE_PARENTS = {"py2many", "pyrs", "pyv", "output"}
 
 DYNAMIC_MODULES = {
     "analysis",
-    "annotation_transformer",
     "clike",
     "context",
     "declaration_extractor",
@@ -49,7 +46,6 @@ DYNAMIC_MODULES = {
     "llm_transpile",
     "macosx_llm",
     "mutability_transformer",
-    "nesting_transformer",
     "plugins",
     "python_transformer",
     "raises_transformer",
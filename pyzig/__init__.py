@@ -25,4 +25,5 @@ def settings(args, env=os.environ):
             ZigImplicitConstructor(),
             ZigErrorUnionAnalyzer(),
         ],
+        batch_format=True,
     )
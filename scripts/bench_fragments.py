@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Time transpiling tests/cases to Rust and C++ with lazily parsed fragments
+against the old behaviour of parsing every RustNode/CppNode on construction.
+
+Every visitor result is wrapped in a RustNode/CppNode, so parsing each one
+eagerly reparses nested expressions at every level. Run from anywhere:
+
+    python scripts/bench_fragments.py
+    python scripts/bench_fragments.py --repeat 5 rust
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _transpile
+from py2many.pycpp.cpp_ast import CppTreeSitterNode
+from py2many.pyrs.rust_ast import RustTreeSitterNode
+from py2many.registry import ALL_SETTINGS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CASES_DIR = REPO_ROOT / "tests" / "cases"
+
+NODE_CLASSES = {"rust": RustTreeSitterNode, "cpp": CppTreeSitterNode}
+
+
+@contextlib.contextmanager
+def eager_parsing(node_class):
+    """Parse fragments on construction, as they were before they became lazy."""
+    lazy_parse = node_class.__dict__["parse"]
+
+    def parse(cls, source):
+        node = lazy_parse.__func__(cls, source)
+        node.has_error
+        return node
+
+    node_class.parse = classmethod(parse)
+    try:
+        yield
+    finally:
+        node_class.parse = lazy_parse
+
+
+def transpile_cases(lang, cases):
+    settings = ALL_SETTINGS[lang](Mock(indent=4, extension=False))
+    settings.transpiler.set_continue_on_unimplemented()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for case in cases:
+            _transpile([Path(case.name)], [case.read_text()], settings)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("langs", nargs="*", default=sorted(NODE_CLASSES))
+    args = parser.parse_args()
+
+    cases = sorted(CASES_DIR.glob("*.py"))
+    print(f"{len(cases)} cases, best of {args.repeat}")
+    print("| lang | eager (s) | lazy (s) | speedup |")
+    print("|------|-----------|----------|---------|")
+    for lang in args.langs:
+        with eager_parsing(NODE_CLASSES[lang]):
+            eager = min(transpile_cases(lang, cases) for _ in range(args.repeat))
+        lazy = min(transpile_cases(lang, cases) for _ in range(args.repeat))
+        print(f"| {lang} | {eager:.2f} | {lazy:.2f} | {eager / lazy:.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
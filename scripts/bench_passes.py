@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Time each analysis pass of core_transformers.
+
+The inputs are py2many's own sources, analysed as one directory so that
+cross-module lookups are exercised. Run from anywhere:
+
+    python scripts/bench_passes.py
+    python scripts/bench_passes.py --repeat 5 path/to/big/package
+"""
+
+import argparse
+import ast
+from pathlib import Path
+
+from py2many.cli import core_transformers
+from py2many.profiler import PassProfile
+from py2many.scope import add_scope_context
+from py2many.toposort_modules import toposort
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse(filenames, basedir):
+    trees = []
+    for filename in filenames:
+        tree = ast.parse((basedir / filename).read_text())
+        tree.__file__ = filename
+        add_scope_context(tree)
+        trees.append(tree)
+    return toposort(trees)
+
+
+def run(trees):
+    """The seconds each pass took over trees"""
+    profile = PassProfile(allocations=False)
+    for tree in trees:
+        core_transformers(tree, trees, None, profile.file(tree.__file__))
+    return {name: stats.seconds for name, stats in profile.totals().items()}
+
+
+def best_timings(filenames, basedir, repeat):
+    best = {}
+    for _ in range(repeat):
+        for name, elapsed in run(parse(filenames, basedir)).items():
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("source", nargs="?", default=REPO_ROOT / "py2many")
+    args = parser.parse_args()
+
+    basedir = Path(args.source)
+    filenames = sorted(p.relative_to(basedir) for p in basedir.rglob("*.py"))
+    lines = sum(len((basedir / f).read_text().splitlines()) for f in filenames)
+    best = best_timings(filenames, basedir, args.repeat)
+
+    print(f"{len(filenames)} modules, {lines} lines, best of {args.repeat}")
+    print("| pass | time (s) |")
+    print("|------|----------|")
+    for name, elapsed in best.items():
+        print(f"| {name} | {elapsed:.3f} |")
+    print(f"| total | {sum(best.values()):.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Time the programs py2many generates from compute-heavy cases against the
+same cases run by CPython, in every backend whose toolchain is installed.
+
+The compilers and invokers are those tests/test_cli.py runs the generated
+code with, plus the flags of an optimised build. Backends that compile to an
+executable are built once and the executable timed. The others are timed
+through their invoker, startup and any compilation it does included. Each
+program runs --repeat times; the table has the best wall time and the peak
+resident memory, which is only measured on Linux. Run from anywhere:
+
+    python scripts/bench_runtime.py
+    CXX=g++ python scripts/bench_runtime.py --repeat 5 cpp rust go
+    python scripts/bench_runtime.py --cases tests/cases/langcomp_bench.py
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _create_cmd
+from py2many.cli import main as py2many_main
+from py2many.process_helpers import find_executable
+from py2many.registry import ALL_SETTINGS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CASES_DIR = Path(__file__).resolve().parent / "bench_runtime_cases"
+
+# Appended to the compiler of tests/test_cli.py for an optimised build
+RELEASE_FLAGS = {
+    "cpp": ["-O2"],
+    "dlang": ["-O", "-release", "-inline"],
+    "nim": ["-d:release"],
+    "vlang": ["-prod"],
+}
+# rust-runner.sh builds the dev profile, optimise it like the release one
+RELEASE_ENV = {
+    "rust": {
+        "CARGO_PROFILE_DEV_OPT_LEVEL": "3",
+        "CARGO_PROFILE_DEV_DEBUG_ASSERTIONS": "false",
+        "CARGO_PROFILE_DEV_OVERFLOW_CHECKS": "false",
+    },
+}
+# The compilers of these leave an executable where get_exe_filename expects
+# it, or where EXECUTABLES says
+BUILT = ["cpp", "dart", "dlang", "go", "mojo", "nim", "rust", "vlang"]
+EXECUTABLES = {
+    "rust": lambda build_dir, case: (
+        build_dir / "common-rust-proj" / "target" / "debug" / case
+    ),
+}
+# Invokers that run something other than a program
+NOT_PROGRAMS = ["python", "smt"]
+
+
+def load_test_cli():
+    """tests/test_cli.py, which isn't installed with py2many"""
+    path = REPO_ROOT / "tests" / "test_cli.py"
+    spec = importlib.util.spec_from_file_location("test_cli", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_memory(pid):
+    """The peak resident memory of the running process pid, in bytes, or
+    None once it exits"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def watch_memory(pid, done, peaks):
+    # ru_maxrss of a child starts at the RSS of the process that forked it,
+    # this benchmark's, so the high water mark of the program itself is
+    # sampled instead
+    while not done.is_set():
+        peak = peak_memory(pid)
+        if peak is None:
+            break
+        peaks.append(peak)
+        done.wait(0.001)
+
+
+def run_timed(cmd, cwd, env):
+    """Run cmd, returning its wall time, peak resident memory, exit code and
+    stdout"""
+    with tempfile.TemporaryFile() as stdout:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd, cwd=cwd, env=env, stdout=stdout, stderr=subprocess.DEVNULL
+        )
+        done = threading.Event()
+        peaks = []
+        watcher = threading.Thread(target=watch_memory, args=(proc.pid, done, peaks))
+        watcher.start()
+        exit_code = proc.wait()
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+        stdout.seek(0)
+        return elapsed, max(peaks, default=0), exit_code, stdout.read()
+
+
+def best_of(repeat, cmd, cwd, env):
+    """The best time and the peak memory of repeat runs of cmd, and its
+    stdout, or None if it fails"""
+    seconds = math.inf
+    peak = 0
+    for _ in range(repeat):
+        elapsed, rss, exit_code, stdout = run_timed(cmd, cwd, env)
+        if exit_code:
+            return None
+        seconds = min(seconds, elapsed)
+        peak = max(peak, rss)
+    return seconds, peak, stdout
+
+
+class BuildError(Exception):
+    pass
+
+
+class Backend:
+    """How to build and run the programs generated for one language"""
+
+    def __init__(self, lang, test_cli, env):
+        self.lang = lang
+        self.test_cli = test_cli
+        self.build_dir = test_cli.BUILD_DIR
+        self.env = {**env, **test_cli.ENV.get(lang, {}), **RELEASE_ENV.get(lang, {})}
+        self.ext = ALL_SETTINGS[lang](Mock(indent=4), env=self.env).ext
+        self.compiler = None
+        self.invoker = None
+        if lang in BUILT and lang in test_cli.COMPILERS:
+            self.compiler = test_cli.COMPILERS[lang] + RELEASE_FLAGS.get(lang, [])
+        elif lang in test_cli.INVOKER and lang not in NOT_PROGRAMS:
+            self.invoker = test_cli.INVOKER[lang]
+
+    def available(self):
+        tool = self.compiler or self.invoker
+        if tool is None:
+            return False
+        # The runner scripts are relative to the build directory
+        return bool(find_executable(tool[0]) or (self.build_dir / tool[0]).exists())
+
+    def executable(self, case):
+        if self.lang in EXECUTABLES:
+            return EXECUTABLES[self.lang](self.build_dir, case)
+        return self.test_cli.get_exe_filename(case, self.ext)
+
+    def prepare(self, case_filename):
+        """Transpile and build case_filename, returning the command that runs
+        it"""
+        case = case_filename.stem
+        output = self.build_dir / f"{case}{self.ext}"
+        args = [
+            f"--{self.lang}",
+            "--ignore-formatter-errors",
+            f"--outdir={self.build_dir}",
+            str(case_filename),
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            with contextlib.redirect_stderr(io.StringIO()):
+                if py2many_main(args, env=self.env):
+                    raise BuildError("transpile failed")
+        if self.invoker is not None:
+            return _create_cmd(self.invoker, filename=output)
+        exe = self.executable(case)
+        cmd = _create_cmd(self.compiler, filename=output, exe=exe)
+        proc = subprocess.run(
+            cmd, cwd=self.build_dir, env=self.env, capture_output=True, check=False
+        )
+        if proc.returncode:
+            raise BuildError("build failed")
+        a_dot_out = self.build_dir / self.test_cli.a_dot_out
+        if self.lang == "cpp" and a_dot_out.exists():
+            os.replace(a_dot_out, exe)
+        return [str(exe)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", type=Path, nargs="+")
+    parser.add_argument("langs", nargs="*")
+    args = parser.parse_args()
+
+    test_cli = load_test_cli()
+    os.makedirs(test_cli.BUILD_DIR, exist_ok=True)
+    cases = args.cases or sorted(CASES_DIR.glob("*.py"))
+    cases = [case.resolve() for case in cases]
+    backends = [
+        Backend(lang, test_cli, os.environ) for lang in args.langs or ALL_SETTINGS
+    ]
+    missing = [backend.lang for backend in backends if not backend.available()]
+    backends = [backend for backend in backends if backend.available()]
+    if missing:
+        print(f"Skipped, toolchain not installed: {', '.join(missing)}")
+
+    print(f"{len(cases)} cases, best of {args.repeat}")
+    print("| case | lang | time (s) | vs CPython | peak (MiB) |")
+    print("|------|------|----------|------------|------------|")
+    for case in cases:
+        python = best_of(
+            args.repeat, [sys.executable, str(case)], test_cli.BUILD_DIR, os.environ
+        )
+        if python is None:
+            print(f"| {case.stem} | python | failed | | |")
+            continue
+        python_seconds, python_peak, expected = python
+        print(
+            f"| {case.stem} | python | {python_seconds:.3f} | 1.00x "
+            f"| {python_peak / 2**20:.1f} |"
+        )
+        for backend in backends:
+            try:
+                cmd = backend.prepare(case)
+            except BuildError as e:
+                print(f"| {case.stem} | {backend.lang} | {e} | | |")
+                continue
+            result = best_of(args.repeat, cmd, backend.build_dir, backend.env)
+            if result is None:
+                print(f"| {case.stem} | {backend.lang} | run failed | | |")
+                continue
+            seconds, peak, stdout = result
+            speedup = f"{python_seconds / seconds:.2f}x"
+            if stdout.splitlines() != expected.splitlines():
+                speedup += " (wrong output)"
+            print(
+                f"| {case.stem} | {backend.lang} | {seconds:.3f} | {speedup} "
+                f"| {peak / 2**20:.1f} |"
+            )
+
+
+if __name__ == "__main__":
+    main()
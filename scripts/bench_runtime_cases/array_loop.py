@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+from typing import List
+
+
+def array_loop(iterations: int) -> int:
+    array_length = 1000
+    array: List[int] = []
+    for i in range(array_length):
+        array.append(i)
+    total = 0
+    iteration = 0
+    while iteration < iterations:
+        innerloop = 0
+        while innerloop < 100:
+            total += array[(iteration + innerloop) % array_length]
+            innerloop += 1
+        total = total % 1000003
+        iteration += 1
+    return total
+
+
+if __name__ == "__main__":
+    print(array_loop(50000))
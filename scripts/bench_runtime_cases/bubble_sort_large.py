@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+from typing import List
+
+
+def bubble_sort(seq: List[int]) -> List[int]:
+    L = len(seq)
+    for _ in range(L):
+        for n in range(1, L):
+            if seq[n] < seq[n - 1]:
+                seq[n - 1], seq[n] = seq[n], seq[n - 1]
+    return seq
+
+
+if __name__ == "__main__":
+    size = 3000
+    unsorted: List[int] = []
+    for i in range(size):
+        unsorted.append((i * 7919) % size)
+    result = bubble_sort(unsorted)
+    print(result[0], result[size - 1])
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+from typing import List
+
+
+def count_primes(n: int) -> int:
+    is_prime: List[bool] = []
+    for _ in range(n + 1):
+        is_prime.append(True)
+    count = 0
+    for i in range(2, n + 1):
+        if is_prime[i]:
+            count += 1
+            j = i * i
+            while j <= n:
+                is_prime[j] = False
+                j += i
+    return count
+
+
+if __name__ == "__main__":
+    print(count_primes(2000000))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Measure how transpile time and peak memory grow with the size of generated
+programs, and catch growth that turns super-linear against a stored baseline.
+
+Each dimension scales one property of a synthetic program: the number of
+functions in a module ("lines"), how deeply their loops nest ("depth"), the
+number of classes ("classes") and the number of modules importing one another
+("modules"). The time of every backend is fitted to lines**exponent over the
+scales, the exponent of peak memory likewise. An exponent near 1 is linear;
+--check fails when one exceeds the baseline's by more than --tolerance, which
+unlike lines/second doesn't depend on the machine. Run from anywhere:
+
+    python scripts/bench_scaling.py
+    python scripts/bench_scaling.py rust go --scales 1 2 4 8 16
+    python scripts/bench_scaling.py --check
+    python scripts/bench_scaling.py --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _transpile
+from py2many.registry import ALL_SETTINGS
+
+BASELINE = Path(__file__).resolve().parent / "bench_scaling_baseline.json"
+
+DEFAULT_LANGS = ["cpp", "go", "rust"]
+DEFAULT_SCALES = [1, 2, 4, 8]
+
+CLASS = """\
+class Shape{m}_{i}:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+    def area(self) -> int:
+        return self.width * self.height
+
+    def grow(self, n: int) -> int:
+        total = self.area()
+        for a in range(n):
+            if a % 2 == 0:
+                total += a * self.width
+        return total
+
+"""
+
+
+def function(m, i, depth):
+    """A function whose loops nest depth (at least 1) deep"""
+    lines = [f"def m{m}_f{i}(n: int) -> int:", "    total = 0"]
+    indent = "    "
+    for level in range(depth):
+        lines.append(f"{indent}for a{level} in range(n):")
+        lines.append(f"{indent}    if a{level} % 2 == {level % 2}:")
+        indent += "        "
+    lines.append(f"{indent}total += a{depth - 1} + {i}")
+    lines.append("    return total")
+    return "\n".join(lines) + "\n\n\n"
+
+
+def generate_module(m=0, functions=1, depth=1, classes=0):
+    """The source of module m of a generated program. Modules after the first
+    import a function of the one before"""
+    parts = []
+    if m > 0:
+        parts.append(f"from mod{m - 1} import m{m - 1}_f0\n\n\n")
+    parts.extend(CLASS.format(m=m, i=i) + "\n" for i in range(classes))
+    parts.extend(function(m, i, depth) for i in range(functions))
+    if m > 0:
+        parts.append(
+            f"def m{m}_chain(n: int) -> int:\n    return m{m - 1}_f0(n) + 1\n\n\n"
+        )
+    return "".join(parts).rstrip() + "\n"
+
+
+def generate_program(modules=1, **kwargs):
+    """The filenames and sources of a generated program"""
+    filenames = [Path(f"mod{m}.py") for m in range(modules)]
+    sources = [generate_module(m, **kwargs) for m in range(modules)]
+    return filenames, sources
+
+
+# The program of each dimension at a scale
+DIMENSIONS = {
+    "lines": lambda scale: generate_program(functions=25 * scale, depth=2),
+    "depth": lambda scale: generate_program(functions=10, depth=4 * scale),
+    "classes": lambda scale: generate_program(functions=0, classes=10 * scale),
+    "modules": lambda scale: generate_program(modules=4 * scale, functions=5),
+}
+
+
+def settings_for(lang):
+    settings = ALL_SETTINGS[lang](Mock(indent=4, extension=False))
+    settings.transpiler.set_continue_on_unimplemented()
+    return settings
+
+
+def transpile(settings, filenames, sources):
+    with contextlib.redirect_stdout(io.StringIO()):
+        outputs, successful = _transpile(filenames, sources, settings)
+    if len(successful) != len(filenames):
+        raise RuntimeError(f"{settings.display_name} failed on a generated program")
+    return outputs
+
+
+def measure(settings, filenames, sources, repeat):
+    """The best time of repeat transpiles, and the peak traced memory of one"""
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transpile(settings, filenames, sources)
+        seconds = min(seconds, time.perf_counter() - start)
+    # Tracing slows transpiling down, so it isn't timed
+    tracemalloc.start()
+    try:
+        transpile(settings, filenames, sources)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def exponent(sizes, values):
+    """The least squares slope of log(values) over log(sizes)"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def run(langs, dimensions, scales, repeat):
+    results = {}
+    for lang in langs:
+        settings = settings_for(lang)
+        results[lang] = {}
+        for dimension in dimensions:
+            lines, seconds, peaks = [], [], []
+            for scale in scales:
+                filenames, sources = DIMENSIONS[dimension](scale)
+                elapsed, peak = measure(settings, filenames, sources, repeat)
+                lines.append(sum(len(source.splitlines()) for source in sources))
+                seconds.append(elapsed)
+                peaks.append(peak)
+            results[lang][dimension] = {
+                "lines": lines,
+                "seconds": seconds,
+                "peak_bytes": peaks,
+                "lines_per_second": lines[-1] / seconds[-1],
+                "time_exponent": exponent(lines, seconds),
+                "memory_exponent": exponent(lines, peaks),
+            }
+    return results
+
+
+def check(results, baseline, tolerance):
+    """The regressions of results against baseline, as messages"""
+    regressions = []
+    for lang, dimensions in results.items():
+        for dimension, result in dimensions.items():
+            expected = baseline.get(lang, {}).get(dimension)
+            if expected is None:
+                continue
+            for key in ["time_exponent", "memory_exponent"]:
+                if result[key] > expected[key] + tolerance:
+                    regressions.append(
+                        f"{lang} {dimension}: {key} {result[key]:.2f}"
+                        f" > baseline {expected[key]:.2f} + {tolerance}"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument(
+        "--dimensions", nargs="+", choices=sorted(DIMENSIONS), default=list(DIMENSIONS)
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("langs", nargs="*", default=DEFAULT_LANGS)
+    args = parser.parse_args()
+    if len(args.scales) < 2:
+        parser.error("--scales needs at least two scales to fit an exponent")
+
+    results = run(args.langs, args.dimensions, args.scales, args.repeat)
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    print(f"scales {args.scales}, best of {args.repeat}")
+    print(
+        "| lang | dimension | lines | lines/s | peak (MiB) "
+        "| time exponent | memory exponent | baseline exponents |"
+    )
+    print(
+        "|------|-----------|-------|---------|------------"
+        "|---------------|-----------------|--------------------|"
+    )
+    for lang, dimensions in results.items():
+        for dimension, result in dimensions.items():
+            expected = baseline.get(lang, {}).get(dimension)
+            before = ""
+            if expected is not None:
+                before = (
+                    f"{expected['time_exponent']:.2f}"
+                    f" / {expected['memory_exponent']:.2f}"
+                )
+            print(
+                f"| {lang} | {dimension} | {result['lines'][-1]} "
+                f"| {result['lines_per_second']:.0f} "
+                f"| {result['peak_bytes'][-1] / 2**20:.1f} "
+                f"| {result['time_exponent']:.2f} "
+                f"| {result['memory_exponent']:.2f} | {before} |"
+            )
+
+    if args.save_baseline:
+        for lang, dimensions in results.items():
+            for dimension, result in dimensions.items():
+                saved = baseline.setdefault(lang, {})
+                saved[dimension] = {
+                    key: round(result[key], 3)
+                    for key in ["time_exponent", "memory_exponent", "lines_per_second"]
+                }
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved the baseline to {args.baseline}")
+    if args.check:
+        regressions = check(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Super-linear regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Measure the memory node.scopes takes on a generated module, with the
+shared scope chains against a copy of the scope stack on every node.
+
+Run from anywhere:
+
+    python scripts/bench_scopes.py
+    python scripts/bench_scopes.py --lines 100000
+"""
+
+import argparse
+import ast
+import time
+import tracemalloc
+
+from py2many.scope import ScopeMixin, add_scope_context
+
+BLOCK = """\
+class Shape{i}:
+    def area(self, n: int) -> int:
+        total = 0
+        for a in range(n):
+            if a % 2:
+                for b in range(a):
+                    if b > 3:
+                        total += a * b
+            else:
+                total -= a
+        return total
+
+"""
+
+
+class CopiedScopes(list):
+    """Stands in for the list based ScopeList every node used to copy"""
+
+
+class CopyingScopeTransformer(ast.NodeTransformer, ScopeMixin):
+    """Annotates scopes the way ScopeTransformer did before the scopes of
+    nodes were shared"""
+
+    def __init__(self):
+        super().__init__()
+        self.scopes = []
+
+    def visit(self, node):
+        with self.enter_scope(node):
+            node.scopes = CopiedScopes(self.scopes)
+            return super().visit(node)
+
+
+def generate(lines):
+    block_lines = BLOCK.count("\n")
+    return "".join(BLOCK.format(i=i) for i in range(lines // block_lines))
+
+
+def measure(source, annotate):
+    tree = ast.parse(source)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    annotate(tree)
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50000)
+    args = parser.parse_args()
+
+    source = generate(args.lines)
+    nodes = sum(1 for _ in ast.walk(ast.parse(source)))
+    print(f"{source.count(chr(10))} lines, {nodes} nodes")
+    print("| scopes | memory (MiB) | bytes/node | time (s) |")
+    print("|--------|--------------|------------|----------|")
+    for name, annotate in [
+        ("copied", lambda tree: CopyingScopeTransformer().visit(tree)),
+        ("shared", add_scope_context),
+    ]:
+        used, elapsed = measure(source, annotate)
+        print(f"| {name} | {used / 2**20:.1f} | {used / nodes:.0f} | {elapsed:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Time CLI startup for a single file, against building every backend's
+settings up front as main() used to in order to list the language flags.
+
+Each measurement runs in a fresh interpreter, so imports and toolchain
+discovery (the ~/.conan scan for C++, locating JuliaFormatter) are included.
+Run from anywhere:
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --repeat 10 rust go
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SETUP_ALL = (
+    "from py2many.registry import FAKE_ARGS, _get_all_settings\n"
+    "_get_all_settings(FAKE_ARGS)\n"
+)
+SETUP_ONE = "from py2many.registry import ALL_SETTINGS, FAKE_ARGS\nALL_SETTINGS[{lang!r}](FAKE_ARGS)\n"
+
+
+def best_of(repeat, cmd):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("langs", nargs="*", default=["rust", "cpp", "go"])
+    args = parser.parse_args()
+
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        hello = Path(tmp) / "hello.py"
+        hello.write_text('print("hello")\n')
+        print(f"best of {args.repeat}")
+        all_settings = best_of(args.repeat, [python, "-c", SETUP_ALL])
+        print(f"building every backend's settings: {all_settings:.3f}s")
+        print()
+        print("| lang | settings (s) | `py2many --<lang> hello.py` (s) |")
+        print("|------|--------------|---------------------------------|")
+        for lang in args.langs:
+            one = best_of(args.repeat, [python, "-c", SETUP_ONE.format(lang=lang)])
+            cli = [python, "-m", "py2many", f"--{lang}", str(hello), "--outdir", tmp]
+            # The formatter may be missing; only the time matters here
+            cli.append("--ignore-formatter-errors")
+            startup = best_of(args.repeat, cli)
+            print(f"| {lang} | {one:.3f} | {startup:.3f} |")
+
+
+if __name__ == "__main__":
+    main()
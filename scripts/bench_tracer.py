@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Time the tracer's class, enum and self argument lookups over every name in
+the tests/cases that define classes.
+
+Run from anywhere, optionally on other modules:
+
+    python scripts/bench_tracer.py
+    python scripts/bench_tracer.py --repeat 20 pyrs/*.py
+"""
+
+import argparse
+import ast
+import time
+from pathlib import Path
+
+from py2many.cli import core_transformers
+from py2many.scope import add_scope_context
+from py2many.tracer import is_class_or_module, is_enum, is_self_arg
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CASES_DIR = REPO_ROOT / "tests" / "cases"
+
+
+def names(case):
+    """Analyse case and return the (name, scopes) of each Name in it"""
+    tree = ast.parse(case.read_text())
+    tree.__file__ = Path(case.name)
+    add_scope_context(tree)
+    core_transformers(tree, [tree], None)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            # As the transpilers do when emitting the class
+            for method in node.body:
+                if isinstance(method, ast.FunctionDef):
+                    method.self_type = node.name
+    # Names that inference synthesized have no scopes
+    return [
+        (node.id, node.scopes)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and hasattr(node, "scopes")
+    ]
+
+
+def lookup_all(lookups, predicates, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for predicate in predicates:
+            for name, scopes in lookups:
+                predicate(name, scopes)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("paths", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    cases = args.paths or sorted(CASES_DIR.glob("*.py"))
+    cases = [case for case in cases if "class " in case.read_text()]
+    lookups = [lookup for case in cases for lookup in names(case)]
+    print(f"{len(cases)} cases, {len(lookups)} names, {args.repeat} rounds")
+    print("| lookups | time (s) |")
+    print("|---------|----------|")
+    for predicate in [is_class_or_module, is_enum, is_self_arg]:
+        elapsed = lookup_all(lookups, [predicate], args.repeat)
+        print(f"| {predicate.__name__} | {elapsed:.3f} |")
+
+
+if __name__ == "__main__":
+    main()
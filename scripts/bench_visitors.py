@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Time transpiling tests/cases to Rust and C++ with the visitor results
+wrapped by methods wrapped once per class, against wrapping them on every
+attribute access as __getattribute__ used to.
+
+__getattribute__ ran on every attribute read of the transpiler, and made a
+new closure for each visit_* lookup. Run from anywhere:
+
+    python scripts/bench_visitors.py
+    python scripts/bench_visitors.py --repeat 5 rust
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _transpile
+from py2many.pycpp.cpp_ast import CppNode
+from py2many.pycpp.transpiler import CppTranspiler
+from py2many.pyrs.rust_ast import RustNode
+from py2many.pyrs.transpiler import RustTranspiler
+from py2many.registry import ALL_SETTINGS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CASES_DIR = REPO_ROOT / "tests" / "cases"
+
+TRANSPILERS = {"rust": (RustTranspiler, RustNode), "cpp": (CppTranspiler, CppNode)}
+
+
+@contextlib.contextmanager
+def per_access_wrapping(transpiler_class, node_class):
+    """Wrap visitor results on each attribute access, as they were before they
+    were wrapped once per class."""
+    wrapped = {
+        name: method
+        for name, method in vars(transpiler_class).items()
+        if getattr(method, "node_class", None) is node_class
+    }
+
+    def __getattribute__(self, name):
+        attr = super(transpiler_class, self).__getattribute__(name)
+        if not callable(attr):
+            return attr
+        if not (name.startswith("visit_") or name.startswith("_visit_")):
+            return attr
+
+        def node_visitor(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if isinstance(result, str):
+                return node_class(result)
+            return result
+
+        return node_visitor
+
+    for name, method in wrapped.items():
+        setattr(transpiler_class, name, method.__wrapped__)
+    transpiler_class.__getattribute__ = __getattribute__
+    try:
+        yield
+    finally:
+        del transpiler_class.__getattribute__
+        for name, method in wrapped.items():
+            setattr(transpiler_class, name, method)
+
+
+def transpile_cases(lang, cases):
+    settings = ALL_SETTINGS[lang](Mock(indent=4, extension=False))
+    settings.transpiler.set_continue_on_unimplemented()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        outputs = [
+            _transpile([Path(case.name)], [case.read_text()], settings)[0][0]
+            for case in cases
+        ]
+    return time.perf_counter() - start, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("langs", nargs="*", default=sorted(TRANSPILERS))
+    args = parser.parse_args()
+
+    cases = sorted(CASES_DIR.glob("*.py"))
+    nodes = sum(len(list(ast.walk(ast.parse(case.read_text())))) for case in cases)
+    print(f"{len(cases)} cases, {nodes} nodes, best of {args.repeat}")
+    print("| lang | per access (s) | per class (s) | saved per node (µs) | speedup |")
+    print("|------|----------------|---------------|---------------------|---------|")
+    for lang in args.langs:
+        with per_access_wrapping(*TRANSPILERS[lang]):
+            before = [transpile_cases(lang, cases) for _ in range(args.repeat)]
+        after = [transpile_cases(lang, cases) for _ in range(args.repeat)]
+        assert before[0][1] == after[0][1], f"{lang} output differs"
+        before = min(seconds for seconds, _ in before)
+        after = min(seconds for seconds, _ in after)
+        per_node = (before - after) / nodes * 1e6
+        print(
+            f"| {lang} | {before:.2f} | {after:.2f} | {per_node:.2f} "
+            f"| {before / after:.2f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -64,5 +64,11 @@ setup(
         "Topic :: Utilities",
     ],
     test_suite="tests",
-    entry_points={"console_scripts": ["py2many=py2many.cli:main"]},
+    entry_points={
+        "console_scripts": [
+            "py2many=py2many.cli:main",
+            "py2many-client=py2many.client:main",
+            "py2many-server=py2many.server:main",
+        ]
+    },
 )
@@ -0,0 +1,10 @@
+package main
+
+import (
+"fmt")
+
+
+
+
+var items List = []string{"a", "b"}
+fmt.Printf("%v\n",items);
@@ -0,0 +1,30 @@
+#include <cppitertools/range.hpp>  // NOLINT(build/include_order)
+#include <cstdint>  // NOLINT(build/include_order)
+#include <iostream>  // NOLINT(build/include_order)
+#include <vector>  // NOLINT(build/include_order)
+
+inline int array_loop(int iterations) {
+int array_length = 1000;
+std::vector<int> array = {};
+for(auto i : iter::range(array_length)) {
+array.push_back(i);
+}
+int total = 0;
+int iteration = 0;
+while (iteration < iterations) {
+int innerloop = 0;
+while (innerloop < 100) {
+total += array[(iteration + innerloop) % array_length];
+innerloop += 1;
+}
+total = total % 1000003;
+iteration += 1;
+}
+return total;
+}
+
+int main(int argc, char ** argv) {
+std::cout << array_loop(50000);
+std::cout << std::endl;
+}
+
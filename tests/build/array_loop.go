@@ -0,0 +1,30 @@
+package main
+
+import (
+	"fmt"
+	iter "github.com/hgfischer/go-iter"
+)
+
+func ArrayLoop(iterations int) int {
+	var array_length int = 1000
+	var array []int = []int{}
+	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(array_length)).All() {
+		array = append(array, i)
+	}
+	var total int = 0
+	var iteration int = 0
+	for iteration < iterations {
+		var innerloop int = 0
+		for innerloop < 100 {
+			total += array[((iteration + innerloop) % array_length)]
+			innerloop += 1
+		}
+		total = (total % 1000003)
+		iteration += 1
+	}
+	return total
+}
+
+func main() {
+	fmt.Printf("%v\n", ArrayLoop(50000))
+}
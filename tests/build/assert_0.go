@@ -0,0 +1,6 @@
+package main
+
+
+
+
+if !(!(0)) { panic("assert") }
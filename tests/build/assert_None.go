@@ -0,0 +1,6 @@
+package main
+
+
+
+
+if !(!(nil)) { panic("assert") }
@@ -0,0 +1,6 @@
+package main
+
+
+
+
+if !("a") { panic("assert") }
@@ -0,0 +1,31 @@
+#include <cppitertools/range.hpp>  // NOLINT(build/include_order)
+#include <cstdint>  // NOLINT(build/include_order)
+#include <iostream>  // NOLINT(build/include_order)
+#include <tuple>  // NOLINT(build/include_order)
+#include <vector>  // NOLINT(build/include_order)
+
+inline std::vector<int> bubble_sort(std::vector<int>& seq) {
+auto L = static_cast<int>(seq.size());
+for(auto _ : iter::range(L)) {
+for(auto n : iter::range(1, L)) {
+if(seq[n] < seq[n - 1]) {
+std::tie(seq[n - 1], seq[n]) = std::make_tuple(seq[n], seq[n - 1]);
+}
+}
+}
+return seq;
+}
+
+int main(int argc, char ** argv) {
+int size = 3000;
+std::vector<int> unsorted = {};
+for(auto i : iter::range(size)) {
+unsorted.push_back((i * 7919) % size);
+}
+std::vector<int> result = bubble_sort(unsorted);
+std::cout << result[0];
+std::cout << " ";
+std::cout << result[size - 1];
+std::cout << std::endl;
+}
+
@@ -0,0 +1,32 @@
+package main
+
+import (
+	"fmt"
+	iter "github.com/hgfischer/go-iter"
+)
+
+func BubbleSort(seq []int) []int {
+	L := len(seq)
+	for range iter.NewIntSeq(iter.Start(0), iter.Stop(L)).All() {
+		for _, n := range iter.NewIntSeq(iter.Start(1), iter.Stop(L)).All() {
+			if seq[n] < seq[(n-1)] {
+				{
+					var __tmp1, __tmp2 = seq[n], seq[(n - 1)]
+					seq[(n - 1)] = __tmp1
+					seq[n] = __tmp2
+				}
+			}
+		}
+	}
+	return seq
+}
+
+func main() {
+	var size int = 3000
+	var unsorted []int = []int{}
+	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(size)).All() {
+		unsorted = append(unsorted, ((i * 7919) % size))
+	}
+	var result []int = BubbleSort(unsorted)
+	fmt.Printf("%v %v\n", result[0], result[(size-1)])
+}
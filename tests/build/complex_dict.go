@@ -0,0 +1 @@
+FAILED
\ No newline at end of file
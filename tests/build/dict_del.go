@@ -0,0 +1,8 @@
+package main
+
+
+
+
+var a = map[int]int{1: 1}
+delete(a, 1)
+if !(!(a)) { panic("assert") }
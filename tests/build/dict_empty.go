@@ -0,0 +1,6 @@
+package main
+
+
+
+
+if !(!(map[None]None{})) { panic("assert") }
@@ -0,0 +1,6 @@
+package main
+
+
+
+
+if !(map[None]None{1: 2}.get(3, 3) == 3) { panic("assert") }
@@ -0,0 +1,9 @@
+package main
+
+import (
+"github.com/electrious/refutil")
+
+
+
+var a = map[int]int{1: 1}
+refutil.Contains(a.keys(), 1);
@@ -0,0 +1,6 @@
+package main
+
+
+
+
+map[None]None{1: 1}.keys();
@@ -0,0 +1,11 @@
+package main
+
+import (
+"github.com/google/go-cmp/cmp")
+
+
+
+var a = map[int]int{1: 1, 2: 2, 3: 3}
+delete(a, 2)
+a[2] = 2
+if !(cmp.Equal(list(a.keys()), []int{1, 3, 2})) { panic("assert") }
@@ -0,0 +1,8 @@
+package main
+
+import (
+"github.com/electrious/refutil")
+
+
+
+refutil.Contains(map[None]None{1: 1}.values(), 1);
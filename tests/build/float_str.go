@@ -0,0 +1,6 @@
+package main
+
+
+
+
+float64("2.71");
@@ -0,0 +1,9 @@
+package main
+
+import (
+"fmt"
+"strings")
+
+
+
+if !(strings.Join([]string{fmt.Sprintf("%v", (1 + 1))}, "")) { panic("assert") }
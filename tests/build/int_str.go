@@ -0,0 +1,6 @@
+package main
+
+
+
+
+int("7");
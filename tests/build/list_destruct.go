@@ -0,0 +1,6 @@
+package main
+
+
+
+
+var []None{a, b} List = []int{1, 2}
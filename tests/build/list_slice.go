@@ -0,0 +1,7 @@
+package main
+
+
+
+
+var a []int = []int{1, 2}
+var b []int = a[0..1]
@@ -0,0 +1,60 @@
+        //! ```cargo
+        //! [package]
+        //! edition = "2021"
+        //! [dependencies]
+        //! 
+        //! ```
+        
+
+#![allow(clippy::assertions_on_constants)]
+#![allow(clippy::bool_comparison)]
+#![allow(clippy::collapsible_else_if)]
+#![allow(clippy::comparison_to_empty)]
+#![allow(clippy::double_parens)] // https://github.com/adsharma/py2many/issues/17
+#![allow(clippy::eq_op)]
+#![allow(clippy::let_with_type_underscore)]
+#![allow(clippy::map_identity)]
+#![allow(clippy::needless_return)]
+#![allow(clippy::nonminimal_bool)]
+#![allow(clippy::partialeq_to_none)]
+#![allow(clippy::print_literal)]
+#![allow(clippy::ptr_arg)]
+#![allow(clippy::redundant_static_lifetimes)] // https://github.com/adsharma/py2many/issues/266
+#![allow(clippy::unnecessary_cast)]
+#![allow(clippy::upper_case_acronyms)]
+#![allow(clippy::useless_vec)]
+#![allow(non_camel_case_types)]
+#![allow(non_snake_case)]
+#![allow(non_upper_case_globals)]
+#![allow(unused_imports)]
+#![allow(unused_mut)]
+#![allow(unused_parens)]
+
+
+
+
+
+pub struct Foo {
+
+}
+
+impl Foo {
+pub struct Inner {
+
+}
+
+impl Inner {
+pub fn f1(&self) -> i32 {
+return self.f2();
+ }
+
+pub fn f2(&self) -> i32 {
+return 20;
+ }
+ 
+} 
+}
+pub fn main()  {
+Foo::Inner().f1();
+ }
+
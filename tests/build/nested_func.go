@@ -0,0 +1,17 @@
+package main
+
+
+
+
+func Foo() int {
+func bar() int {
+return 1}
+
+
+return bar()}
+
+
+func Main() {
+Foo();}
+
+
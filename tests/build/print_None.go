@@ -0,0 +1,8 @@
+package main
+
+import (
+"fmt")
+
+
+
+fmt.Printf("%v\n",nil);
@@ -0,0 +1,29 @@
+#include <cppitertools/range.hpp>  // NOLINT(build/include_order)
+#include <cstdint>  // NOLINT(build/include_order)
+#include <iostream>  // NOLINT(build/include_order)
+#include <vector>  // NOLINT(build/include_order)
+
+inline int count_primes(int n) {
+std::vector<bool> is_prime = {};
+for(auto _ : iter::range(n + 1)) {
+is_prime.push_back(true);
+}
+int count = 0;
+for(auto i : iter::range(2, n + 1)) {
+if(is_prime[i]) {
+count += 1;
+auto j = i * i;
+while (j <= n) {
+is_prime[j] = false;
+j += i;
+}
+}
+}
+return count;
+}
+
+int main(int argc, char ** argv) {
+std::cout << count_primes(2000000);
+std::cout << std::endl;
+}
+
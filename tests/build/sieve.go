@@ -0,0 +1,29 @@
+package main
+
+import (
+	"fmt"
+	iter "github.com/hgfischer/go-iter"
+)
+
+func CountPrimes(n int) int {
+	var is_prime []bool = []bool{}
+	for range iter.NewIntSeq(iter.Start(0), iter.Stop((n + 1))).All() {
+		is_prime = append(is_prime, true)
+	}
+	var count int = 0
+	for _, i := range iter.NewIntSeq(iter.Start(2), iter.Stop((n + 1))).All() {
+		if is_prime[i] {
+			count += 1
+			j := (i * i)
+			for j <= n {
+				is_prime[j] = false
+				j += i
+			}
+		}
+	}
+	return count
+}
+
+func main() {
+	fmt.Printf("%v\n", CountPrimes(2000000))
+}
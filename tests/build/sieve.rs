@@ -0,0 +1,58 @@
+//! ```cargo
+//! [package]
+//! edition = "2021"
+//! [dependencies]
+//! anyhow = "*"
+//! ```
+
+#![allow(clippy::assertions_on_constants)]
+#![allow(clippy::bool_comparison)]
+#![allow(clippy::collapsible_else_if)]
+#![allow(clippy::comparison_to_empty)]
+#![allow(clippy::double_parens)] // https://github.com/adsharma/py2many/issues/17
+#![allow(clippy::eq_op)]
+#![allow(clippy::let_with_type_underscore)]
+#![allow(clippy::map_identity)]
+#![allow(clippy::needless_return)]
+#![allow(clippy::nonminimal_bool)]
+#![allow(clippy::partialeq_to_none)]
+#![allow(clippy::print_literal)]
+#![allow(clippy::ptr_arg)]
+#![allow(clippy::redundant_static_lifetimes)] // https://github.com/adsharma/py2many/issues/266
+#![allow(clippy::unnecessary_cast)]
+#![allow(clippy::upper_case_acronyms)]
+#![allow(clippy::useless_vec)]
+#![allow(non_camel_case_types)]
+#![allow(non_snake_case)]
+#![allow(non_upper_case_globals)]
+#![allow(unused_imports)]
+#![allow(unused_mut)]
+#![allow(unused_parens)]
+
+extern crate anyhow;
+use anyhow::Result;
+use std::collections;
+
+pub fn count_primes(n: i32) -> i32 {
+    let mut is_prime: Vec<bool> = vec![];
+    for _ in (0..(n + 1)) {
+        is_prime.push(true);
+    }
+    let mut count: i32 = 0;
+    for i in (2..(n + 1)) {
+        if is_prime[i as usize] {
+            count += 1;
+            let mut j = (i * i);
+            while (j as i32) <= n {
+                is_prime[j as usize] = false;
+                j += i;
+            }
+        }
+    }
+    return count;
+}
+
+pub fn main() -> Result<()> {
+    println!("{}", count_primes(2000000));
+    Ok(())
+}
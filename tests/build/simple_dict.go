@@ -0,0 +1,9 @@
+package main
+
+import (
+"github.com/electrious/refutil")
+
+
+
+var LB = map[string]int{"a": 0}
+if !(refutil.Contains(LB, "a")) { panic("assert") }
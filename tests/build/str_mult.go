@@ -0,0 +1,8 @@
+package main
+
+import (
+"strings")
+
+
+
+strings.Repeat("a", 4);
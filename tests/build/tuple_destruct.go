@@ -0,0 +1,7 @@
+package main
+
+
+
+
+var foo, baz, qux = 4, 5, 6
+if !(foo != baz != qux) { panic("assert") }
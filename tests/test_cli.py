@@ -1,9 +1,12 @@
 import argparse
+import ast
 import difflib
 import importlib.util
+import json
 import logging
 import os.path
 import platform
+import subprocess
 import sys
 from functools import lru_cache
 from itertools import product
@@ -12,14 +15,30 @@ from unittest.mock import Mock
 
 import pytest
 
+from py2many.cache import TranspileCache
 from py2many.cli import (
+    _changed_statements,
     _create_cmd,
+    _format_many,
     _get_all_settings,
     _get_output_path,
+    _parse_sorted,
+    _pipeline,
+    _process_many,
+    _process_stream,
     _relative_to_cwd,
 )
 from py2many.cli import _run as run
-from py2many.cli import main
+from py2many.cli import (
+    _statement_nodes,
+    _transpile,
+    _transpile_parallel,
+    _transpile_targets,
+    core_transformers,
+    main,
+    reanalyse,
+)
+from py2many.language import LanguageSettings
 from py2many.process_helpers import find_executable
 
 try:
@@ -227,6 +246,31 @@ def is_declarative(ext):
     return ext in {".smt"}
 
 
+# Marks each file formatted, the way a formatter rewrites it in place
+MARKING_FORMATTER = (
+    "import sys\n"
+    "for p in sys.argv[1:]:\n"
+    "    s = open(p).read()\n"
+    "    open(p, 'w').write(s + '// formatted\\n')\n"
+)
+
+
+def marking_go_settings(monkeypatch):
+    """Go settings formatting with MARKING_FORMATTER, and the list the names
+    of the files they format are appended to"""
+    settings = _get_all_settings(Mock(indent=4))["go"]
+    settings.formatter = [sys.executable, "-c", MARKING_FORMATTER]
+    formatted = []
+    format_many = py2many.cli._format_many
+
+    def spy_format_many(settings, output_paths, *args):
+        formatted.extend(Path(path).name for path in output_paths)
+        return format_many(settings, output_paths, *args)
+
+    monkeypatch.setattr(py2many.cli, "_format_many", spy_format_many)
+    return settings, formatted
+
+
 class TestCodeGenerator:
     maxDiff = None
 
@@ -624,6 +668,325 @@ class TestCodeGenerator:
             _get_output_path(Path("dir/foo.py"), ".rs", base) == Path("dir") / "foo.rs"
         )
 
+    @pytest.mark.parametrize("lang", ["rust", "python"])
+    def test_transpile_jobs_matches_serial(self, lang):
+        settings = _get_all_settings(Mock(indent=4))[lang]
+        base = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py"), Path("swap.py")]
+        sources = [(base / f).read_text() for f in filenames[:3]]
+        sources.append(
+            "from bar import bar1\n\n"
+            "def swap(a: list[int]):\n"
+            "    a[0], a[1] = a[1], a[0]\n"
+            "    return bar1()\n"
+        )
+
+        serial = _transpile(filenames, sources, settings)
+        parallel = _transpile(filenames, sources, settings, jobs=2)
+
+        assert parallel == serial
+        assert "__tmp1" in serial[0][3]
+
+    def test_transpile_parallel_sends_export_stubs_back(self):
+        settings = _get_all_settings(Mock(indent=4))["go"]
+        base = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py")]
+        sources = [(base / f).read_text() for f in filenames]
+        trees = _parse_sorted(filenames, sources)
+
+        outputs = _transpile_parallel(trees, _pipeline(settings), 2, Exception)
+
+        # foo.py imports from the others, whose workers sent their stubs back
+        stubs = {t.__file__ for t in trees if hasattr(t, "exports")}
+        assert stubs == {Path("bar.py"), Path("baz.py")}
+        serial, _ = _transpile(filenames, sources, settings)
+        assert [outputs[f][0] for f in filenames] == serial
+
+    def test_export_tables_only_for_imported_modules(self, monkeypatch, tmp_path):
+        settings = _get_all_settings(Mock(indent=4))["go"]
+        settings.formatter = None
+        base = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py"), Path("qux.py")]
+        sources = [(base / f).read_text() for f in filenames[:3]]
+        # Sorted before foo.py, which imports the others
+        sources.append("def qux1():\n    return 2\n")
+        source = tmp_path / "src"
+        source.mkdir()
+        for filename, text in zip(filenames, sources):
+            (source / filename).write_text(text)
+        exported = []
+        add_export_table = py2many.cli.add_export_table
+
+        def spy_add_export_table(tree):
+            exported.append(tree.__file__)
+            return add_export_table(tree)
+
+        monkeypatch.setattr(py2many.cli, "add_export_table", spy_add_export_table)
+        _transpile(filenames[:1], sources[:1], settings)
+        assert exported == []
+        _transpile(filenames, sources, settings)
+        assert sorted(exported) == [Path("bar.py"), Path("baz.py")]
+        exported.clear()
+        _process_stream(settings, source, filenames, tmp_path)
+        assert sorted(exported) == [Path("bar.py"), Path("baz.py")]
+
+    @pytest.mark.parametrize("lang", ["go", "julia", "rust"])
+    def test_incremental_reanalysis_matches_full(self, lang):
+        settings = _get_all_settings(Mock(indent=4))[lang]
+        settings.transpiler.set_continue_on_unimplemented()
+        full = argparse.Namespace(typpete=False, full_reanalysis=True)
+        for case in ["classes", "loop", "print", "stdlib_str"]:
+            filename = Path(f"{case}.py")
+            source = (TESTS_DIR / "cases" / filename).read_text()
+            incremental = _transpile([filename], [source], settings)
+            assert incremental == _transpile([filename], [source], settings, full)
+
+    def test_reanalysis_sees_edits_in_place(self):
+        tree = ast.parse("a = [1]\nb = [2]\na.append(3)\nb.extend([4])\n")
+        core_transformers(tree, [tree], None)
+        a, b = tree.body[0].targets[0], tree.body[1].targets[0]
+        append, extend = tree.body[2].value, tree.body[3].value
+        assert (a.calls, b.calls) == ([append], [extend])
+
+        # A rewriter renames the list appended to, and removes the extend
+        snapshot = _statement_nodes(tree)
+        append.func.value.id = "b"
+        del tree.body[3]
+        changed, removed = _changed_statements(tree, snapshot)
+        assert changed == [(tree, [tree.body[2]])]
+        reanalyse(tree, [tree], None, changed, removed)
+        assert (a.calls, b.calls) == ([], [append])
+
+        # Analysing again records each call once
+        snapshot = _statement_nodes(tree)
+        tree.body[2].value.args[0].value = 5
+        reanalyse(tree, [tree], None, *_changed_statements(tree, snapshot))
+        assert b.calls == [append]
+
+    def test_process_many_reuses_cache(self, capsys, monkeypatch, tmp_path):
+        settings = _get_all_settings(Mock(indent=4))["go"]
+        settings.formatter = None
+        base = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        source = tmp_path / "src"
+        source.mkdir()
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py")]
+        for filename in filenames:
+            (source / filename).write_text((base / filename).read_text())
+        cache = TranspileCache(tmp_path / "cache")
+
+        cold = tmp_path / "cold"
+        cold.mkdir()
+        assert _process_many(settings, source, filenames, cold, cache=cache) == (
+            set(filenames),
+            set(),
+        )
+
+        transpiled = []
+        transpile_one = py2many.cli._transpile_one
+
+        def spy_transpile_one(trees, tree, *args):
+            transpiled.append(tree.__file__)
+            return transpile_one(trees, tree, *args)
+
+        monkeypatch.setattr(py2many.cli, "_transpile_one", spy_transpile_one)
+        warm = tmp_path / "warm"
+        warm.mkdir()
+        _process_many(settings, source, filenames, warm, cache=cache)
+        assert transpiled == []
+        for filename in filenames:
+            cold_output = _get_output_path(filename, ".go", cold).read_text()
+            assert _get_output_path(filename, ".go", warm).read_text() == cold_output
+
+        # Editing a module invalidates the modules that import it
+        (source / "bar.py").write_text("def bar1():\n    return 1\n")
+        capsys.readouterr()
+        _process_many(settings, source, filenames, warm, cache=cache)
+        assert "Cache: 1 hits, 2 misses" in capsys.readouterr().out
+        assert "return 1" in _get_output_path(Path("bar.py"), ".go", warm).read_text()
+
+    def test_cache_dir_rejects_file_inputs(self, capsys, tmp_path):
+        source = ROOT_DIR / "tests" / "dir_cases" / "test1" / "bar.py"
+        args = ["--go", f"--cache-dir={tmp_path}", f"--outdir={tmp_path}"]
+        assert main(args + [str(source)]) == -1
+        assert main(args + ["-"]) == -1
+        assert "--cache-dir supported only" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_process_many_keeps_unchanged_outputs(self, monkeypatch, tmp_path, stream):
+        settings, formatted = marking_go_settings(monkeypatch)
+        base = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        source = tmp_path / "src"
+        source.mkdir()
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py")]
+        for filename in filenames:
+            (source / filename).write_text((base / filename).read_text())
+        outdir = tmp_path / "out"
+        outdir.mkdir()
+        process = _process_stream if stream else _process_many
+
+        process(settings, source, filenames, outdir)
+        assert sorted(formatted) == ["bar.go", "baz.go", "foo.go"]
+        output_paths = [_get_output_path(f, ".go", outdir) for f in filenames]
+        for output_path in output_paths:
+            assert output_path.read_text().endswith("// formatted\n")
+            os.utime(output_path, ns=(0, 0))
+
+        # Formatted again, into the files they were
+        formatted.clear()
+        process(settings, source, filenames, outdir)
+        assert sorted(formatted) == ["bar.go", "baz.go", "foo.go"]
+        assert [p.stat().st_mtime_ns for p in output_paths] == [0, 0, 0]
+        assert sorted(p.name for p in outdir.iterdir()) == [
+            "bar.go",
+            "baz.go",
+            "foo.go",
+        ]
+
+        formatted.clear()
+        (source / "bar.py").write_text("def bar1():\n    return 1\n")
+        process(settings, source, filenames, outdir)
+        assert [p.stat().st_mtime_ns == 0 for p in output_paths] == [
+            False,
+            True,
+            True,
+        ]
+        assert "return 1" in output_paths[0].read_text()
+
+    def test_process_many_records_formatted_outputs_in_cache(
+        self, monkeypatch, tmp_path
+    ):
+        settings, formatted = marking_go_settings(monkeypatch)
+        source = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("bar.py"), Path("baz.py"), Path("foo.py")]
+        outdir = tmp_path / "out"
+        outdir.mkdir()
+        cache = TranspileCache(tmp_path / "cache")
+
+        _process_many(settings, source, filenames, outdir, cache=cache)
+        assert sorted(formatted) == ["bar.go", "baz.go", "foo.go"]
+        output_paths = [_get_output_path(f, ".go", outdir) for f in filenames]
+        for output_path in output_paths:
+            os.utime(output_path, ns=(0, 0))
+
+        # Transpiled again, the record in the cache finds the outputs
+        # formatted on disk
+        for path in (tmp_path / "cache").glob("*.json"):
+            if "output" in json.loads(path.read_text()):
+                path.unlink()
+        formatted.clear()
+        _process_many(settings, source, filenames, outdir, cache=cache)
+        assert formatted == []
+        assert [p.stat().st_mtime_ns for p in output_paths] == [0, 0, 0]
+        assert sorted(p.name for p in outdir.iterdir()) == [
+            "bar.go",
+            "baz.go",
+            "foo.go",
+        ]
+
+    @pytest.mark.parametrize("lang", ["go", "rust"])
+    def test_process_stream_matches_process_many(self, capsys, tmp_path, lang):
+        settings = _get_all_settings(Mock(indent=4))[lang]
+        settings.formatter = None
+        source = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("foo.py"), Path("baz.py"), Path("bar.py")]
+        whole = tmp_path / "whole"
+        streamed = tmp_path / "streamed"
+        whole.mkdir()
+        streamed.mkdir()
+
+        expected = _process_many(settings, source, filenames, whole)
+        capsys.readouterr()
+        assert _process_stream(settings, source, filenames, streamed) == expected
+        assert "Peak RSS: " in capsys.readouterr().out
+        for filename in filenames:
+            output = _get_output_path(filename, settings.ext, streamed).read_text()
+            assert output == _get_output_path(filename, settings.ext, whole).read_text()
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_transpile_targets_matches_transpile(self, jobs):
+        all_settings = _get_all_settings(Mock(indent=4))
+        targets = [all_settings[lang] for lang in ["go", "rust", "cpp"]]
+        source = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        filenames = [Path("foo.py"), Path("baz.py"), Path("bar.py")]
+        sources = [(source / filename).read_text() for filename in filenames]
+
+        expected = [_transpile(filenames, sources, settings) for settings in targets]
+        assert _transpile_targets(filenames, sources, targets, jobs=jobs) == expected
+
+    def test_targets_writes_each_language(self, capsys, tmp_path):
+        source = ROOT_DIR / "tests" / "dir_cases" / "test1"
+        args = [
+            "--targets=go,rust",
+            "--ignore-formatter-errors",
+            f"--outdir={tmp_path}",
+        ]
+        assert main(args + [str(source)]) == 0
+        for name in ["foo", "bar", "baz"]:
+            assert (tmp_path / f"{name}.go").exists()
+            assert (tmp_path / f"{name}.rs").exists()
+
+        capsys.readouterr()
+        assert main(["--targets=go,cobol", str(source)]) == -1
+        assert "Unknown target: cobol" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_format_many_attributes_batch_errors(self, monkeypatch, tmp_path, jobs):
+        # A formatter that fails on any path containing "bad"
+        script = "import sys; sys.exit(any('bad' in p for p in sys.argv[1:]))"
+        settings = LanguageSettings(
+            Mock(), ".py", "Test", [sys.executable, "-c", script], batch_format=True
+        )
+        good = [tmp_path / f"good{i}.py" for i in range(3)]
+        bad = tmp_path / "bad.py"
+        calls = []
+
+        def counting_run(cmd, **kwargs):
+            calls.append(cmd)
+            return run(cmd, **kwargs)
+
+        monkeypatch.setattr(py2many.cli, "_run", counting_run)
+
+        assert _format_many(settings, good, jobs=jobs) == set()
+        assert len(calls) == 1
+
+        calls.clear()
+        assert _format_many(settings, good + [bad], jobs=jobs) == {bad}
+        # The failed batch is retried one file at a time
+        assert len(calls) == 1 + len(good) + 1
+
+    def test_format_many_runs_ktlint_twice_per_batch(self, monkeypatch, tmp_path):
+        settings = LanguageSettings(
+            Mock(), ".kt", "Test", [sys.executable, "-c", "pass"], batch_format=True
+        )
+        paths = [tmp_path / "a.kt", tmp_path / "sub" / "b.kt"]
+        calls = []
+
+        def counting_run(cmd, **kwargs):
+            calls.append((cmd[3:], kwargs["cwd"]))
+            return run(cmd, **kwargs)
+
+        monkeypatch.setattr(py2many.cli, "_run", counting_run)
+
+        assert _format_many(settings, paths) == set()
+        # Both rounds format the whole batch, from the directory the paths
+        # have in common as ktlint needs relative paths
+        expected = (["a.kt", os.path.join("sub", "b.kt")], str(tmp_path))
+        assert calls == [expected, expected]
+
+    def test_format_many_runs_lean_once_per_batch(self, monkeypatch, tmp_path):
+        settings = _get_all_settings(Mock(indent=4))["lean"]
+        paths = [tmp_path / f"mod{i}.lean" for i in range(3)]
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0)
+
+        monkeypatch.setattr(py2many.cli, "_run", fake_run)
+
+        assert _format_many(settings, paths) == set()
+        assert calls == [settings.formatter + [str(path) for path in paths]]
+
     def test_vlang_argparse(self, tmp_path):
         if not find_executable("v"):
             raise pytest.skip("v not available")
@@ -732,6 +1095,20 @@ class TestCodeGenerator:
             assert proc.returncode == expected_returncode
             assert proc.stdout.splitlines() == expected_stdout
 
+    def test_main_imports_only_the_selected_backend(self, tmp_path):
+        source = tmp_path / "hello.py"
+        source.write_text('print("hello")\n')
+        code = (
+            "import sys\n"
+            "from py2many.cli import main\n"
+            "from py2many.registry import BACKENDS\n"
+            f"main(['--rust', {str(source)!r}, '--outdir', {str(tmp_path)!r}])\n"
+            "packages = {b.package for b in BACKENDS.values()}\n"
+            "print(sorted(m for m in sys.modules if m.split('.')[-1] in packages))\n"
+        )
+        proc = run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert proc.stdout.splitlines()[-1] == "['py2many.pyrs']"
+
     def test_main_processes_multiple_inputs(self, monkeypatch, tmp_path):
         first = tmp_path / "first"
         second = tmp_path / "second"
@@ -740,7 +1117,7 @@ class TestCodeGenerator:
         second.mkdir()
         calls = []
 
-        def fake_process_dir(settings, source, outdir, project, env=None):
+        def fake_process_dir(settings, source, outdir, project, env=None, **kwargs):
             calls.append(source)
             return ({Path("module.py")}, set(), set())
 
@@ -1,9 +1,84 @@
 import ast
+import os
 
-from py2many.clike import c_symbol
+from py2many.clike import (
+    TYPENAME_CACHE_SIZE,
+    _parse_typename,
+    _resolve_unqualified,
+    c_symbol,
+    class_for_typename,
+    i32,
+    wrap_visitors,
+)
 
 
 def test_c_symbol():
     source = ast.parse("x == y")
     equals_symbol = source.body[0].value.ops[0]
     assert c_symbol(equals_symbol) == "=="
+
+
+def test_class_for_typename():
+    assert class_for_typename("int", None) is int
+    assert class_for_typename("i32", None) is i32
+    assert class_for_typename("[int][0]", None) is int
+    assert class_for_typename("os.path.join", None) is os.path.join
+    # Method of an instance resolves to the method of its class
+    assert class_for_typename("os.sep.join", None) is str.join
+    assert class_for_typename("undefined_name", "default") == "default"
+    assert class_for_typename("os.undefined", "default") == "default"
+    assert class_for_typename("int(", "default") == "default"
+    assert class_for_typename("super().foo", "default") is None
+
+
+def test_class_for_typename_uses_imported_names():
+    # Names imported by the module being transpiled shadow the defaults
+    assert class_for_typename("int", None) is int
+    assert class_for_typename("int", None, {"int": float}) is float
+    assert class_for_typename("[int][0]", None, {"int": float}) is float
+    assert class_for_typename("int", None) is int
+
+
+def test_class_for_typename_caches_are_bounded():
+    for i in range(TYPENAME_CACHE_SIZE + 10):
+        assert class_for_typename(f"undefined_{i}", "default") == "default"
+    assert _parse_typename.cache_info().currsize <= TYPENAME_CACHE_SIZE
+    assert _resolve_unqualified.cache_info().currsize <= TYPENAME_CACHE_SIZE
+
+
+class Node(str):
+    pass
+
+
+def test_wrap_visitors_wraps_each_method_once():
+    class Base:
+        def visit_Name(self, node):
+            return "name"
+
+        @classmethod
+        def _visit_type(cls, typename):
+            return typename
+
+    class Visitor(Base):
+        def __init_subclass__(cls, **kwargs):
+            super().__init_subclass__(**kwargs)
+            wrap_visitors(cls, Node)
+
+        def _visit_none(self):
+            return None
+
+    wrap_visitors(Visitor, Node)
+
+    class Override(Visitor):
+        def visit_Name(self, node):
+            return "override"
+
+    assert type(Visitor().visit_Name(None)) is Node
+    assert Visitor()._visit_none() is None
+    assert type(Visitor._visit_type("int")) is str
+    assert type(Base().visit_Name(None)) is str
+    assert type(Override().visit_Name(None)) is Node
+    # Inherited methods aren't wrapped again
+    assert vars(Visitor)["_visit_none"].__wrapped__.__name__ == "_visit_none"
+    assert "_visit_none" not in vars(Override)
+    assert "__getattribute__" not in vars(Visitor)
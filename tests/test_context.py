@@ -1,6 +1,15 @@
 import ast
+from pathlib import Path
 
-from py2many.context import add_list_calls, add_variable_context
+from py2many.ast_helpers import get_id
+from py2many.context import (
+    add_export_table,
+    add_list_calls,
+    add_variable_context,
+    update_variable_context,
+)
+from py2many.context_transformer import add_context, update_context
+from py2many.inference import infer_types
 from py2many.scope import add_scope_context
 
 
@@ -11,6 +20,13 @@ def parse(*args):
     return source
 
 
+def parse_module(name, *args):
+    source = ast.parse("\n".join(args))
+    source.__file__ = Path(f"{name}.py")
+    add_scope_context(source)
+    return source
+
+
 class TestListCallTransformer:
     def test_call_added(self):
         source = parse("results = []", "results.append(x)")
@@ -84,3 +100,64 @@ class TestVariableTranformer:
         )
         assert len(source.vars) == 1
         assert len(source.body[0].body[1].vars) == 1
+
+    def test_update_keeps_other_statements(self):
+        source = parse("x = 5", "class Foo:", "    y = 1", "    def bar(self): pass")
+        add_context(source)
+        cls = source.body[1]
+        cls.body[0] = ast.parse("z = 2").body[0]
+        update_context(cls, [cls.body[0]])
+        update_variable_context(cls, (source,), [cls.body[0]])
+        assert [getattr(v, "id", None) for v in cls.vars] == ["z", None]
+        assert cls.vars[1] is cls.body[1]
+        assert source.vars[1] is cls
+
+
+class TestExportTable:
+    def test_summaries_keep_types_but_not_the_tree(self):
+        source = parse_module(
+            "dep", "def foo(x: int) -> int:", "    return x", "y = 5", "class Bar: pass"
+        )
+        add_variable_context(source, (source,))
+        infer_types(source)
+        add_export_table(source)
+        exports = source.exports
+        assert set(exports) == {"foo", "y", "Bar"}
+        foo = exports["foo"]
+        assert foo is not source.body[0]
+        assert foo.body == []
+        assert get_id(foo.returns) == "int"
+        assert get_id(exports["y"].annotation) == "int"
+        assert list(foo.scopes) == [exports.module, foo]
+        assert exports.module.scopes.find("Bar") is exports["Bar"]
+
+    def test_classes_keep_their_members(self):
+        source = parse_module(
+            "dep",
+            "from enum import Enum",
+            "class Color(Enum):",
+            "    RED = 1",
+            "class Point:",
+            "    def norm(self) -> int:",
+            "        return 1",
+        )
+        add_variable_context(source, (source,))
+        infer_types(source)
+        add_export_table(source)
+        color, point = source.exports["Color"], source.exports["Point"]
+        assert [get_id(v) for v in color.vars] == ["RED"]
+        assert color.body[0].value.value == 1
+        norm = point.body[0]
+        assert norm is not source.body[2].body[0]
+        assert norm.body == []
+        assert get_id(norm.returns) == "int"
+        assert norm.scopes.find("norm") is norm
+
+    def test_import_resolves_from_export_table(self):
+        dep = parse_module("dep", "def foo(): pass")
+        add_variable_context(dep, (dep,))
+        add_export_table(dep)
+        importer = parse_module("main", "from dep import foo, missing")
+        # The importer only sees dep's export table, as in directory mode
+        add_variable_context(importer, (dep.exports.module, importer))
+        assert importer.vars == [dep.exports["foo"], None]
@@ -0,0 +1,136 @@
+import ast
+
+from py2many.context_transformer import add_context, update_context
+from py2many.scope import add_scope_context
+
+SOURCE = """
+from typing import Dict, List
+
+x: Dict[str, List[int]] = {}
+
+class Foo:
+    def bar(self, a: List[int], b: int = 1) -> Dict[str, int]:
+        for i in a:
+            if i > b:
+                x[str(i)] = [i]
+            else:
+                self.y, z = i, b
+                z += 1
+        while b:
+            b -= 1
+        return {}
+
+f = lambda n: n + 1
+"""
+
+
+def annotations(tree):
+    positions = {id(node): i for i, node in enumerate(ast.walk(tree))}
+    result = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.expr_context, ast.operator, ast.cmpop)):
+            # Shared singletons, annotated wherever they were visited last
+            continue
+        result.append(
+            (
+                type(node).__name__,
+                getattr(node, "lhs", False),
+                getattr(node, "level", None),
+                getattr(node, "is_annotation", False),
+                [positions[id(scope)] for scope in node.scopes],
+            )
+        )
+    return result
+
+
+class TestContextTransformer:
+    def test_scopes_match_scope_transformer(self):
+        separate = ast.parse(SOURCE)
+        add_scope_context(separate)
+        fused = ast.parse(SOURCE)
+        add_context(fused)
+
+        def scopes(tree):
+            return [scopes for _, _, _, _, scopes in annotations(tree)]
+
+        assert scopes(fused) == scopes(separate)
+
+    def test_lhs(self):
+        tree = ast.parse(SOURCE)
+        add_context(tree)
+        lhs = {
+            ast.unparse(node)
+            for node in ast.walk(tree)
+            if getattr(node, "lhs", False) and isinstance(node, ast.expr)
+        }
+        assert lhs == {
+            "x",
+            "x[str(i)]",
+            "str(i)",
+            "str",
+            "i",
+            "(self.y, z)",
+            "self.y",
+            "self",
+            "z",
+            "b",
+            "f",
+        }
+
+    def test_levels(self):
+        tree = ast.parse(SOURCE)
+        add_context(tree)
+        levels = [
+            (type(node).__name__, node.level)
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.If, ast.While))
+            or isinstance(node, (ast.For, ast.Assign))
+        ]
+        assert levels == [
+            ("ClassDef", 0),
+            ("Assign", 0),
+            ("FunctionDef", 1),
+            ("For", 2),
+            ("While", 2),
+            ("If", 3),
+            ("Assign", 4),
+            ("Assign", 4),
+        ]
+
+    def test_annotations(self):
+        tree = ast.parse(SOURCE)
+        add_context(tree)
+        ann_assign = tree.body[1]
+        assert ann_assign.target.lhs
+        assert ann_assign.target.is_annotation
+        method = tree.body[2].body[0]
+        assert method.level == 1
+        assert method.args.args[1].annotation.is_annotation
+        assert method.body[0].body[0].level == 3
+        assert not hasattr(method.body[0].iter, "lhs")
+        flagged = {
+            ast.unparse(node)
+            for node in ast.walk(tree)
+            if getattr(node, "is_annotation", False)
+        }
+        assert flagged == {
+            "x",
+            "List",
+            "List[int]",
+            "int",
+            "str",
+            "Dict",
+            "(str, int)",
+            "Dict[str, int]",
+        }
+
+    def test_update_matches_full_walk(self):
+        tree = ast.parse(SOURCE)
+        add_context(tree)
+        cls = tree.body[2]
+        cls.body[0].body.insert(0, ast.parse("y: List[int] = [b]").body[0])
+        update_context(cls, [cls.body[0]])
+        updated = annotations(tree)
+
+        add_context(tree)
+        assert updated == annotations(tree)
@@ -14,6 +14,7 @@ from py2many.pycpp.cpp_ast import (
     CppRenderer,
     CppReturn,
     CppSourceFile,
+    _load_tree_sitter_cpp,
 )
 from py2many.pycpp.transpiler import CppTranspiler
 from py2many.scope import add_scope_context
@@ -96,3 +97,16 @@ def test_cpp_transpiler_simple_visitors_return_tree_sitter_nodes():
         "return y;\n"
         "}\n"
     )
+
+
+def test_tree_sitter_node_parses_lazily_with_a_shared_parser():
+    node = CppNode("int answer = 42;")
+
+    assert "_tree" not in vars(node.node)
+    assert node.render() == "int answer = 42;"
+    assert "_tree" not in vars(node.node)
+
+    assert not node.has_error
+    assert node.tree is not None
+    assert CppNode("int answer = ;").has_error
+    assert _load_tree_sitter_cpp() is _load_tree_sitter_cpp()
@@ -0,0 +1,118 @@
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+import pyjl
+from py2many import format_worker
+from py2many.cli import _format_many, _format_one
+from py2many.format_worker import close_workers, get_worker
+from py2many.language import LanguageSettings
+
+# Appends its pid to the files named on stdin, failing on those named "bad"
+# and exiting on those named "crash"
+WORKER = """\
+import os, sys
+print("ready", flush=True)
+for line in sys.stdin:
+    path = line.strip()
+    if "crash" in path:
+        sys.exit(1)
+    if "bad" in path:
+        print("error bad input", flush=True)
+        continue
+    with open(path, "a") as f:
+        f.write(f"worker {os.getpid()}\\n")
+    print("ok", flush=True)
+"""
+FORMATTER = "import sys; open(sys.argv[1], 'a').write('formatter\\n')"
+# Fills more than a pipe holds with stderr, then never answers
+STALLING_WORKER = """\
+import sys, time
+sys.stderr.write("x" * 100000 + "stalled")
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture(autouse=True)
+def workers():
+    yield
+    close_workers()
+
+
+def settings(worker_script=WORKER):
+    return LanguageSettings(
+        Mock(),
+        ".jl",
+        "Test",
+        [sys.executable, "-c", FORMATTER],
+        format_worker=[sys.executable, "-c", worker_script],
+    )
+
+
+def test_worker_formats_every_file(tmp_path):
+    paths = [tmp_path / f"good{i}.jl" for i in range(3)]
+    bad = tmp_path / "bad.jl"
+    for path in paths + [bad]:
+        path.write_text("")
+
+    assert _format_many(settings(), paths + [bad], jobs=2) == {bad}
+    pids = {path.read_text() for path in paths}
+    # One process formatted them all
+    assert len(pids) == 1
+    assert pids.pop().startswith("worker ")
+    assert bad.read_text() == ""
+
+
+def test_worker_that_cannot_start_falls_back(capsys, tmp_path):
+    path = tmp_path / "good.jl"
+    path.write_text("")
+    failing = settings("import sys; sys.exit(1)")
+
+    assert _format_one(failing, path)
+    assert _format_one(failing, path)
+    assert path.read_text() == "formatter\nformatter\n"
+    assert get_worker(failing.format_worker) is None
+    assert "Formatting one file at a time" in capsys.readouterr().out
+
+
+def test_worker_restarts_after_exiting(tmp_path):
+    crash = tmp_path / "crash.jl"
+    good = tmp_path / "good.jl"
+    crash.write_text("")
+    good.write_text("")
+
+    assert _format_one(settings(), crash)
+    # Formatted on its own, by the formatter
+    assert crash.read_text() == "formatter\n"
+    assert _format_one(settings(), good)
+    assert good.read_text().startswith("worker ")
+
+
+def test_worker_that_stalls_falls_back(capsys, monkeypatch, tmp_path):
+    monkeypatch.setattr(format_worker, "FORMAT_TIMEOUT", 0.5)
+    path = tmp_path / "good.jl"
+    path.write_text("")
+    stalling = settings(STALLING_WORKER)
+
+    assert _format_one(stalling, path)
+    assert _format_one(stalling, path)
+    assert path.read_text() == "formatter\nformatter\n"
+    # Not started again
+    assert get_worker(stalling.format_worker) is None
+    out = capsys.readouterr().out
+    assert "didn't answer in 0.5s: " in out
+    assert out.rstrip().endswith("stalled")
+
+
+def test_julia_settings_find_the_formatter_only_without_worker(monkeypatch):
+    def julia_formatter_path():
+        raise AssertionError("started julia to find format.jl")
+
+    monkeypatch.setattr(pyjl, "find_executable", lambda name: name == "julia")
+    monkeypatch.setattr(pyjl, "_julia_formatter_path", julia_formatter_path)
+    settings = pyjl.settings(Mock(indent=4))
+    assert settings.formatter == settings.format_worker
+    with pytest.raises(AssertionError):
+        settings.resolve_formatter()
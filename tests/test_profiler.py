@@ -0,0 +1,77 @@
+import io
+import json
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _get_all_settings, _transpile, main
+from py2many.profiler import PassProfile
+
+TESTS_DIR = Path(__file__).parent.absolute()
+SOURCE_DIR = TESTS_DIR / "dir_cases" / "test1"
+FILENAMES = [Path("foo.py"), Path("baz.py"), Path("bar.py")]
+
+
+def test_profile_records_each_pass():
+    settings = _get_all_settings(Mock(indent=4))["go"]
+    sources = [(SOURCE_DIR / filename).read_text() for filename in FILENAMES]
+    expected = _transpile(FILENAMES, sources, settings)
+
+    profile = PassProfile()
+    with profile:
+        assert _transpile(FILENAMES, sources, settings, profile=profile) == expected
+    assert sorted(profile.files) == ["bar.py", "baz.py", "foo.py"]
+    passes = profile.files["foo.py"]
+    for name in [
+        "scope",
+        "rewriters.ComplexDestructuringRewriter",
+        "core.inference",
+        "transformers.infer_go_types",
+        "post_rewriters.LoopElseRewriter",
+        "reanalyse.inference",
+        "transpiler",
+        "transpiler.visit_FunctionDef",
+    ]:
+        assert passes[name].calls == 1, name
+    assert profile.totals()["core.inference"].calls == 3
+    # The visit_* methods are only wrapped while transpiling
+    assert not [name for name in vars(settings.transpiler) if name.startswith("visit_")]
+
+    lines = profile.table().splitlines()
+    seconds = [float(line.split("|")[3]) for line in lines[2:]]
+    assert seconds == sorted(seconds, reverse=True)
+
+
+def test_nested_passes_are_charged_once():
+    profile = PassProfile(allocations=False)
+
+    def outer():
+        return profile.call("a.py", "inner", time.sleep, 0.05)
+
+    profile.call("a.py", "outer", outer)
+    passes = profile.files["a.py"]
+    assert passes["inner"].seconds >= 0.05
+    assert passes["outer"].seconds < 0.05
+    assert profile.to_json()["totals"]["outer"]["calls"] == 1
+
+
+def test_profile_passes_writes_json(capsys, tmp_path):
+    report = tmp_path / "passes.json"
+    args = ["--go", "--ignore-formatter-errors", f"--outdir={tmp_path}"]
+    args.append(f"--profile-passes={report}")
+    assert main(args + [str(SOURCE_DIR / "foo.py")]) == 0
+    assert "| pass | calls | time (s) | allocated (KiB) |" in capsys.readouterr().out
+    profile = json.loads(report.read_text())
+    assert list(profile["files"]) == [str(SOURCE_DIR / "foo.py")]
+    assert profile["totals"]["core.inference"]["calls"] == 1
+
+
+def test_profile_passes_records_stdin(capsys, monkeypatch):
+    source = 'if __name__ == "__main__":\n    print(1)\n'
+    monkeypatch.setattr("sys.stdin", io.StringIO(source))
+    main(["--go", "--ignore-formatter-errors", "-", "--profile-passes"])
+    captured = capsys.readouterr()
+    # stdout only carries the output
+    assert "| pass |" not in captured.out
+    assert "func main()" in captured.out
+    assert "| core.inference | 1 |" in captured.err
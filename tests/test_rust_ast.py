@@ -19,6 +19,7 @@ from py2many.pyrs.rust_ast import (
     RustSourceFile,
     RustWhileLoop,
     RustYield,
+    _load_tree_sitter_rust,
 )
 from py2many.pyrs.transpiler import RustTranspiler
 
@@ -85,3 +86,16 @@ def test_rust_transpiler_visitors_return_tree_sitter_nodes():
     assert rendered_return.kind == "source_file"
     assert isinstance(direct_return, RustNode)
     assert direct_return.render() == "return 42;"
+
+
+def test_tree_sitter_node_parses_lazily_with_a_shared_parser():
+    node = RustNode("let answer = 42;")
+
+    assert "_tree" not in vars(node.node)
+    assert node.render() == "let answer = 42;"
+    assert "_tree" not in vars(node.node)
+
+    assert not node.has_error
+    assert node.tree is not None
+    assert RustNode("let answer = ;").has_error
+    assert _load_tree_sitter_rust() is _load_tree_sitter_rust()
@@ -1,7 +1,9 @@
 import ast
 
+from py2many.cli import _timed
 from py2many.context import add_variable_context
-from py2many.scope import add_scope_context
+from py2many.rewriters import rename
+from py2many.scope import ScopeList, add_scope_context
 
 
 def parse(*args):
@@ -19,8 +21,64 @@ class TestScopeTransformer:
 
 
 class TestScopeList:
+    def test_sequence_of_scopes(self):
+        scopes = ScopeList(["module", "class", "function"])
+        assert len(scopes) == 3
+        assert list(scopes) == ["module", "class", "function"]
+        assert list(reversed(scopes)) == ["function", "class", "module"]
+        assert scopes[0] == "module"
+        assert scopes[-1] == "function"
+        assert scopes[-2] == "class"
+        assert scopes[1:] == ["class", "function"]
+        assert list(scopes.parent_scopes) == ["module", "class"]
+        assert list(ScopeList().push("module")) == ["module"]
+
+    def test_nodes_share_enclosing_scopes(self):
+        source = parse("def foo():", "   x = 1", "   return x")
+        function = source.body[0]
+        assign, ret = function.body
+        assert assign.scopes is ret.scopes is function.scopes
+        assert function.scopes.parent_scopes is source.scopes
+        assert list(ret.scopes) == [source, function]
+
     def test_find_returns_most_upper_definition(self):
         source = parse("x = 1", "def foo():", "   x = 2")
         add_variable_context(source, (source,))
         definition = source.scopes.find("x")
         assert definition.lineno == 1
+
+    def test_find_prefers_innermost_definition(self):
+        source = parse("x = 1", "def foo():", "   x = 2", "   return x")
+        add_variable_context(source, (source,))
+        ret = source.body[1].body[1]
+        assert ret.scopes.find("x").lineno == 3
+
+    def test_find_stops_at_lambda(self):
+        source = parse("x = 1", "f = lambda: x")
+        add_variable_context(source, (source,))
+        name = source.body[1].value.body
+        assert name.scopes.find("x") is None
+
+    def test_find_sees_grown_body(self):
+        source = parse("def foo():", "   return 1")
+        assert source.scopes.find("bar") is None
+        source.body.append(ast.parse("def bar():\n   return 2").body[0])
+        assert source.scopes.find("bar") is source.body[1]
+
+    def test_find_sees_body_rewritten_by_a_pass(self):
+        source = parse("def foo():", "   return 1")
+        assert source.scopes.find("foo") is source.body[0]
+
+        def rewrite(tree):
+            tree.body[0] = ast.parse("def bar():\n   return 2").body[0]
+
+        _timed(None, "rewrite", rewrite, source)
+        assert source.scopes.find("foo") is None
+        assert source.scopes.find("bar") is source.body[0]
+
+    def test_find_sees_renamed_definitions(self):
+        source = parse("def foo():", "   return 1")
+        assert source.scopes.find("foo") is source.body[0]
+        rename(source, "foo", "bar")
+        assert source.scopes.find("foo") is None
+        assert source.scopes.find("bar") is source.body[0]
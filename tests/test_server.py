@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _get_all_settings, _transpile
+from py2many.client import SERVER_ENV
+from py2many.client import main as client_main
+from py2many.client import request
+from py2many.server import TranspileServer, serve, serve_unix
+
+SOURCE = "def inc(x: int) -> int:\n    return x + 1\n"
+
+
+def test_transpile_request_matches_transpile():
+    server = TranspileServer()
+    message = {"id": 7, "language": "go", "source": SOURCE, "format": False}
+
+    response = server.handle(message)
+    settings = _get_all_settings(Mock(indent=4))["go"]
+    expected = _transpile([Path("input.py")], [SOURCE], settings)[0][0]
+    assert response == {"id": 7, "output": expected, "diagnostics": [], "ok": True}
+
+    assert server.handle(message) == response
+    server.handle({"language": "go", "source": "x = 1\n", "format": False})
+    # The settings are built once for the same language and options
+    assert len(server._settings) == 1
+    server.handle({"language": "go", "source": SOURCE, "options": {"indent": 2}})
+    assert len(server._settings) == 2
+
+
+def test_transpile_request_errors():
+    server = TranspileServer()
+    response = server.handle({"language": "go", "source": "async def f():\n    pass\n"})
+    assert response["ok"] is False
+    assert response["output"] == "FAILED"
+    assert "async def not implemented" in response["diagnostics"][0]
+
+    assert server.handle({"language": "cobol", "source": SOURCE}) == {
+        "ok": False,
+        "error": "Unknown language: cobol",
+    }
+    response = server.handle({"language": "go", "options": {"colour": True}})
+    assert response["error"] == "Unknown option: colour"
+
+
+def test_requests_dont_depend_on_earlier_ones(tmp_path):
+    (tmp_path / "inc.py").write_text(SOURCE)
+    server = TranspileServer()
+    strict = {"language": "go", "source": "del x\n", "format": False}
+    expected = server.handle(strict)
+    assert expected["ok"] is False
+
+    # Directory mode continues on unimplemented nodes
+    outdir = tmp_path / "out"
+    argv = ["--go", f"--outdir={outdir}", str(tmp_path)]
+    assert server.handle({"argv": argv, "cwd": str(tmp_path)})["exit_code"] == 0
+    # Answered again rather than taken from the responses kept
+    server._responses.clear()
+    assert server.handle(strict) == expected
+
+
+def test_serve_answers_each_line_until_shutdown():
+    server = TranspileServer()
+    lines = [
+        {"id": 1, "language": "go", "source": SOURCE, "format": False},
+        "not json",
+        {"id": 2, "shutdown": True},
+        {"id": 3, "language": "go", "source": SOURCE, "format": False},
+    ]
+    reader = io.BytesIO(
+        b"".join(
+            (line if isinstance(line, str) else json.dumps(line)).encode() + b"\n"
+            for line in lines
+        )
+    )
+    writer = io.BytesIO()
+
+    serve(server, reader, writer)
+    responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+    assert [response.get("id") for response in responses] == [1, None, 2]
+    assert "func Inc(x int) int" in responses[0]["output"]
+    assert responses[1]["error"].startswith("Invalid request")
+    assert not server.running
+
+
+def test_cli_requests_reject_watch(tmp_path):
+    (tmp_path / "inc.py").write_text(SOURCE)
+    server = TranspileServer()
+    response = server.handle(
+        {"argv": ["--go", "--watch", str(tmp_path)], "cwd": str(tmp_path)}
+    )
+    assert response["exit_code"] == -1
+    assert "--watch supported only by py2many" in response["stdout"]
+
+
+def test_client_runs_cli_on_server(capsys, monkeypatch, tmp_path):
+    # UNIX socket paths are limited to about a hundred bytes
+    socket_dir = tempfile.mkdtemp()
+    path = os.path.join(socket_dir, "py2many.sock")
+    server = TranspileServer()
+    thread = threading.Thread(target=serve_unix, args=(server, path))
+    thread.start()
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        (tmp_path / "inc.py").write_text(SOURCE)
+        monkeypatch.chdir(tmp_path)
+        env = {**os.environ, SERVER_ENV: path}
+
+        assert client_main(["--go", "--ignore-formatter-errors", "inc.py"], env) == 0
+        assert "inc.py ... inc.go" in capsys.readouterr().out
+        assert "func Inc(x int) int" in (tmp_path / "inc.go").read_text()
+        assert len(server._settings) == 1
+
+        (tmp_path / "unsupported.py").write_text("async def f():\n    pass\n")
+        assert client_main(["--go", "unsupported.py"], env) == 1
+        assert "async def not implemented" in capsys.readouterr().out
+    finally:
+        request(path, {"shutdown": True})
+        thread.join()
+        shutil.rmtree(socket_dir)
+    assert not os.path.exists(path)
+
+
+def test_client_runs_cli_without_server(monkeypatch, tmp_path):
+    (tmp_path / "inc.py").write_text(SOURCE)
+    monkeypatch.chdir(tmp_path)
+    env = {**os.environ, SERVER_ENV: str(tmp_path / "missing.sock")}
+
+    assert client_main(["--go", "--ignore-formatter-errors", "inc.py"], env) == 0
+    assert (tmp_path / "inc.go").exists()
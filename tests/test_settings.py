@@ -4,6 +4,7 @@ from unittest.mock import Mock
 
 from py2many.cli import _get_all_settings
 from py2many.process_helpers import find_executable
+from py2many.registry import BACKENDS
 
 try:
     from py2many.pycpp import (
@@ -40,3 +41,8 @@ class TestSettings(unittest.TestCase):
         lang = "nim"
         settings = _get_all_settings(Mock(indent=2))[lang]
         self.assertIn("--indent:2", settings.formatter)
+
+    def test_backend_display_names(self):
+        for lang, backend in BACKENDS.items():
+            settings = backend.settings(Mock(indent=4))
+            self.assertEqual(settings.display_name, backend.display_name, lang)
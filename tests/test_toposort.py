@@ -1,4 +1,21 @@
-from py2many.toposort_modules import TopologicalSorter
+import ast
+from pathlib import Path
+
+from py2many.toposort_modules import (
+    TopologicalSorter,
+    get_dependencies,
+    toposort,
+    toposort_paths,
+)
+
+
+def parse_modules(sources):
+    trees = []
+    for path, source in sources.items():
+        tree = ast.parse(source)
+        tree.__file__ = Path(path)
+        trees.append(tree)
+    return trees
 
 
 def test_basic_dag():
@@ -64,3 +81,76 @@ def test_disjoint_graphs():
     # A and C are ready first. Sorted: A, C.
     # Then B and D become ready. Sorted: B, D.
     assert order == ["A", "C", "B", "D"]
+
+
+def test_cycle_comes_after_its_dependencies():
+    # A <-> B, and A also depends on the cycle X <-> Y
+    graph = {"A": ["B", "X"], "B": ["A"], "X": ["Y"], "Y": ["X"]}
+    ts = TopologicalSorter(graph)
+    assert list(ts.static_order()) == ["X", "Y", "A", "B"]
+    assert ts.waves() == [[("X", "Y")], [("A", "B")]]
+
+
+def test_waves():
+    graph = {"B": ["A"], "A": [], "D": ["C"], "C": [], "E": ["B", "D"]}
+    ts = TopologicalSorter(graph)
+    assert ts.waves() == [[("A",), ("C",)], [("B",), ("D",)], [("E",)]]
+
+
+def test_get_ready_hands_out_cycles_one_node_at_a_time():
+    graph = {"A": ["B"], "B": ["A"], "C": ["A", "B"], "D": []}
+    ts = TopologicalSorter(graph)
+    ts.prepare()
+    assert ts.get_ready() == ("A", "D")
+    assert ts.get_ready() == ()
+    ts.done("A")
+    assert ts.get_ready() == ("B",)
+    ts.done("B", "D")
+    assert ts.get_ready() == ("C",)
+    ts.done("C")
+    assert not ts.is_active()
+
+
+def test_long_chain():
+    graph = {i: [i - 1] for i in range(1, 10000)}
+    order = list(TopologicalSorter(graph).static_order())
+    assert order == list(range(10000))
+
+
+def test_dependencies_resolve_package_imports():
+    trees = parse_modules(
+        {
+            "main.py": "import pkg.util\nfrom pkg import models\n",
+            "pkg/__init__.py": "from .models import Model\n",
+            "pkg/models.py": "from . import util\nfrom ..outside import x\n",
+            "pkg/util.py": "from pkg.sub.helpers import helper\n",
+            "pkg/sub/__init__.py": "",
+            "pkg/sub/helpers.py": "from .. import util\nfrom pkg import sub\n",
+        }
+    )
+    deps = get_dependencies(trees)
+    assert deps["main"] == {"pkg.util", "pkg.models", "pkg.__init__"}
+    assert deps["pkg.__init__"] == {"pkg.models"}
+    assert deps["pkg.models"] == {"pkg.__init__", "pkg.util"}
+    assert deps["pkg.util"] == {"pkg.sub.helpers"}
+    assert deps["pkg.sub.__init__"] == set()
+    assert deps["pkg.sub.helpers"] == {"pkg.__init__", "pkg.util", "pkg.sub.__init__"}
+
+
+def test_toposort_paths_matches_toposort():
+    sources = {
+        "app.py": "from lib import f\nimport util\n",
+        "lib.py": "from util import g\n",
+        "util.py": "from app import h\n",
+        "other.py": "",
+    }
+    parsed = []
+
+    def parse(path):
+        parsed.append(path)
+        return parse_modules({path: sources[str(path)]})[0]
+
+    paths = [Path(p) for p in sources]
+    order = toposort_paths(paths, parse)
+    assert order == tuple(t.__file__ for t in toposort(parse_modules(sources)))
+    assert parsed == paths
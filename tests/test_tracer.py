@@ -1,8 +1,18 @@
 import ast
 
+from py2many.analysis import add_imports
+from py2many.cli import _timed
 from py2many.context import add_list_calls, add_variable_context
 from py2many.scope import add_scope_context
-from py2many.tracer import is_list, is_recursive, value_expr, value_type
+from py2many.tracer import (
+    is_class_or_module,
+    is_enum,
+    is_list,
+    is_recursive,
+    is_self_arg,
+    value_expr,
+    value_type,
+)
 
 
 def parse(*args):
@@ -112,3 +122,41 @@ def test_is_recursive():
     source = parse("def rec(n):", "   return rec(n-1) + rec(n)")
     fun = source.body[0]
     assert is_recursive(fun)
+
+
+def test_class_and_enum_lookups():
+    source = parse(
+        "from enum import Enum",
+        "from foo import Bar",
+        "class Color(Enum):",
+        "   RED = 1",
+        "class Point:",
+        "   def norm(self):",
+        "       return self",
+    )
+    add_imports(source)
+    ret = source.body[3].body[0].body[0]
+    assert is_class_or_module("Bar", ret.scopes)
+    assert is_class_or_module("Point", ret.scopes)
+    assert not is_class_or_module("Shape", ret.scopes)
+    assert is_enum("Color", ret.scopes)
+    assert not is_enum("Point", ret.scopes)
+
+    # The lookups see classes that passes put in place of others
+    def rewrite(tree):
+        tree.body[2] = ast.parse("class Shape:\n   pass").body[0]
+
+    _timed(None, "rewrite", rewrite, source)
+    assert is_class_or_module("Shape", ret.scopes)
+    assert not is_enum("Color", ret.scopes)
+
+
+def test_is_self_arg():
+    source = parse("class Point:", "   def norm(self):", "       return self")
+    method = source.body[0].body[0]
+    name = method.body[0].value
+    assert not is_self_arg("self", name.scopes)
+    # Set by transpilers as they emit the class
+    method.self_type = "Point"
+    assert is_self_arg("self", name.scopes)
+    assert not is_self_arg("other", name.scopes)
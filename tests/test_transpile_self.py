@@ -198,22 +198,23 @@ class SelfTranspileTests(unittest.TestCase):
             expected_success={
                 "__main__.py",
                 "analysis.py",
-                "annotation_transformer.py",
                 "ast_helpers.py",
                 "astx.py",
                 "cli.py",
                 "context.py",
+                "context_transformer.py",
                 "declaration_extractor.py",
                 "exceptions.py",
+                "format_worker.py",
                 "helpers.py",
                 "language.py",
                 "llm_transpile.py",
                 "macosx_llm.py",
                 "mutability_transformer.py",
-                "nesting_transformer.py",
                 "process_helpers.py",
                 "python_transformer.py",
                 "raises_transformer.py",
+                "registry.py",
                 "result.py",
                 "rewriters.py",
                 "scope.py",
@@ -222,6 +223,7 @@ class SelfTranspileTests(unittest.TestCase):
                 "toposort_modules.py",
                 "tracer.py",
                 "version.py",
+                "watch.py",
             },
         )
 
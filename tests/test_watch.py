@@ -0,0 +1,136 @@
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import Mock
+
+from py2many.cli import _find_inputs, _get_all_settings, _process_many, main
+from py2many.watch import ModuleWatcher, watch
+
+TESTS_DIR = Path(__file__).parent.absolute()
+SOURCE_DIR = TESTS_DIR / "dir_cases" / "test1"
+
+
+def settings():
+    settings = _get_all_settings(Mock(indent=4))["go"]
+    settings.formatter = None
+    return settings
+
+
+def copy_source(tmp_path):
+    source = tmp_path / "source"
+    shutil.copytree(SOURCE_DIR, source)
+    return source
+
+
+def edit(path, text):
+    path.write_text(text)
+    # Later than the mtime of the last write, however coarse the clock
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def assert_full_run(source, outdir, tmp_path):
+    """outdir has the outputs of transpiling the whole of source"""
+    whole = tmp_path / "whole"
+    shutil.rmtree(whole, ignore_errors=True)
+    whole.mkdir()
+    _process_many(settings(), source, _find_inputs(source, [outdir]), whole)
+    expected = {p.name: p.read_text() for p in whole.iterdir()}
+    assert {p.name: p.read_text() for p in outdir.iterdir()} == expected
+
+
+def test_watcher_transpiles_changed_modules_and_importers(tmp_path):
+    source = copy_source(tmp_path)
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    watcher = ModuleWatcher(settings(), source, outdir)
+
+    transpiled, successful, format_errors = watcher.update(*watcher.changes())
+    assert sorted(transpiled) == [Path("bar.py"), Path("baz.py"), Path("foo.py")]
+    assert transpiled[-1] == Path("foo.py")
+    assert successful == set(transpiled)
+    assert_full_run(source, outdir, tmp_path)
+
+    edit(source / "bar.py", "def bar1():\n    return 1\n")
+    transpiled, _, _ = watcher.update(*watcher.changes())
+    assert transpiled == [Path("bar.py"), Path("foo.py")]
+    assert_full_run(source, outdir, tmp_path)
+
+    # Saved without changes
+    edit(source / "baz.py", (source / "baz.py").read_text())
+    assert watcher.update(*watcher.changes()) == ([], set(), set())
+
+
+def test_watcher_parses_only_modules_it_transpiles(monkeypatch, tmp_path):
+    source = copy_source(tmp_path)
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    watcher = ModuleWatcher(settings(), source, outdir)
+    watcher.update(*watcher.changes())
+    parsed = []
+    parse = ModuleWatcher._parse
+
+    def spy_parse(self, filename):
+        parsed.append(filename)
+        return parse(self, filename)
+
+    monkeypatch.setattr(ModuleWatcher, "_parse", spy_parse)
+    # baz.py sorts between them but doesn't import bar.py
+    edit(source / "bar.py", "def bar1():\n    return 1\n")
+    transpiled, _, _ = watcher.update(*watcher.changes())
+    assert transpiled == [Path("bar.py"), Path("foo.py")]
+    assert set(parsed) == {Path("bar.py"), Path("foo.py")}
+
+    # Imports another module, so the modules are sorted again
+    parsed.clear()
+    edit(source / "baz.py", 'from bar import bar1\n\n\ndef baz1():\n    return "foo"\n')
+    transpiled, _, _ = watcher.update(*watcher.changes())
+    assert transpiled == [Path("baz.py"), Path("foo.py")]
+    assert set(parsed) == {Path("baz.py"), Path("foo.py")}
+    assert_full_run(source, outdir, tmp_path)
+
+
+def test_watcher_removes_outputs_of_removed_modules(tmp_path):
+    source = copy_source(tmp_path)
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    watcher = ModuleWatcher(settings(), source, outdir)
+    watcher.update(*watcher.changes())
+
+    (source / "baz.py").unlink()
+    edit(source / "qux.py", "def qux1():\n    return 2\n")
+    transpiled, _, _ = watcher.update(*watcher.changes())
+    assert sorted(transpiled) == [Path("foo.py"), Path("qux.py")]
+    assert not (outdir / "baz.go").exists()
+    assert (outdir / "qux.go").exists()
+
+
+def test_watch_reports_latency(capsys, tmp_path):
+    source = copy_source(tmp_path)
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    watcher = ModuleWatcher(settings(), source, outdir)
+    watcher.update(*watcher.changes())
+
+    edit(source / "baz.py", 'def baz1():\n    return "bar"\n')
+    watch(watcher, interval=0, polls=1)
+    out = capsys.readouterr().out
+    assert "Transpiled 2 in " in out
+    assert out.rstrip().endswith("s: baz.py, foo.py")
+
+
+def test_watch_rejects_jobs(capsys, tmp_path):
+    source = copy_source(tmp_path)
+    assert main(["--go", "--watch", "--jobs=2", str(source)]) == -1
+    assert "--watch supported only" in capsys.readouterr().out
+
+
+def test_watch_rejects_files_and_several_inputs(capsys, tmp_path):
+    source = copy_source(tmp_path)
+    other = tmp_path / "other"
+    shutil.copytree(SOURCE_DIR, other)
+    assert main(["--go", "--watch", str(source), str(other)]) == -1
+    assert main(["--go", "--watch", str(source / "foo.py")]) == -1
+    assert main(["--go", "--watch", "-"]) == -1
+    out = capsys.readouterr().out
+    assert out.count("--watch supported only with a single directory input") == 3